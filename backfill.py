@@ -0,0 +1,194 @@
+"""
+backfill.py
+
+Bulk import of run CSVs (`Outputs/YYYY.MM/news_output_*.csv`) into the SQLite table,
+for rebuilding a database that was lost or reset:
+- CSVs are streamed with `csv.reader`; columns are mapped to `config.FIELDNAMES` by
+  header name, so the `db_status` / `db_msg` columns `csv_op` appends are dropped and
+  CSVs written before a field was added get it empty
+- Duplicates are dropped in memory on `config.PRIMARY_KEYS`; the keys already in the
+  table are loaded first, so re-running a backfill inserts nothing twice
+- Rows go in with `executemany` in large transactions, with the secondary indexes
+  (see db_schema.py) dropped during the load and rebuilt once at the end
+- Imported rows are numbered like any insert and appended to the change feed, if enabled
+
+Rows that are not meant to be in the table are skipped: rows missing a primary key
+value (projection runs) and rows the near-duplicate filter kept out of the DB.
+
+Usage:
+    python backfill.py                              # every Outputs/*/news_output_*.csv
+    python backfill.py Outputs/2025.01/*.csv        # selected files
+    python backfill.py --batch-size 200000
+"""
+
+import argparse
+import csv
+import glob
+import logging
+import os
+import sqlite3
+import sys
+import time
+from operator import itemgetter
+
+import config
+from change_feed import ChangeFeed
+from db_schema import ensure_schema, seq_index_name
+from records import ScrapedRow
+
+logger = logging.getLogger(__name__)
+
+CSV_PATTERN = os.path.join("Outputs", "*", "news_output_*.csv")
+
+
+def read_csv_records(csv_path: str, counts: dict):
+    """
+    Yield the rows of one run CSV as value tuples in `config.FIELDNAMES` order.
+
+    Parameters:
+        counts (dict): Updated with the number of rows read and skipped.
+    """
+    with open(csv_path, newline="", encoding="utf-8") as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        if not header:
+            return
+
+        positions = {name: index for index, name in enumerate(header)}
+        missing = [field for field in config.FIELDNAMES if field not in positions]
+        if any(key in missing for key in config.PRIMARY_KEYS):
+            logger.warning(f"Skipping {csv_path}: no primary key column(s) {missing}")
+            return
+
+        # Missing fields point at an empty column appended past the header width
+        width = len(header)
+        pick = itemgetter(*[positions.get(field, width) for field in config.FIELDNAMES])
+        key_columns = [positions[key] for key in config.PRIMARY_KEYS]
+        msg_column = positions.get("db_msg")
+
+        for record in reader:
+            counts["read"] += 1
+            if len(record) < width:
+                record += [""] * (width - len(record))
+            record.append("")
+
+            if not all(record[index] for index in key_columns) or (
+                msg_column is not None and record[msg_column].startswith("Near-duplicate")
+            ):
+                counts["skipped"] += 1
+                continue
+
+            yield pick(record)
+
+
+def backfill(csv_paths: list, db_name: str = config.DATABASE, table_name: str = config.TABLE_NAME,
+             batch_size: int = 100000) -> dict:
+    """
+    Import run CSVs into a SQLite table.
+
+    Parameters:
+        csv_paths (list): CSV files, imported in the given order (first copy of a key wins).
+        batch_size (int): Rows per transaction.
+
+    Returns:
+        dict: Row counts (read, inserted, duplicate, skipped) and elapsed seconds.
+    """
+    started = time.perf_counter()
+    counts = {"files": 0, "read": 0, "inserted": 0, "duplicate": 0, "skipped": 0}
+    csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+    conn = sqlite3.connect(db_name)
+    try:
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table_name} ({config.TABLE_HEADER})")
+        ensure_schema(conn, table_name, fieldnames=config.FIELDNAMES)
+
+        # Bulk-load settings for this connection only; the WAL keeps the file consistent
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("PRAGMA cache_size=-262144")
+        conn.execute("PRAGMA temp_store=MEMORY")
+
+        key_index = [config.FIELDNAMES.index(key) for key in config.PRIMARY_KEYS]
+        seen = set(conn.execute(f"SELECT {', '.join(config.PRIMARY_KEYS)} FROM {table_name}"))
+        logger.info(f"{len(seen)} row(s) already in {db_name}:{table_name}")
+
+        # The seq index stays: the insert trigger looks up MAX(seq) for every row. If this
+        # process dies before the rebuild below, the next ensure_schema() recreates them
+        indexes = conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL AND name != ?",
+            (table_name, seq_index_name(table_name)),
+        ).fetchall()
+        for name, _ in indexes:
+            conn.execute(f"DROP INDEX {name}")
+        conn.commit()
+
+        # Number rows here instead of per-row in the seq trigger (it skips rows that have one)
+        columns = ScrapedRow.FIELDS + ("seq",)
+        insert_sql = (
+            f"INSERT OR IGNORE INTO {table_name} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))})"
+        )
+        batch = []
+
+        def flush():
+            # Numbered inside the write transaction, so a scraper inserting meanwhile can
+            # not take the same seq. INSERT OR IGNORE also skips keys such a writer stored
+            # after `seen` was loaded; count only the rows SQLite actually inserted
+            conn.execute("BEGIN IMMEDIATE")
+            next_seq = conn.execute(f"SELECT COALESCE(MAX(seq), 0) + 1 FROM {table_name}").fetchone()[0]
+            before = conn.total_changes
+            conn.executemany(insert_sql, (values + (next_seq + offset,) for offset, values in enumerate(batch)))
+            conn.commit()
+            inserted = conn.total_changes - before
+            counts["inserted"] += inserted
+            counts["duplicate"] += len(batch) - inserted
+            batch.clear()
+
+        try:
+            for csv_path in csv_paths:
+                counts["files"] += 1
+                for values in read_csv_records(csv_path, counts):
+                    key = tuple(values[index] for index in key_index)
+                    if key in seen:
+                        counts["duplicate"] += 1
+                        continue
+
+                    seen.add(key)
+                    batch.append(values)
+                    if len(batch) >= batch_size:
+                        flush()
+
+                logger.info(f"{csv_path}: {counts['inserted'] + len(batch)} row(s) imported so far")
+
+            if batch:
+                flush()
+        finally:
+            # Rebuilt even after a failed load, so the table is never left without its indexes
+            for name, sql in indexes:
+                conn.execute(sql)
+            conn.commit()
+    finally:
+        conn.close()
+
+    change_feed = ChangeFeed.from_config(config)
+    if change_feed and counts["inserted"] and (db_name, table_name) == (config.DATABASE, config.TABLE_NAME):
+        counts["feed"] = change_feed.sync()
+
+    counts["seconds"] = round(time.perf_counter() - started, 2)
+    logger.info(
+        f"Backfill finished: {counts} "
+        f"({counts['read'] / max(counts['seconds'], 1e-9):,.0f} CSV rows/s)"
+    )
+    return counts
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
+
+    parser = argparse.ArgumentParser(description="Bulk import run CSVs into the SQLite table")
+    parser.add_argument("csv_files", nargs="*", help=f"CSV files (default: {CSV_PATTERN})")
+    parser.add_argument("--db", default=config.DATABASE, help="database file (default: config.DATABASE)")
+    parser.add_argument("--table", default=config.TABLE_NAME, help="table (default: config.TABLE_NAME)")
+    parser.add_argument("--batch-size", type=int, default=100000, help="rows per transaction")
+    args = parser.parse_args()
+
+    backfill(sorted(args.csv_files or glob.glob(CSV_PATTERN)), args.db, args.table, args.batch_size)
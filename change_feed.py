@@ -0,0 +1,225 @@
+"""
+change_feed.py
+
+Append-only feed of the rows actually inserted into the SQLite table, for downstream
+jobs that only want what is new:
+- Every inserted row carries a monotonic `seq` (db_schema.py migration 5); rows
+  `database_op` rejected as duplicates never get one
+- `sync()` copies rows past the feed's last `seq` into NDJSON segments
+  `<feed_dir>/changes-<first seq>.ndjson`, one `{"seq": ..., <FIELDNAMES>...}` object per
+  line, in `seq` order; it runs inside a `BEGIN IMMEDIATE` on the database, so
+  several scraper processes never write the feed at the same time
+- The feed resumes from its own last line, so a crash between writing and
+  committing cannot duplicate or skip rows (a torn last line is cut off)
+- Consumers call `read_changes(feed_dir, since)` with the last `seq` they handled; only
+  the segments holding newer rows are opened
+
+Usage:
+    python change_feed.py --sync                  # catch the feed up with the table
+    python change_feed.py --since 1200            # print changes after seq 1200
+    python change_feed.py --since 1200 --follow   # ... and keep tailing
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+import config
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_RE = re.compile(r"changes-(\d+)\.ndjson$")
+TAIL_BYTES = 64 * 1024
+
+
+def segments(feed_dir: str) -> list:
+    """Feed segments as (first seq, path), oldest first."""
+    found = []
+    for path in glob.glob(os.path.join(feed_dir, "changes-*.ndjson")):
+        match = SEGMENT_RE.search(path)
+        if match:
+            found.append((int(match.group(1)), path))
+    return sorted(found)
+
+
+def read_changes(feed_dir: str, since: int = 0):
+    """
+    Yield changes with `seq` greater than `since`, in order.
+
+    Segments that end before `since` are skipped without being opened.
+
+    Yields:
+        dict: One inserted row, with its "seq".
+    """
+    found = segments(feed_dir)
+    start = 0
+    for index, (first_seq, _) in enumerate(found):
+        if first_seq <= since + 1:
+            start = index
+
+    for _, path in found[start:]:
+        with open(path, encoding="utf-8") as segment:
+            for line in segment:
+                if not line.endswith("\n"):
+                    # Being written right now; picked up by the next read
+                    return
+                change = json.loads(line)
+                if change["seq"] > since:
+                    yield change
+
+
+class ChangeFeed:
+    """
+    Writer side of the change feed.
+
+    Parameters:
+        feed_dir (str): Directory holding the NDJSON segments.
+        db_name (str): Database the rows are read from.
+        table_name (str): Table with the `seq` column.
+        segment_bytes (int): Size at which a new segment is started.
+        batch_size (int): Rows read from the table per query.
+    """
+
+    def __init__(self, feed_dir="Outputs/changes", db_name="database.db", table_name="table_0",
+                 segment_bytes=64 * 1024 ** 2, batch_size=5000):
+        self.feed_dir = feed_dir
+        self.db_name = db_name
+        self.table_name = table_name
+        self.segment_bytes = segment_bytes
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        # (segment path, size, last seq) after our own last write, to skip re-reading the tail
+        self._known = None
+
+        os.makedirs(self.feed_dir, exist_ok=True)
+
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build from the CHANGE_FEED* settings.
+
+        Returns:
+            ChangeFeed or None: None when `CHANGE_FEED` is off.
+        """
+        if not getattr(config, "CHANGE_FEED", False):
+            return None
+
+        return cls(
+            feed_dir=getattr(config, "CHANGE_FEED_DIR", os.path.join("Outputs", "changes")),
+            db_name=config.DATABASE,
+            table_name=config.TABLE_NAME,
+            segment_bytes=getattr(config, "CHANGE_FEED_SEGMENT_BYTES", 64 * 1024 ** 2),
+        )
+
+
+    def _tail(self) -> tuple:
+        """Latest segment path and last seq written to the feed, cutting off a torn last line."""
+        found = segments(self.feed_dir)
+        if not found:
+            return None, 0
+
+        first_seq, path = found[-1]
+        size = os.path.getsize(path)
+        if self._known and self._known[:2] == (path, size):
+            return path, self._known[2]
+
+        with open(path, "rb+") as segment:
+            segment.seek(max(0, size - TAIL_BYTES))
+            tail = segment.read()
+            complete = tail[:tail.rfind(b"\n") + 1]
+            if len(complete) < len(tail):
+                logger.warning(f"Cutting off torn last line of {path}")
+                segment.truncate(size - (len(tail) - len(complete)))
+
+        lines = complete.splitlines()
+        last_seq = json.loads(lines[-1])["seq"] if lines else first_seq - 1
+        return path, last_seq
+
+
+    def sync(self) -> int:
+        """
+        Append rows inserted since the feed's last line.
+
+        Returns:
+            int: Number of rows appended.
+        """
+        appended = 0
+        with self.lock:
+            conn = sqlite3.connect(self.db_name, timeout=30, isolation_level=None)
+            try:
+                # Holds the database write lock: no other writer or insert interleaves
+                conn.execute("BEGIN IMMEDIATE")
+                path, last_seq = self._tail()
+
+                while True:
+                    rows = conn.execute(
+                        f"SELECT seq, {', '.join(config.FIELDNAMES)} FROM {self.table_name} "
+                        f"WHERE seq > ? ORDER BY seq LIMIT ?",
+                        (last_seq, self.batch_size),
+                    ).fetchall()
+                    if not rows:
+                        break
+
+                    if path is None or os.path.getsize(path) >= self.segment_bytes:
+                        path = os.path.join(self.feed_dir, f"changes-{rows[0][0]:012d}.ndjson")
+
+                    lines = "".join(
+                        json.dumps(dict(zip(("seq",) + tuple(config.FIELDNAMES), row)), ensure_ascii=False) + "\n"
+                        for row in rows
+                    )
+                    with open(path, "a", encoding="utf-8") as segment:
+                        segment.write(lines)
+                        segment.flush()
+                        os.fsync(segment.fileno())
+
+                    last_seq = rows[-1][0]
+                    appended += len(rows)
+                    self._known = (path, os.path.getsize(path), last_seq)
+            except sqlite3.OperationalError as e:
+                # No seq column yet (table created before migration 5 ran) or no table at all
+                logger.warning(f"Change feed sync skipped: {e}")
+            finally:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                conn.close()
+
+        if appended:
+            logger.debug(f"Change feed: appended {appended} row(s), last seq {last_seq}")
+        return appended
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
+
+    parser = argparse.ArgumentParser(description="Change feed of rows inserted into the SQLite table")
+    parser.add_argument("--sync", action="store_true", help="append rows inserted since the last sync")
+    parser.add_argument("--since", type=int, help="print changes after this seq as NDJSON")
+    parser.add_argument("--follow", action="store_true", help="with --since: keep printing new changes")
+    parser.add_argument("--interval", type=float, default=5, help="seconds between polls with --follow")
+    args = parser.parse_args()
+
+    feed_dir = getattr(config, "CHANGE_FEED_DIR", os.path.join("Outputs", "changes"))
+
+    if args.sync:
+        feed = ChangeFeed(feed_dir, config.DATABASE, config.TABLE_NAME)
+        print(f"Appended {feed.sync()} row(s) to {feed_dir}")
+
+    if args.since is not None:
+        since = args.since
+        while True:
+            for change in read_changes(feed_dir, since):
+                sys.stdout.write(json.dumps(change, ensure_ascii=False) + "\n")
+                since = change["seq"]
+            sys.stdout.flush()
+
+            if not args.follow:
+                break
+            time.sleep(args.interval)
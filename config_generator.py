@@ -23,15 +23,23 @@ from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup, NavigableString
 from datetime import datetime
 import driver_config
+from document_index import DocumentIndex
+from page_cache import PageCache
+from rate_limiter import get_shared_limiter, fetch_with_limits
+from http_pool import request
+from profiling import RunProfiler
 
 
 class ConfigGenerator:
-    def __init__(self):
+    def __init__(self, page_cache=None):
         self.process_indent = ' ' * 4
         self.driver = None
+        self.page_cache = page_cache
+        self.rate_limiter = get_shared_limiter()
         self.config_data = {}
         self.analyzed_sites = []
         self.site_load_delay = 0.5
+        self.index = None
 
         # Possible date patterns
         # Numeric Date Patterns (Flexible Formats)
@@ -108,6 +116,8 @@ class ConfigGenerator:
             'turbobit', 'nitroflare', 'keep2share', 'k2s', 'subyshare'
         ]
 
+        self.FEED_TYPES = ['application/rss+xml', 'application/atom+xml', 'text/xml', 'application/xml']
+
         # Common exclude patterns for filtering
         self.EXCLUDE_WORDS = ['ad', 'ads', 'sponsored', 'promo', 'advertisement']
 
@@ -155,31 +165,30 @@ class ConfigGenerator:
         print("Browser ready for intelligent analysis\n")
 
 
+    def fetch_page_source(self, url):
+        """Load a page through the page cache when configured, else from the browser, paced per host"""
+        self.rate_limiter.add_site(url)
+        if self.page_cache:
+            options = {'headless': driver_config.headless, 'disable_js': driver_config.disable_js}
+            return self.page_cache.fetch(
+                self.driver, url, options, wait=self.site_load_delay, limiter=self.rate_limiter
+            ) or ''
+
+        return fetch_with_limits(self.driver, url, self.rate_limiter, wait=self.site_load_delay)
+
+
     def analyze_website_structure(self, url):
         """Analyze website structure and identify key elements"""
         print(f"\nAnalyzing website structure: {url}")
         
         try:
-            self.driver.get(url)
-            time.sleep(self.site_load_delay)
-            
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+            soup = BeautifulSoup(self.fetch_page_source(url), 'html.parser')
             
-            analysis = {
-                'url': url,
-                'title': soup.title.get_text() if soup.title else '',
-                'main_container': self.find_main_container(soup),
-                'news_items': self.find_news_items(soup),
-                'pagination': self.detect_pagination(soup, url),
-                'filters': self.detect_content_filters(soup),
-            }
+            analysis = self.analyze_listing_soup(soup, url)
 
             url = analysis['news_items']['link_element']['href']
             
-            self.driver.get(url)
-            time.sleep(self.site_load_delay)
-            
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+            soup = BeautifulSoup(self.fetch_page_source(url), 'html.parser')
 
             analysis['detail_structure'] = self.analyze_detail_structure(soup)
             
@@ -190,6 +199,38 @@ class ConfigGenerator:
             return None
 
 
+    def document_index(self, soup):
+        """Class/tag/id index of a parsed page, built once and reused by every detector"""
+        if self.index is None or self.index.soup is not soup:
+            self.index = DocumentIndex(soup)
+        return self.index
+
+
+    def analyze_listing_soup(self, soup, url):
+        """Analyze a parsed listing page"""
+        self.document_index(soup)
+        return {
+            'url': url,
+            'title': soup.title.get_text() if soup.title else '',
+            'main_container': self.find_main_container(soup),
+            'news_items': self.find_news_items(soup),
+            'pagination': self.detect_pagination(soup, url),
+            'filters': self.detect_content_filters(soup),
+            'feeds': self.detect_feeds(soup, url),
+        }
+
+
+    def propose_selectors(self, url, listing_source, detail_source=None):
+        """Build a config proposal from already fetched listing/detail pages, without a browser"""
+        analysis = self.analyze_listing_soup(BeautifulSoup(listing_source, 'html.parser'), url)
+        analysis['detail_structure'] = None
+
+        if detail_source:
+            analysis['detail_structure'] = self.analyze_detail_structure(BeautifulSoup(detail_source, 'html.parser'))
+
+        return self.build_config_from_analysis(analysis)
+
+
     def find_main_container(self, soup):
         """Find the best main container closer to actual content blocks."""
         print("Finding main content container...")
@@ -199,7 +240,9 @@ class ConfigGenerator:
             'gsc-', 'datepicker', 'stickymenu', 'header', 'search', 'menu', 'banner', 'slick', 'widget', 'left', 'right'
         ]
 
-        for tag in soup.find_all(['div', 'section', 'main', 'article']):
+        index = self.document_index(soup)
+
+        for tag in index.tags('div', 'section', 'main', 'article'):
             score = 0
             tag_classes = ' '.join(tag.get('class', [])).lower()
             tag_id = tag.get('id', '').lower()
@@ -216,26 +259,28 @@ class ConfigGenerator:
             if len(content_children) >= 3:
                 score += len(content_children) * 2
 
-            text_length = len(tag.get_text(strip=True))
+            text_length = index.text_length(tag)
             if 300 <= text_length <= 8000:
                 score += min(text_length // 200, 10)
 
-            depth = len(list(tag.parents))
+            depth = index.node_depth(tag)
             score += max(0, 10 - depth)
 
             if score > 10:
-                candidates.append({
-                    'element': tag.name,
-                    'score': score,
-                    'selector': self.generate_css_selector(tag),
-                    'class': tag_classes,
-                    'id': tag_id
-                })
+                candidates.append((score, tag))
 
         if candidates:
-            candidates.sort(key=lambda x: x['score'], reverse=True)
+            # Stable sort keeps the first of equal scores; only the winner needs a selector
+            candidates.sort(key=lambda x: x[0], reverse=True)
             
-            best = candidates[0]
+            score, tag = candidates[0]
+            best = {
+                'element': tag.name,
+                'score': score,
+                'selector': self.generate_css_selector(tag),
+                'class': ' '.join(tag.get('class', [])).lower(),
+                'id': tag.get('id', '').lower()
+            }
             print(f"{self.process_indent}Found main container: {best['selector']} (score: {best['score']})")
             return best
 
@@ -243,8 +288,13 @@ class ConfigGenerator:
         return {'selector': 'body', 'class': '', 'id': ''}
 
 
-    def generate_css_selector(self, element):
-        """Generate a reliable CSS selector for an element"""
+    def generate_css_selector(self, element, within=None):
+        """Generate a reliable CSS selector for an element, unique in the page or inside `within`"""
+        if self.index and self.index.indexed(element):
+            selector = self.index.unique_selector(element, within)
+            if selector:
+                return selector
+
         if element.get('id'):
             return f"#{element['id']}"
         
@@ -265,9 +315,10 @@ class ConfigGenerator:
         print("Detecting news items...")
         
         item_candidates = defaultdict(list)
+        index = self.document_index(soup)
         
         for tag_name in ['div', 'article', 'li', 'section']:
-            elements = soup.find_all(tag_name)
+            elements = index.tags(tag_name)
             
             for element in elements:
                 if self.looks_like_news_item(element):
@@ -293,7 +344,7 @@ class ConfigGenerator:
             result = {
                 'tag': sample_element.name,
                 'class': ' '.join(classes),
-                'selector': self.generate_css_selector(sample_element),
+                'selector': index.group_selector(elements) or self.generate_css_selector(sample_element),
                 'count': len(elements),
                 'title_element': self.find_title_in_item(sample_element),
                 'date_element': self.find_date_in_item(sample_element),
@@ -309,13 +360,17 @@ class ConfigGenerator:
 
     def looks_like_news_item(self, element):
         """Determine if an element looks like a news item"""
-        if len(element.get_text().strip()) < 20:
+        text = element.get_text()
+        if len(text.strip()) < 20:
             return False
         
-        if not element.find('a'):
+        if self.index and self.index.indexed(element):
+            if not self.index.count('a', within=element):
+                return False
+        elif not element.find('a'):
             return False
         
-        text_length = len(element.get_text())
+        text_length = len(text)
         if text_length < 50 or text_length > 2000:
             return False
         
@@ -327,7 +382,7 @@ class ConfigGenerator:
             if indicator in classes or indicator in element_id:
                 score += 1
         
-        return score > 0 or len(element.get_text()) > 100
+        return score > 0 or text_length > 100
 
     
     def find_title_in_item(self, item):
@@ -339,7 +394,7 @@ class ConfigGenerator:
             if 20 <= len(text) <= 200:
                 return {
                     'tag': link.name,
-                    'selector': self.generate_css_selector(link),
+                    'selector': self.generate_css_selector(link, within=item),
                     'attribute': 'title' if link.get('title') else 'text',
                     'href_attr': 'href'
                 }
@@ -350,7 +405,7 @@ class ConfigGenerator:
             if 10 <= len(text) <= 200:
                 return {
                     'tag': tag.name,
-                    'selector': self.generate_css_selector(tag),
+                    'selector': self.generate_css_selector(tag, within=item),
                     'attribute': 'text',
                     'href_attr': 'href'
                 }
@@ -369,7 +424,7 @@ class ConfigGenerator:
                     return {
                         'tag': element.name,
                         'class': ' '.join(element.get('class', [])),
-                        'selector': self.generate_css_selector(element)
+                        'selector': self.generate_css_selector(element, within=item)
                     }
             
             for indicator in self.DATE_INDICATORS:
@@ -377,7 +432,7 @@ class ConfigGenerator:
                     return {
                         'tag': element.name,
                         'class': ' '.join(element.get('class', [])),
-                        'selector': self.generate_css_selector(element)
+                        'selector': self.generate_css_selector(element, within=item)
                     }
         
         return None
@@ -394,7 +449,7 @@ class ConfigGenerator:
             if len(text) >= 20:
                 return {
                     'tag': link.name,
-                    'selector': self.generate_css_selector(link),
+                    'selector': self.generate_css_selector(link, within=item),
                     'href': href
                 }
         
@@ -402,8 +457,8 @@ class ConfigGenerator:
         if links:
             return {
                 'tag': links[0].name,
-                'selector': self.generate_css_selector(links),
-                'href': links.get('href')
+                'selector': self.generate_css_selector(links[0], within=item),
+                'href': links[0].get('href')
             }
         
         return None
@@ -462,6 +517,46 @@ class ConfigGenerator:
         return None
 
     
+    def detect_feeds(self, soup, url):
+        """Detect RSS/Atom feeds and sitemaps usable for feed-first discovery"""
+        print("Detecting feeds and sitemaps...")
+
+        feeds = []
+        for link in soup.find_all('link', href=True):
+            rel = ' '.join(link.get('rel', [])).lower()
+            if 'alternate' in rel and link.get('type', '').lower() in self.FEED_TYPES:
+                feeds.append(urljoin(url, link['href']))
+
+        for link in soup.find_all('a', href=True):
+            href = link['href'].lower()
+            if re.search(r'(/feed/?$|/rss/?$|\.rss$|atom\.xml$|rss\.xml$|feed\.xml$)', href):
+                feeds.append(urljoin(url, link['href']))
+
+        # Sitemaps are announced in robots.txt (not fetched in replay mode, which stays offline)
+        parsed = urlparse(url)
+        sitemaps = []
+        if not (self.page_cache and self.page_cache.mode == 'replay'):
+            try:
+                response = request('GET', f"{parsed.scheme}://{parsed.netloc}/robots.txt", timeout=10, limiter=self.rate_limiter)
+                try:
+                    if response.status < 400:
+                        robots = response.read(512 * 1024).decode('utf-8', errors='replace')
+                        sitemaps = re.findall(r'^\s*sitemap:\s*(\S+)', robots, re.IGNORECASE | re.MULTILINE)
+                finally:
+                    response.drain_conn()
+                    response.release_conn()
+            except Exception:
+                sitemaps = []
+
+        result = {
+            'feeds': list(dict.fromkeys(feeds)),
+            'sitemaps': list(dict.fromkeys(sitemaps)),
+        }
+        print(f"{self.process_indent}Feeds: {result['feeds']}")
+        print(f"{self.process_indent}Sitemaps: {result['sitemaps']}")
+        return result
+
+
     def extract_pagination_pattern(self, base_url, url1, url2):
         """Extract pagination pattern from URLs"""
         try:
@@ -519,6 +614,16 @@ class ConfigGenerator:
                     filters['exclude_patterns'].append(word.upper())
                     break
 
+        # Same rule format as config.TITLE_FILTER_RULES (see title_filter.py); exclude
+        # words were matched case-insensitively, so they become whole-word regex rules
+        filters['rules'] = {
+            'include': list(dict.fromkeys(filters['include_patterns'])),
+            'exclude': [
+                {'pattern': rf"\b{re.escape(word.lower())}\b", 'regex': True, 'ignore_case': True}
+                for word in dict.fromkeys(filters['exclude_patterns'])
+            ],
+        }
+
         print(f"{self.process_indent}Include: {filters['include_patterns']}")
         print(f"{self.process_indent}Exclude: {filters['exclude_patterns']}")
         return filters
@@ -527,6 +632,7 @@ class ConfigGenerator:
     def analyze_detail_structure(self, soup):
         """Analyze structure of detail pages (for articles)"""
         print("Analyzing detail page structure...")
+        self.document_index(soup)
         
         detail_structure = {
             'main_content': self.find_main_container(soup),
@@ -559,20 +665,29 @@ class ConfigGenerator:
     def find_detail_images(self, soup, main_selector):
         """Find image containers inside a specified main container"""
         image_containers = []
+        index = self.document_index(soup)
 
-        main_block = soup.select_one(main_selector) if main_selector else soup
-
-        for div in main_block.find_all('div'):
-            images = div.find_all('img', src=True)
-            if images:
-                large_images = [img for img in images if self.is_content_image(img)]
+        main_block = (index.select_one(main_selector) if main_selector else None) or soup
 
-                if 0 < len(large_images) <= 5:
-                    image_containers.append({
-                        'selector': self.generate_css_selector(div),
-                        'class': ' '.join(div.get('class', [])),
-                        'image_count': len(large_images)
-                    })
+        # One pass over the images: each content image counts for every div around it
+        image_counts = Counter()
+        for img in main_block.find_all('img', src=True):
+            if not self.is_content_image(img):
+                continue
+            for parent in img.parents:
+                if parent is main_block:
+                    break
+                if parent.name == 'div':
+                    image_counts[index.position[id(parent)]] += 1
+
+        for position in sorted(image_counts):
+            if image_counts[position] <= 5:
+                div = index.nodes[position]
+                image_containers.append({
+                    'selector': self.generate_css_selector(div),
+                    'class': ' '.join(div.get('class', [])),
+                    'image_count': image_counts[position]
+                })
 
         image_containers.sort(key=lambda x: x['image_count'])
 
@@ -661,11 +776,18 @@ class ConfigGenerator:
         if analysis['pagination']:
             config['pagination_pattern'] = analysis['pagination']['pattern']
         
+        # Feeds (feed-first discovery; a feed is preferred over a sitemap)
+        if analysis.get('feeds'):
+            feeds = analysis['feeds']['feeds'] + analysis['feeds']['sitemaps']
+            if feeds:
+                config['feed_url'] = feeds[0]
+
         # Filters
         if analysis['filters']:
             filters = analysis['filters']
             config['include_filters'] = analysis['filters']['include_patterns']
             config['exclude_filters'] = analysis['filters']['exclude_patterns']
+            config['title_filter_rules'] = analysis['filters']['rules']
         
         # Detail/Post page structure
         if analysis['detail_structure']:
@@ -706,7 +828,8 @@ class ConfigGenerator:
                 websites.append(url)
                 print(f"{self.process_indent}Added: {url}")
             
-            self.setup_browser()
+            if not (self.page_cache and self.page_cache.mode == 'replay'):
+                self.setup_browser()
                 
             analyses = []
             for i, url in enumerate(websites, 1):
@@ -739,8 +862,30 @@ class ConfigGenerator:
 
 if __name__ == "__main__":
     try:
-        generator = ConfigGenerator()
-        generator.run_auto_generator()
+        cache_mode = os.environ.get("SCRATO_PAGE_CACHE", "off")
+        page_cache = PageCache(mode=cache_mode) if cache_mode != "off" else None
+        generator = ConfigGenerator(page_cache=page_cache)
+
+        # SCRATO_PROFILE=cprofile|sample writes profiles under LOG_DIR/YYYY.MM/, like the
+        # scraper's; this may run before there is a config.py to read LOG_DIR from
+        try:
+            import config
+            log_root = getattr(config, "LOG_DIR", "logs")
+        except ImportError:
+            log_root = "logs"
+        profile_mode = os.environ.get("SCRATO_PROFILE", "off")
+        profile_dir = os.path.join(log_root, datetime.now().strftime("%Y.%m"))
+        if profile_mode != "off":
+            os.makedirs(profile_dir, exist_ok=True)
+        profiler = RunProfiler(
+            mode=profile_mode,
+            output_prefix=os.path.join(profile_dir, f"config_generator_{datetime.now().strftime('%Y.%m.%d_%H.%M.%S')}"),
+        ).start()
+        try:
+            generator.run_auto_generator()
+        finally:
+            for path in profiler.stop():
+                print(f"Profile written: {path}")
     except KeyboardInterrupt:
         print("\n\nProcess cancelled by user")
     except Exception as e:
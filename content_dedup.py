@@ -0,0 +1,319 @@
+"""
+content_dedup.py
+
+Near-duplicate detection for scraped items, independent of the `(date, filename)` key:
+- Each item gets a 64-bit SimHash over its title word shingles and its file provider links
+- Fingerprints live in memory in a banded index: with `max_distance` d, the fingerprint is
+  split into d + 1 bands, and any fingerprint within Hamming distance d shares at least one
+  band exactly, so a lookup only compares against a handful of candidates
+- Fingerprints are persisted in `<TABLE_NAME>_fingerprints` next to the scraped table, with
+  the href each item duplicates, which `cluster_report()` groups into duplicate clusters
+- Only items stored in the scraped table are duplicate references; suppressed ones are kept
+  so their detail pages are not fetched again, but nothing is flagged against them
+
+Usage:
+    python content_dedup.py --rebuild    # fingerprint every row already in config.TABLE_NAME
+    python content_dedup.py --report     # print duplicate clusters
+"""
+
+import argparse
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+TAG_RE = re.compile(r"\[[^\]]*\]")
+LINK_RE = re.compile(r"'([^']+)'")
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def item_features(title: str, fileurl: str = "") -> dict:
+    """
+    Weighted SimHash features of an item.
+
+    Bracketed tags such as `[NEW]` are dropped from the title, since reposts change them.
+    Provider links are reduced to host + path and weighted above title words, as two items
+    sharing the same download links are the strongest duplicate signal.
+    """
+    features = defaultdict(int)
+
+    words = WORD_RE.findall(TAG_RE.sub(" ", title or "").lower())
+    for word in words:
+        features[word] += 1
+    for first, second in zip(words, words[1:]):
+        features[f"{first} {second}"] += 2
+
+    for link in LINK_RE.findall(fileurl or ""):
+        parsed = urlparse(link)
+        features[f"link:{parsed.netloc}{parsed.path}"] += 8
+
+    return features
+
+
+def simhash(features: dict) -> int:
+    """64-bit SimHash of weighted features."""
+    weights = [0] * FINGERPRINT_BITS
+
+    for feature, weight in features.items():
+        value = _feature_hash(feature)
+        for bit in range(FINGERPRINT_BITS):
+            if value >> bit & 1:
+                weights[bit] += weight
+            else:
+                weights[bit] -= weight
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+
+    return fingerprint
+
+
+def fingerprint_row(row) -> int:
+    return simhash(item_features(row["title"], row["fileurl"]))
+
+
+class SimHashIndex:
+    """In-memory banded index answering "is there a fingerprint within distance d?"."""
+
+    def __init__(self, max_distance=3):
+        self.max_distance = max_distance
+        self.band_count = max_distance + 1
+        self.band_bits = FINGERPRINT_BITS // self.band_count
+        self.band_mask = (1 << self.band_bits) - 1
+        self.bands = [defaultdict(list) for _ in range(self.band_count)]
+        self.size = 0
+
+
+    def _band_keys(self, fingerprint):
+        for band in range(self.band_count):
+            yield band, fingerprint >> (band * self.band_bits) & self.band_mask
+
+
+    def add(self, fingerprint, key):
+        for band, band_key in self._band_keys(fingerprint):
+            self.bands[band][band_key].append((fingerprint, key))
+        self.size += 1
+
+
+    def find(self, fingerprint):
+        """
+        Return (key, distance) of the closest indexed fingerprint within `max_distance`, or None.
+        """
+        best = None
+        for band, band_key in self._band_keys(fingerprint):
+            for candidate, key in self.bands[band].get(band_key, ()):
+                distance = bin(candidate ^ fingerprint).count("1")
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (key, distance)
+                    if distance == 0:
+                        return best
+
+        return best
+
+
+class ContentDeduper:
+    """
+    Persistent near-duplicate filter for one scraped table.
+
+    `mode` is `flag` (insert, but note the duplicate) or `suppress` (skip the insert).
+
+    Parameters:
+        db_name (str): SQLite database holding the scraped table.
+        table_name (str): Scraped table; fingerprints go to `<table_name>_fingerprints`.
+        max_distance (int): Maximum Hamming distance still counted as a duplicate.
+    """
+
+    def __init__(self, db_name, table_name, max_distance=3):
+        self.db_name = db_name
+        self.table = f"{table_name}_fingerprints"
+        self.source_table = table_name
+        self.index = SimHashIndex(max_distance)
+        self.hrefs = set()
+        self.duplicates = 0
+        self.mode = "flag"
+        self.lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    href TEXT PRIMARY KEY,
+                    fingerprint INTEGER NOT NULL,
+                    title TEXT,
+                    date TEXT,
+                    dup_of TEXT,
+                    stored INTEGER NOT NULL DEFAULT 1
+                )
+                """
+            )
+
+            for href, fingerprint, stored in conn.execute(f"SELECT href, fingerprint, stored FROM {self.table}"):
+                if stored:
+                    self.index.add(fingerprint & ((1 << FINGERPRINT_BITS) - 1), href)
+                self.hrefs.add(href)
+
+        logger.info(f"Loaded {self.index.size} content fingerprints from {self.table}")
+
+
+    @contextmanager
+    def _connect(self):
+        # One connection per call: the deduper is used from the pipeline's sink thread
+        conn = sqlite3.connect(self.db_name, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a deduper from the CONTENT_DEDUP* settings, or None when disabled."""
+        mode = getattr(config, "CONTENT_DEDUP", "off")
+        if not mode or mode == "off":
+            return None
+
+        deduper = cls(config.DATABASE, config.TABLE_NAME, getattr(config, "CONTENT_DEDUP_DISTANCE", 3))
+        deduper.mode = mode
+        return deduper
+
+
+    def seen_href(self, href):
+        """True if this exact href was already fingerprinted; checked before any detail fetch."""
+        return href in self.hrefs
+
+
+    def check(self, row):
+        """
+        Fingerprint a row and look for a near-duplicate.
+
+        Returns:
+            tuple (int, str | None): Fingerprint, and href of the duplicated item if any.
+        """
+        fingerprint = fingerprint_row(row)
+        with self.lock:
+            match = self.index.find(fingerprint)
+            if match and match[0] != row["href"]:
+                self.duplicates += 1
+                return (fingerprint, match[0])
+
+        return (fingerprint, None)
+
+
+    def record(self, row, fingerprint, dup_of=None, stored=True):
+        """
+        Persist a row's fingerprint; call once the row's fate is known.
+
+        Parameters:
+            stored (bool): Whether the row was inserted into the scraped table. Only stored
+                        rows are added to the index, so later copies are never flagged as
+                        duplicates of a row that does not exist.
+        """
+        with self.lock:
+            if row["href"] in self.hrefs:
+                return
+
+            # SQLite integers are signed 64-bit
+            signed = fingerprint - (1 << FINGERPRINT_BITS) if fingerprint >> (FINGERPRINT_BITS - 1) else fingerprint
+            with self._connect() as conn:
+                conn.execute(
+                    f"INSERT OR IGNORE INTO {self.table} (href, fingerprint, title, date, dup_of, stored) "
+                    f"VALUES (?, ?, ?, ?, ?, ?)",
+                    (row["href"], signed, row["title"], row["date"], dup_of, int(stored)),
+                )
+
+            if stored:
+                self.index.add(fingerprint, row["href"])
+            self.hrefs.add(row["href"])
+
+
+    def rebuild(self):
+        """Fingerprint every row of the scraped table that is not indexed yet."""
+        added = 0
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT href, title, fileurl, date FROM {self.source_table}").fetchall()
+        for href, title, fileurl, date in rows:
+            row = {"href": href, "title": title, "fileurl": fileurl, "date": date}
+            if not href or href in self.hrefs:
+                continue
+            fingerprint, dup_of = self.check(row)
+            self.record(row, fingerprint, dup_of)
+            added += 1
+
+        logger.info(f"Fingerprinted {added} rows, {self.duplicates} near-duplicates")
+        return added
+
+
+    def cluster_report(self):
+        """
+        Group items into duplicate clusters by following `dup_of` links.
+
+        Returns:
+            list[list[tuple]]: Clusters of (href, date, title), largest first.
+        """
+        parent = {}
+
+        def find(href):
+            while parent.get(href, href) != href:
+                href = parent[href]
+            return href
+
+        items = {}
+        with self._connect() as conn:
+            fingerprints = conn.execute(f"SELECT href, title, date, dup_of FROM {self.table}").fetchall()
+
+        for href, title, date, dup_of in fingerprints:
+            items[href] = (href, date, title)
+            if dup_of:
+                parent[find(href)] = find(dup_of)
+
+        clusters = defaultdict(list)
+        for href in parent:
+            clusters[find(href)].append(items.get(href, (href, "", "")))
+        for root, members in clusters.items():
+            members.append(items.get(root, (root, "", "")))
+
+        return sorted((sorted(set(members)) for members in clusters.values()), key=len, reverse=True)
+
+
+    def close(self):
+        # Connections are opened per call; kept so callers can release the deduper uniformly
+        pass
+
+
+if __name__ == "__main__":
+    import config
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
+
+    parser = argparse.ArgumentParser(description="Near-duplicate detection over scraped items")
+    parser.add_argument("--rebuild", action="store_true", help="fingerprint rows already in the table")
+    parser.add_argument("--report", action="store_true", help="print duplicate clusters")
+    parser.add_argument("--distance", type=int, default=getattr(config, "CONTENT_DEDUP_DISTANCE", 3))
+    args = parser.parse_args()
+
+    deduper = ContentDeduper(config.DATABASE, config.TABLE_NAME, args.distance)
+    try:
+        if args.rebuild:
+            deduper.rebuild()
+
+        if args.report:
+            for number, cluster in enumerate(deduper.cluster_report(), 1):
+                print(f"\nCluster {number} ({len(cluster)} items)")
+                for href, date, title in cluster:
+                    print(f"    {date}  {title}\n        {href}")
+    finally:
+        deduper.close()
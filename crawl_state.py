@@ -0,0 +1,140 @@
+"""
+crawl_state.py
+
+Crash-safe crawl progress journal, so an interrupted run resumes where it stopped:
+- Progress is appended as one JSON line per event (page started, href processed,
+  site finished), which is cheap enough to write for every item
+- On start-up the journal is replayed; if the previous run never logged `run_done`,
+  the crawl resumes at its last site/page and skips hrefs it already processed
+- A run that completes truncates the journal, so the next run starts from page 1
+
+Journal events:
+    {"event": "run_start", "ts": ...}
+    {"event": "page", "site": 0, "page": 3, "existing": 4, "ts": ...}
+    {"event": "href", "href": "..."}
+    {"event": "site_done", "site": 0}
+    {"event": "run_done", "ts": ...}
+"""
+
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlState:
+    def __init__(self, journal_path="state/crawl_journal.jsonl", fsync=True):
+        self.journal_path = journal_path
+        self.fsync = fsync
+        self.site = 0
+        self.page = 1
+        self.existing_records = 0
+        self.processed_hrefs = set()
+        self.resumed = False
+        self._torn_tail = False
+
+        journal_dir = os.path.dirname(self.journal_path)
+        if journal_dir:
+            os.makedirs(journal_dir, exist_ok=True)
+
+        self._replay()
+        self.journal = open(self.journal_path, "a", encoding="utf-8", buffering=1)
+        if self._torn_tail:
+            self.journal.write("\n")
+
+        if self.resumed:
+            logger.warning(
+                f"Resuming interrupted crawl at site {self.site}, page {self.page} "
+                f"({len(self.processed_hrefs)} items already processed)"
+            )
+        else:
+            self._append({"event": "run_start", "ts": time.time()}, sync=True)
+
+
+    @classmethod
+    def from_config(cls, config):
+        """Build the journal from CRAWL_JOURNAL, or None when checkpointing is disabled."""
+        journal_path = getattr(config, "CRAWL_JOURNAL", os.path.join("state", "crawl_journal.jsonl"))
+        if not journal_path:
+            return None
+        return cls(journal_path)
+
+
+    def _replay(self):
+        if not os.path.isfile(self.journal_path):
+            return
+
+        finished = True
+        with open(self.journal_path, encoding="utf-8") as journal:
+            for line in journal:
+                self._torn_tail = not line.endswith("\n")
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write; everything before it is valid
+                    continue
+
+                event = entry.get("event")
+                if event == "run_start":
+                    finished = False
+                    self.site, self.page = 0, 1
+                    self.existing_records = 0
+                    self.processed_hrefs.clear()
+                elif event == "page":
+                    self.site, self.page = entry["site"], entry["page"]
+                    self.existing_records = entry.get("existing", 0)
+                elif event == "href":
+                    self.processed_hrefs.add(entry["href"])
+                elif event == "site_done":
+                    self.site, self.page = entry["site"] + 1, 1
+                elif event == "run_done":
+                    finished = True
+
+        if finished:
+            os.remove(self.journal_path)
+            self.site, self.page = 0, 1
+            self.processed_hrefs.clear()
+        else:
+            self.resumed = True
+
+
+    def _append(self, entry, sync=False):
+        self.journal.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        if sync and self.fsync:
+            self.journal.flush()
+            os.fsync(self.journal.fileno())
+
+
+    def resume_point(self):
+        """
+        Returns:
+            tuple (int, int): Site index and page number to start crawling from.
+        """
+        return (self.site, self.page)
+
+
+    def start_page(self, site, page, existing_records=0):
+        self.site, self.page = site, page
+        self._append({"event": "page", "site": site, "page": page, "existing": existing_records, "ts": time.time()}, sync=True)
+
+
+    def is_processed(self, href):
+        return href in self.processed_hrefs
+
+
+    def mark_processed(self, href):
+        self.processed_hrefs.add(href)
+        self._append({"event": "href", "href": href})
+
+
+    def site_done(self, site):
+        self._append({"event": "site_done", "site": site}, sync=True)
+
+
+    def finish(self):
+        """Mark the run complete; the next run starts from the beginning."""
+        self._append({"event": "run_done", "ts": time.time()}, sync=True)
+        self.journal.close()
+        os.remove(self.journal_path)
@@ -0,0 +1,214 @@
+"""
+db_schema.py
+
+Versioned schema management for the scraper's SQLite table:
+- Migrations are applied in order and recorded per table in `_schema_migrations`,
+  so existing databases created from `config.TABLE_HEADER` upgrade in place
+- `date` stays a `YYYY.MM.DD` TEXT column (it is part of the primary key callers use),
+  and a typed `date_num INTEGER` generated column (YYYYMMDD) is added for range queries
+- Secondary indexes cover lookups by href, by site and by date range; they are
+  recreated on every first call per process if missing (e.g. after a killed bulk load)
+- A `seq` column numbers inserted rows in insert order, for the change feed
+- Columns of optional fields (e.g. `image1_path` / `image2_path` with `IMAGE_STORE`) are
+  added when they first appear in the caller's FIELDNAMES
+
+`database_op()` calls `ensure_schema()` once per database/table per process, so callers
+keep passing plain row dicts.
+
+Usage:
+    python db_schema.py        # migrate config.DATABASE / config.TABLE_NAME and print the version
+"""
+
+import logging
+import sqlite3
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_TABLE = "_schema_migrations"
+
+_migrated = set()
+
+
+def _add_date_num(cursor, table_name):
+    # VIRTUAL generated columns can be added with ALTER TABLE and cost no storage;
+    # they are hidden from PRAGMA table_info, so primary-key discovery is unaffected.
+    cursor.execute(
+        f"""
+        ALTER TABLE {table_name} ADD COLUMN
+        date_num INTEGER GENERATED ALWAYS AS (CAST(replace(date, '.', '') AS INTEGER)) VIRTUAL
+        """
+    )
+
+
+def _add_indexes(cursor, table_name):
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_href ON {table_name} (href)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_site_date ON {table_name} (site, date_num)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_date_num ON {table_name} (date_num)")
+
+
+def _add_missing_fields(cursor, table_name, fieldnames):
+    # Not a versioned migration: fields come and go with the configuration
+    columns = table_columns(cursor, table_name)
+    for field in fieldnames:
+        if field not in columns:
+            cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {field} TEXT")
+            logger.info(f"Added column {field} to {table_name}")
+
+
+def seq_index_name(table_name: str) -> str:
+    """Index the insert trigger's MAX(seq) lookup relies on; bulk loads must keep it."""
+    return f"idx_{table_name}_seq"
+
+
+def _add_seq(cursor, table_name):
+    # Monotonic insert sequence for change_feed.py. Existing rows take their rowid, which
+    # already follows insert order; an AFTER INSERT trigger numbers every later insert
+    # (whichever code path made it), and ignored INSERT OR IGNOREs never fire it.
+    if "seq" not in table_columns(cursor, table_name):
+        cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN seq INTEGER")
+    cursor.execute(f"UPDATE {table_name} SET seq = rowid WHERE seq IS NULL")
+    cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {seq_index_name(table_name)} ON {table_name} (seq)")
+    cursor.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table_name}_seq AFTER INSERT ON {table_name}
+        WHEN NEW.seq IS NULL
+        BEGIN
+            UPDATE {table_name} SET seq = (SELECT COALESCE(MAX(seq), 0) + 1 FROM {table_name})
+            WHERE rowid = NEW.rowid;
+        END
+        """
+    )
+
+
+# (version, description, callable(cursor, table_name)); version 1 is the table as
+# created by `database_op` from `config.TABLE_HEADER`.
+MIGRATIONS = [
+    (2, "typed date_num column", _add_date_num),
+    (3, "secondary indexes on href, site and date", _add_indexes),
+    (4, "insert sequence column for the change feed", _add_seq),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def table_columns(cursor, table_name: str) -> list:
+    """Names of all columns of a table, including hidden generated ones."""
+    return [info[1] for info in cursor.execute(f"PRAGMA TABLE_XINFO({table_name})").fetchall()]
+
+
+def current_version(cursor, table_name: str) -> int:
+    """
+    Schema version recorded for a table.
+
+    Returns:
+        int: 0 if the table does not exist, 1 for a table without recorded migrations.
+    """
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+    ).fetchone()
+    if not exists:
+        return 0
+
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+            table_name TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            description TEXT,
+            applied_at TEXT,
+            PRIMARY KEY (table_name, version)
+        )
+        """
+    )
+    version = cursor.execute(
+        f"SELECT MAX(version) FROM {MIGRATIONS_TABLE} WHERE table_name = ?", (table_name,)
+    ).fetchone()[0]
+
+    return version or 1
+
+
+def ensure_schema(conn: sqlite3.Connection, table_name: str, table_header: str = None, fieldnames: list = None) -> int:
+    """
+    Create the table if needed and apply any pending migrations.
+
+    Cheap to call repeatedly: after the first successful call for a database/table
+    in this process it returns immediately.
+
+    Parameters:
+        conn (sqlite3.Connection): Open connection to the database.
+        table_name (str): Table to manage.
+        table_header (str, optional): Column definitions used when the table does not exist.
+        fieldnames (list, optional): Data fields the caller writes (`config.FIELDNAMES`);
+                    missing ones are added as TEXT columns.
+
+    Returns:
+        int: Schema version after migrating.
+    """
+    db_file = conn.execute("PRAGMA database_list").fetchone()[2]
+    cache_key = (db_file, table_name)
+    if cache_key in _migrated:
+        return SCHEMA_VERSION
+
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+
+    if table_header:
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {table_name} ({table_header})")
+
+    version = current_version(cursor, table_name)
+    if version == 0:
+        return 0
+
+    if "date" not in table_columns(cursor, table_name):
+        # Migrations are written against the FIELDNAMES layout; leave ad-hoc tables alone
+        _migrated.add(cache_key)
+        return version
+
+    for migration_version, description, migrate in MIGRATIONS:
+        if migration_version <= version:
+            continue
+
+        try:
+            migrate(cursor, table_name)
+        except sqlite3.OperationalError as e:
+            if "duplicate column" not in str(e):
+                conn.rollback()
+                logger.error(f"Schema migration {migration_version} ({description}) failed on {table_name}: {e}")
+                _migrated.add(cache_key)
+                return version
+
+        cursor.execute(
+            f"INSERT OR REPLACE INTO {MIGRATIONS_TABLE} VALUES (?, ?, ?, ?)",
+            (table_name, migration_version, description, datetime.now().isoformat()),
+        )
+        conn.commit()
+        version = migration_version
+        logger.info(f"Applied schema migration {version} ({description}) to {table_name}")
+
+    if version >= 3:
+        # Bulk loads (backfill.py) drop the secondary indexes; a load killed before
+        # rebuilding them must not leave the table without them for good
+        _add_indexes(cursor, table_name)
+        conn.commit()
+
+    if fieldnames:
+        _add_missing_fields(cursor, table_name, fieldnames)
+        conn.commit()
+
+    _migrated.add(cache_key)
+    return version
+
+
+if __name__ == "__main__":
+    import config
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
+
+    conn = sqlite3.connect(config.DATABASE)
+    try:
+        version = ensure_schema(conn, config.TABLE_NAME, config.TABLE_HEADER, config.FIELDNAMES)
+    finally:
+        conn.close()
+
+    print(f"{config.DATABASE}:{config.TABLE_NAME} at schema version {version}")
@@ -0,0 +1,260 @@
+"""
+document_index.py
+
+One-pass index of a parsed page, used by ConfigGenerator to pick and check selectors:
+- tag -> nodes, class -> nodes, (tag, class) -> nodes and id -> nodes, all in document
+  order and built in a single walk of the tree
+- Per node: preorder position, end of its subtree, depth and stripped text length, so
+  "is A inside B" is O(1), "how many matches inside B" is O(log n), and the text length
+  `get_text(strip=True)` would give needs no extra walk
+- `count()` / `select()` answer simple selectors (`tag`, `.cls`, `#id`, `tag.cls`,
+  `tag#id`) from the maps and fall back to soupsieve for anything else
+- `unique_selector()` builds the shortest selector matching exactly one node (in the
+  page or inside a container); `group_selector()` the shortest one matching exactly a
+  given set of nodes
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from itertools import combinations
+from bs4 import CData, NavigableString, Tag
+
+IDENT_RE = re.compile(r"^-?[_a-zA-Z][_a-zA-Z0-9-]*$")
+SIMPLE_SELECTOR_RE = re.compile(r"^([a-zA-Z][a-zA-Z0-9-]*)?(?:([.#])(-?[_a-zA-Z][_a-zA-Z0-9-]*))?$")
+
+# Layout-grid classes change with the theme, so they are used only when nothing else works
+UTILITY_PREFIXES = ('col-', 'row-', 'pull-', 'push-')
+
+# Only these string types count towards get_text(), as in bs4 itself
+TEXT_TYPES = (NavigableString, CData)
+
+
+def _is_utility(selector):
+    return any(f".{prefix}" in selector for prefix in UTILITY_PREFIXES)
+
+
+class DocumentIndex:
+    """
+    Selector index of one parsed document.
+
+    Parameters:
+        soup (BeautifulSoup): Parsed page; it must not be modified while the index is used.
+    """
+
+    def __init__(self, soup):
+        self.soup = soup
+        self.nodes = []                       # preorder position -> Tag
+        self.position = {}                    # id(Tag) -> preorder position
+        self.end = []                         # preorder position -> last position in its subtree
+        self.depth = []
+        self.text_lengths = []
+        self.by_tag = defaultdict(list)       # values are preorder positions, ascending
+        self.by_class = defaultdict(list)
+        self.by_tag_class = defaultdict(list)
+        self.by_id = defaultdict(list)
+        self._build()
+
+
+    def _build(self):
+        root_text = [0]
+        # (node, depth, parent position); a (None, position, parent position) entry marks
+        # the end of a subtree
+        stack = [(child, 1, None) for child in reversed(self.soup.contents)]
+
+        while stack:
+            node, depth, parent = stack.pop()
+
+            if node is None:
+                # Close the range and add the subtree's text length to the parent's
+                position = depth
+                self.end[position] = len(self.nodes) - 1
+                if parent is None:
+                    root_text[0] += self.text_lengths[position]
+                else:
+                    self.text_lengths[parent] += self.text_lengths[position]
+                continue
+
+            if not isinstance(node, Tag):
+                if type(node) in TEXT_TYPES:
+                    length = len(node.strip())
+                    if parent is None:
+                        root_text[0] += length
+                    else:
+                        self.text_lengths[parent] += length
+                continue
+
+            position = len(self.nodes)
+            self.nodes.append(node)
+            self.position[id(node)] = position
+            self.end.append(position)
+            self.depth.append(depth)
+            self.text_lengths.append(0)
+
+            self.by_tag[node.name].append(position)
+            for cls in node.get("class", []):
+                self.by_class[cls].append(position)
+                self.by_tag_class[(node.name, cls)].append(position)
+            node_id = node.get("id")
+            if isinstance(node_id, str) and node_id:
+                self.by_id[node_id].append(position)
+
+            stack.append((None, position, parent))
+            stack.extend((child, depth + 1, position) for child in reversed(node.contents))
+
+        self.document_text_length = root_text[0]
+
+
+    def indexed(self, node) -> bool:
+        """True if `node` is a tag of this document."""
+        position = self.position.get(id(node))
+        return position is not None and self.nodes[position] is node
+
+
+    def contains(self, container, node) -> bool:
+        """True if `node` is inside `container` (not `container` itself)."""
+        start = self.position[id(container)]
+        return start < self.position[id(node)] <= self.end[start]
+
+
+    def text_length(self, node) -> int:
+        """Length of `node.get_text(strip=True)`."""
+        return self.text_lengths[self.position[id(node)]]
+
+
+    def node_depth(self, node) -> int:
+        """Number of ancestors of `node`, as `len(list(node.parents))`."""
+        return self.depth[self.position[id(node)]]
+
+
+    def tags(self, *names) -> list:
+        """Tags with any of the given names, in document order."""
+        positions = sorted(position for name in names for position in self.by_tag.get(name, ()))
+        return [self.nodes[position] for position in positions]
+
+
+    def _positions(self, selector):
+        match = SIMPLE_SELECTOR_RE.match(selector.strip())
+        if not match or not any(match.groups()):
+            return None
+
+        tag, kind, value = match.groups()
+        if kind == "#":
+            positions = self.by_id.get(value, [])
+            return [p for p in positions if self.nodes[p].name == tag] if tag else positions
+        if kind == ".":
+            return self.by_tag_class.get((tag, value), []) if tag else self.by_class.get(value, [])
+        return self.by_tag.get(tag, [])
+
+
+    def _count_in(self, positions, container) -> int:
+        if container is None:
+            return len(positions)
+        start = self.position[id(container)]
+        return bisect_right(positions, self.end[start]) - bisect_left(positions, start + 1)
+
+
+    def count(self, selector: str, within=None) -> int:
+        """Number of nodes `selector` matches in the page, or inside the `within` tag."""
+        positions = self._positions(selector)
+        if positions is None:
+            return len((within or self.soup).select(selector))
+        return self._count_in(positions, within)
+
+
+    def select(self, selector: str, within=None) -> list:
+        """Nodes `selector` matches, in document order."""
+        positions = self._positions(selector)
+        if positions is None:
+            return (within or self.soup).select(selector)
+
+        if within is not None:
+            start = self.position[id(within)]
+            positions = positions[bisect_left(positions, start + 1):bisect_right(positions, self.end[start])]
+        return [self.nodes[position] for position in positions]
+
+
+    def select_one(self, selector: str, within=None):
+        found = self.select(selector, within)
+        return found[0] if found else None
+
+
+    def _candidates(self, node):
+        """
+        Yield (selector, positions) pairs that match `node`: single id/class/tag selectors
+        shortest and non-utility first, then two-class selectors (only built if reached).
+        """
+        candidates = []
+
+        node_id = node.get("id")
+        if isinstance(node_id, str) and IDENT_RE.match(node_id):
+            candidates.append((f"#{node_id}", self.by_id[node_id]))
+
+        classes = [cls for cls in node.get("class", []) if IDENT_RE.match(cls)]
+        for cls in classes:
+            candidates.append((f".{cls}", self.by_class[cls]))
+            candidates.append((f"{node.name}.{cls}", self.by_tag_class[(node.name, cls)]))
+
+        candidates.append((node.name, self.by_tag[node.name]))
+
+        candidates.sort(key=lambda candidate: (_is_utility(candidate[0]), len(candidate[0])))
+        yield from candidates
+
+        pairs = sorted(combinations(classes, 2), key=lambda pair: (_is_utility(f".{pair[0]}.{pair[1]}"), len(pair[0] + pair[1])))
+        for first, second in pairs:
+            # Scan the rarer class and check the other one on each node
+            if len(self.by_class[first]) > len(self.by_class[second]):
+                first, second = second, first
+            both = [p for p in self.by_class[first] if second in self.nodes[p].get("class", ())]
+            yield f".{first}.{second}", both
+
+
+    def unique_selector(self, node, within=None, max_depth=4) -> str:
+        """
+        Shortest selector that matches only `node`, in the page or inside `within`.
+
+        When no simple selector is unique, the nearest ancestor (up to `max_depth`
+        levels) with a unique selector anchors a descendant selector.
+
+        Returns:
+            str | None: Selector, or None if no unique one was found.
+        """
+        for selector, positions in self._candidates(node):
+            if self._count_in(positions, within) == 1:
+                return selector
+
+        ancestor = node.parent
+        for _ in range(max_depth):
+            if ancestor is None or ancestor is within or not self.indexed(ancestor):
+                break
+
+            anchor = self.unique_selector(ancestor, within, max_depth=0)
+            if anchor:
+                for selector, positions in self._candidates(node):
+                    if self._count_in(positions, ancestor) == 1:
+                        return f"{anchor} {selector}"
+            ancestor = ancestor.parent
+
+        return None
+
+
+    def group_selector(self, nodes) -> str:
+        """
+        Shortest simple selector matching exactly `nodes`; failing that, the one matching
+        the fewest extra nodes.
+
+        Returns:
+            str | None: Selector, or None if no simple selector matches all of `nodes`.
+        """
+        wanted = {self.position[id(node)] for node in nodes}
+
+        best = None
+        for selector, positions in self._candidates(nodes[0]):
+            if len(positions) < len(wanted) or not wanted.issubset(positions):
+                continue
+            if len(positions) == len(wanted):
+                return selector
+            if best is None or len(positions) < best[1]:
+                best = (selector, len(positions))
+
+        return best[0] if best else None
@@ -0,0 +1,311 @@
+"""
+extraction.py
+
+HTML extraction used by news_scraper.py, kept free of Selenium and driver_config so it
+can run in any thread or worker process:
+- `parse_listing()` turns a listing page into compact item records (title, href, date)
+- `parse_detail()` / `extract_detail()` turn a detail page into a `records.ScrapedRow`
+- `parse_pool()` / `extract_page()` run the same extraction in a process pool
+
+Requires:
+    config.py  - Selectors, providers and field names
+"""
+
+import logging
+import multiprocessing
+import re
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from bs4 import BeautifulSoup, SoupStrainer
+import config
+from logging_setup import init_worker_logging, worker_log_queue
+from records import ScrapedRow
+from title_filter import get_title_filter
+
+logger = logging.getLogger(__name__)
+
+# Fields that can only be filled from the detail page
+DETAIL_FIELDS = ("image1", "image2", "image1_path", "image2_path", "filename", "size", "fileurl")
+# Fields available from the listing page alone
+LISTING_FIELDS = ("date", "site", "title", "href", "process_dt")
+
+
+# Filename `_detail_row` invents when the page has no "File size:" line
+PLACEHOLDER_FILENAME_RE = re.compile(r"^FILE_\d{8}_\d{6}$")
+
+
+def has_placeholder_filename(filename: str) -> bool:
+    """True for an invented `FILE_<timestamp>` filename (or none at all)."""
+    return not filename or bool(PLACEHOLDER_FILENAME_RE.match(filename))
+
+
+def projected_fields(required_fields=None, listing_only=False) -> tuple:
+    """
+    Resolve the fields a run needs.
+
+    Parameters:
+        required_fields (list, optional): Subset of `config.FIELDNAMES`; None means all.
+        listing_only (bool): Restrict to the listing-level fields (freshness sweeps).
+
+    Returns:
+        tuple | None: Needed fields, or None when every field is needed.
+    """
+    if listing_only:
+        return tuple(field for field in LISTING_FIELDS if field in config.FIELDNAMES)
+
+    if not required_fields:
+        return None
+
+    unknown = set(required_fields) - set(config.FIELDNAMES)
+    if unknown:
+        raise ValueError(f"REQUIRED_FIELDS not in FIELDNAMES: {sorted(unknown)}")
+
+    return tuple(field for field in config.FIELDNAMES if field in required_fields)
+
+
+def needs_detail(fields) -> bool:
+    """True if any needed field comes from the detail page (`fields` None means all)."""
+    return fields is None or any(field in DETAIL_FIELDS for field in fields)
+
+
+def listing_row(item: dict) -> ScrapedRow:
+    """Row built from listing data only; detail fields are left empty."""
+    values = {
+        "date": item["date"],
+        "site": item["site"],
+        "title": item["title"],
+        "href": item["href"],
+        "process_dt": datetime.now().strftime("%Y.%m.%d_%H.%M.%S"),
+    }
+    return ScrapedRow(**{field: value for field, value in values.items() if field in ScrapedRow.FIELDS})
+
+
+def parse_listing(page_source: str, streaming: bool = False) -> list:
+    """
+    Extract news items from a listing page.
+
+    The parse tree is decomposed before returning, so only the compact item
+    records outlive this call.
+
+    Parameters:
+        page_source (str): HTML of the listing page.
+        streaming (bool): Only build the tree under `config.PARENT_DIV_CLASS`
+                    (via SoupStrainer) instead of the whole page.
+
+    Returns:
+        list[dict] | None: Items as {"title", "href", "date"} in page order, with dates
+                    normalised to `YYYY.MM.DD` when possible. None if the configured
+                    listing containers are missing.
+    """
+    parse_only = SoupStrainer("div", class_=config.PARENT_DIV_CLASS) if streaming else None
+    soup = BeautifulSoup(page_source, "html.parser", parse_only=parse_only)
+    try:
+        return _listing_items(soup)
+    finally:
+        soup.decompose()
+
+
+def listing_section(soup: BeautifulSoup) -> tuple:
+    """
+    Follow the configured listing containers down to the element holding the items.
+
+    Returns:
+        tuple (Tag | None, str | None): The items' container, or None and the name of
+                    the first container setting that matches nothing.
+    """
+    parent_div = soup.find("div", class_=config.PARENT_DIV_CLASS)
+    if not parent_div:
+        return (None, "PARENT_DIV_CLASS")
+
+    news_section_div = parent_div.find("div", class_=config.NEWS_LIST_DIV_CLASS)
+    if not news_section_div:
+        return (None, "NEWS_LIST_DIV_CLASS")
+
+    news_section = news_section_div.find(config.NEWS_LIST_UL_TAG)
+    if not news_section:
+        return (None, "NEWS_LIST_UL_TAG")
+
+    return (news_section, None)
+
+
+def listing_item(li) -> dict:
+    """Item record ({"title", "href", "date"}) of one listing entry; missing parts are ""."""
+    title_tag = li.find(config.TITLE_A_TAG, title=True)
+    title = title_tag.get(config.TITLE_A_TITLE_ATTR, "").strip() if title_tag else ""
+    href = title_tag.get(config.TITLE_A_HREF_ATTR, "").strip() if title_tag else ""
+    date_span = li.find("span", class_=config.NEWS_DATE_CLASS)
+    date = date_span.get_text(strip=True).replace("/", ".") if date_span else ""
+
+    if date:
+        try:
+            date = datetime.strptime(date, "%d.%m.%Y").strftime("%Y.%m.%d")
+        except ValueError:
+            pass
+
+    return {"title": title, "href": href, "date": date}
+
+
+def _listing_items(soup: BeautifulSoup) -> list:
+    news_section, missing = listing_section(soup)
+    if missing:
+        logger.warning(f"Can't find the listing container ({missing} '{getattr(config, missing)}').")
+        return None
+
+    return [listing_item(li) for li in news_section.find_all(config.NEWS_ITEM_LI_TAG)]
+
+
+def title_allowed(title: str, site: str = None) -> bool:
+    """Apply the configured include/exclude title rules (global plus `site`'s, see title_filter.py)."""
+    return get_title_filter(config, site).allows(title)
+
+
+def parse_detail(item: dict) -> dict:
+    """Parse the fetched detail page of an item, replacing `page_source` with `soup`."""
+    item["soup"] = BeautifulSoup(item.pop("page_source") or "", "html.parser")
+    return item
+
+
+def extract_detail(item: dict) -> dict:
+    """
+    Build a row from a parsed detail page.
+
+    Parameters:
+        item (dict): Listing item with "title", "href", "date", "site" and the parsed "soup".
+                    An optional "fields" entry (see `projected_fields`) skips extracting
+                    detail fields the run does not need; "title_from_page" takes the
+                    title from the page and applies the title filter to it.
+
+    Returns:
+        ScrapedRow | None: Row with the `config.FIELDNAMES` fields, or None when the
+                    detail content div is missing.
+    """
+    title, href, date, site = item["title"], item["href"], item["date"], item["site"]
+    wanted = item.get("fields") or DETAIL_FIELDS
+
+    # BeautifulSoup trees are full of parent/sibling cycles; decompose as soon as the
+    # row is built so detail pages do not wait for the cycle collector
+    detail_soup = item.pop("soup")
+    try:
+        if item.get("title_from_page"):
+            # Feed entries without a title (plain sitemaps) take the page's and are filtered now
+            title = detail_soup.title.get_text(strip=True) if detail_soup.title else ""
+            if not title_allowed(title, site):
+                return None
+        return _detail_row(detail_soup, title, href, date, site, wanted)
+    finally:
+        detail_soup.decompose()
+
+
+def _detail_row(detail_soup: BeautifulSoup, title: str, href: str, date: str, site: str, wanted: tuple) -> dict:
+    news_div = detail_soup.find("div", class_=config.DETAIL_NEWS_DIV_CLASS)
+    if not news_div:
+        return None
+
+    image1 = ""
+    if "image1" in wanted:
+        img1_tag = news_div.find("div", class_=config.DETAIL_IMAGE1_DIV_CLASS)
+        image1 = img1_tag.find(config.DETAIL_IMAGE1_IMG_TAG)["src"] if img1_tag and img1_tag.find(config.DETAIL_IMAGE1_IMG_TAG) else ""
+
+    image2 = ""
+    if "image2" in wanted:
+        img2_div = news_div.find("div", class_=config.DETAIL_IMAGE2_DIV_CLASS)
+        if img2_div and img2_div.find("img"):
+            image2 = img2_div.find("img").get("src", "")
+
+    filename, size = "", ""
+    for txt in (news_div.stripped_strings if "filename" in wanted or "size" in wanted else ()):
+        if txt.startswith(config.FILE_SIZE_PREFIX):
+            parts = txt[len(config.FILE_SIZE_PREFIX):].split(":")
+            if len(parts) >= 2:
+                filename = parts[0].strip()
+                size = parts[1].strip()
+
+    # Filled in by the image store stage when it is enabled
+    image1_path, image2_path = "", ""
+
+    process_dt = datetime.now().strftime("%Y.%m.%d_%H.%M.%S")
+
+    if not filename or filename == '':
+        filename = f"FILE_{process_dt.replace('.', '')}"
+
+    fileurl = ""
+    if "fileurl" in wanted:
+        fileurl_dict = {}
+        for p in config.FILE_PROVIDERS:
+            file_list = []
+            for a in news_div.find_all("a", href=True):
+                if p in a["href"]:
+                    file_list.append(a["href"])
+            fileurl_dict[p] = file_list
+
+        fileurl = "; ".join(f"{k}: {v}" for k, v in fileurl_dict.items())
+
+    row = None
+    try:
+        row = ScrapedRow.from_mapping(locals())
+    except Exception as e:
+        try:
+            row = ScrapedRow(**eval(config.ROW_HARDCODE))
+            logger.info(
+                f"Issue with {str(e)}. Using Hardcode: {{"
+                + ", ".join(
+                    f"{key}: {value}" if len(value) < 20 else f"{key}: {value[:20]}..."
+                    for key, value in row.items()
+                )
+                + "}"
+            )
+        except Exception:
+            logger.error("Unknown error in row hardcode")
+
+    return row
+
+
+def init_parse_worker(log_queue=None, level=logging.INFO) -> None:
+    """
+    Process pool initializer for parse workers.
+
+    SIGINT is ignored so Ctrl+C is handled by the parent, which drains the pool. Log
+    records go to the parent through `log_queue` (see logging_setup.worker_log_queue).
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if log_queue is not None:
+        init_worker_logging(log_queue, level, stage="parse")
+
+
+def parse_pool(processes: int) -> ProcessPoolExecutor:
+    """
+    Process pool of parse workers running `extract_page`.
+
+    Workers are started by the forkserver (spawn where it is unavailable), never forked
+    from the scraper itself: by the time the pool is needed, logging, pipeline and
+    governor threads are running, and a fork can copy one of their locks while held.
+    The forkserver preloads this module, so config and the parser are imported once.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(method)
+    if method == "forkserver":
+        context.set_forkserver_preload(["extraction"])
+
+    return ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=context,
+        initializer=init_parse_worker,
+        initargs=(worker_log_queue(context), logging.getLogger().getEffectiveLevel()),
+    )
+
+
+def extract_page(page_bytes: bytes, item: dict) -> dict:
+    """
+    Parse and extract one detail page inside a parse worker process.
+
+    Parameters:
+        page_bytes (bytes): UTF-8 encoded page source. Bytes pickle without re-encoding,
+                    and only the compact row travels back to the parent.
+        item (dict): Listing item with "title", "href", "date" and "site".
+
+    Returns:
+        ScrapedRow | None: Row as returned by `extract_detail`.
+    """
+    item["soup"] = BeautifulSoup(page_bytes, "html.parser", from_encoding="utf-8")
+    return extract_detail(item)
@@ -0,0 +1,288 @@
+"""
+feed_discovery.py
+
+Feed-first discovery of new items, before any listing page is rendered in Chrome:
+- Reads RSS 2.0, Atom, sitemap and sitemap-index documents (gzip or plain) with
+  `iterparse`, so large sitemaps are streamed and never held in memory as a tree
+- Yields items newer than the per-feed watermark, as the same {"title", "href",
+  "date"} records `extraction.parse_listing()` produces
+- Downloads go through the shared keep-alive pool (http_pool.py), paced by the per-host
+  rate limiter; conditional GETs (ETag / Last-Modified) make an unchanged feed a single 304
+- The watermark is only advanced by `commit()`, after the items were handled, so an
+  interrupted run sees the same items again
+- Entries that cannot be told apart by date (plain sitemaps without lastmod) and whose
+  page gave no row are remembered via `reject()`, so their pages are not loaded again
+
+Sites whose feed is missing or unreadable fall back to the `WEBSITES` pagination crawl.
+"""
+
+import gzip
+import io
+import json
+import logging
+import os
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import urllib3
+from http_pool import request
+
+logger = logging.getLogger(__name__)
+
+# Element names (namespace stripped) that close one item in each format
+ITEM_TAGS = ("item", "entry", "url")
+DATE_TAGS = ("pubDate", "published", "updated", "lastmod", "publication_date", "date")
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_date(value: str) -> float:
+    """
+    Timestamp of an RSS (RFC 822) or Atom/sitemap (ISO 8601, W3C) date.
+
+    Returns:
+        float | None: POSIX timestamp, or None if unparseable. Dates without a
+                    timezone are taken as UTC.
+    """
+    if not value:
+        return None
+    value = value.strip()
+
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def iter_feed(stream):
+    """
+    Stream entries from an RSS, Atom or sitemap document.
+
+    Yields:
+        dict: {"title", "href", "published" (timestamp or None)} per item, or
+              {"sitemap", "published"} for each child of a sitemap index.
+    """
+    title = href = published = None
+    in_item = False
+
+    for event, element in ET.iterparse(stream, events=("start", "end")):
+        tag = _local(element.tag)
+
+        if event == "start":
+            if tag in ITEM_TAGS or tag == "sitemap":
+                title = href = published = None
+                in_item = True
+            continue
+
+        if not in_item:
+            # Channel/feed level elements (feed title, logo, ...) are not items
+            if tag in ("channel", "feed", "urlset", "sitemapindex"):
+                element.clear()
+            continue
+
+        if tag == "title" and title is None:
+            title = (element.text or "").strip()
+        elif tag == "link":
+            # Atom links carry the URL in href (prefer rel="alternate"); RSS in the text
+            if element.get("href"):
+                if element.get("rel", "alternate") == "alternate":
+                    href = element.get("href")
+            elif element.text:
+                href = element.text.strip()
+        elif tag == "loc" and href is None:
+            # The first <loc> is the page; image/video extensions add their own <loc>s
+            href = (element.text or "").strip()
+        elif tag in DATE_TAGS and published is None:
+            published = parse_date(element.text)
+        elif tag == "sitemap":
+            if href:
+                yield {"sitemap": href, "published": published}
+            in_item = False
+            element.clear()
+        elif tag in ITEM_TAGS:
+            if href:
+                yield {"title": title or "", "href": href, "published": published}
+            in_item = False
+            element.clear()
+
+
+class FeedDiscovery:
+    """
+    Per-feed watermarks and conditional fetch state.
+
+    Parameters:
+        state_path (str): JSON file holding watermarks, ETags and Last-Modified values.
+        limiter (HostRateLimiter, optional): Paces feed downloads with the page loads
+                    (default: the shared limiter).
+        timeout (float): Download timeout in seconds.
+        max_sitemaps (int): Child sitemaps followed per sitemap index.
+    """
+
+    def __init__(self, state_path="state/feed_watermarks.json", limiter=None, timeout=30, max_sitemaps=50):
+        self.state_path = state_path
+        self.limiter = limiter
+        self.timeout = timeout
+        self.max_sitemaps = max_sitemaps
+        self.lock = threading.Lock()
+
+        try:
+            with open(self.state_path, encoding="utf-8") as state:
+                self.state = json.load(state)
+        except (OSError, ValueError):
+            self.state = {}
+
+
+    @classmethod
+    def from_config(cls, config, limiter=None):
+        """
+        Build from the FEED_* settings.
+
+        Returns:
+            FeedDiscovery or None: None when no site has a feed configured.
+        """
+        if not any(getattr(config, "FEED_URLS", None) or []):
+            return None
+
+        return cls(
+            state_path=getattr(config, "FEED_STATE", os.path.join("state", "feed_watermarks.json")),
+            limiter=limiter,
+            max_sitemaps=getattr(config, "FEED_MAX_SITEMAPS", 50),
+        )
+
+
+    def _open(self, url, conditional=False):
+        """
+        Returns:
+            tuple: (stream, response); stream is None when the feed is unchanged (304).
+                    The caller releases the response.
+        """
+        headers = {"Accept-Encoding": "gzip"}
+        cached = self.state.get(url, {})
+        if conditional:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = request("GET", url, headers=headers, timeout=self.timeout, limiter=self.limiter)
+        if response.status == 304:
+            return None, response
+        if response.status >= 400:
+            response.release_conn()
+            raise OSError(f"HTTP {response.status}")
+
+        # urllib3 undoes Content-Encoding; a .gz sitemap is still gzip inside. auto_close off:
+        # the buffer must not see the response as closed at EOF, before it is drained
+        response.auto_close = False
+        stream = io.BufferedReader(response)
+        if stream.peek(2)[:2] == b"\x1f\x8b":
+            stream = gzip.GzipFile(fileobj=stream)
+        return stream, response
+
+
+    def entries(self, feed_url) -> tuple:
+        """
+        Items of `feed_url` newer than its watermark.
+
+        Items without a date are always returned; callers skip hrefs they already have.
+
+        Returns:
+            tuple (list[dict], float) | None: Items as {"title", "href", "date"} (newest
+                    first) and the watermark to `commit()` once they are handled.
+                    Empty when the feed is unchanged (HTTP 304). None when the feed
+                    could not be read, so the caller falls back to page crawling.
+        """
+        watermark = self.state.get(feed_url, {}).get("watermark", 0)
+        rejected = set(self.state.get(feed_url, {}).get("rejected", ()))
+        newest = watermark
+        items = []
+        pending = [feed_url]
+        followed = 0
+
+        try:
+            while pending:
+                url = pending.pop(0)
+                stream, response = self._open(url, conditional=(url == feed_url))
+                try:
+                    if stream is None:
+                        logger.info(f"Feed unchanged: {url}")
+                        continue
+
+                    for entry in iter_feed(stream):
+                        published = entry["published"]
+                        if published is not None and published <= watermark:
+                            continue
+
+                        if "sitemap" in entry:
+                            if followed < self.max_sitemaps:
+                                pending.append(entry["sitemap"])
+                                followed += 1
+                            continue
+
+                        if entry["href"] in rejected:
+                            continue
+
+                        newest = max(newest, published or 0)
+                        items.append({
+                            "title": entry["title"],
+                            "href": entry["href"],
+                            "date": datetime.fromtimestamp(published).strftime("%Y.%m.%d") if published else "",
+                        })
+
+                    if url == feed_url:
+                        self.state.setdefault(feed_url, {}).update(
+                            etag=response.headers.get("ETag"),
+                            last_modified=response.headers.get("Last-Modified"),
+                        )
+                finally:
+                    response.drain_conn()
+                    response.release_conn()
+        except (OSError, ET.ParseError, urllib3.exceptions.HTTPError) as e:
+            logger.warning(f"Feed unavailable, falling back to page crawl: {feed_url} ({e})")
+            return None
+
+        items.sort(key=lambda item: item["date"], reverse=True)
+        logger.info(f"Feed {feed_url}: {len(items)} new item(s)")
+        return items, newest
+
+
+    def reject(self, feed_url, href) -> None:
+        """
+        Remember an entry whose page gave no row (e.g. its page title is filtered out), so
+        it is skipped from now on; undated entries are otherwise returned on every run.
+        Saved by the next `commit()`. Called from pipeline threads.
+        """
+        with self.lock:
+            rejected = self.state.setdefault(feed_url, {}).setdefault("rejected", [])
+            if href not in rejected:
+                rejected.append(href)
+
+
+    def commit(self, feed_url, watermark) -> None:
+        """Store the feed's new watermark (and the ETag/Last-Modified of the last fetch)."""
+        with self.lock:
+            self.state.setdefault(feed_url, {})["watermark"] = watermark
+
+            if os.path.dirname(self.state_path):
+                os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+
+            temp_path = f"{self.state_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as state:
+                json.dump(self.state, state, indent=2)
+            os.replace(temp_path, self.state_path)
+
+
+def feed_url_for(config, site_index) -> str:
+    """Configured feed URL for a site (aligned with `config.WEBSITES`), or None."""
+    feed_urls = getattr(config, "FEED_URLS", None) or []
+    return feed_urls[site_index] if site_index < len(feed_urls) else None
@@ -0,0 +1,59 @@
+"""
+http_pool.py
+
+Shared keep-alive HTTP client for the plain-HTTP helpers (link resolver, image store):
+- One urllib3 `PoolManager` per process (urllib3 is installed with selenium), so
+  connections to a host are reused across requests and threads
+- Every request is paced and adapted by the shared per-host rate limiter
+"""
+
+import threading
+import time
+import urllib3
+from rate_limiter import get_shared_limiter, USER_AGENT
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(maxsize=8) -> urllib3.PoolManager:
+    """Process-wide connection pool; `maxsize` connections are kept per host (first call only)."""
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = urllib3.PoolManager(
+                num_pools=64,
+                maxsize=maxsize,
+                block=False,
+                headers={"User-Agent": USER_AGENT},
+                retries=urllib3.Retry(total=2, connect=2, read=1, redirect=5, status=0),
+            )
+        return _pool
+
+
+def request(method, url, headers=None, timeout=15, limiter=None, **kwargs):
+    """
+    Issue a paced request through the shared pool.
+
+    The response is not preloaded: read or stream it, then call `release_conn()`.
+
+    Parameters:
+        limiter (HostRateLimiter, optional): Defaults to the shared limiter.
+        **kwargs: Passed to `PoolManager.request` (e.g. `redirect`).
+
+    Returns:
+        urllib3.HTTPResponse
+    """
+    limiter = limiter or get_shared_limiter()
+    limiter.acquire(url)
+
+    # Per-request headers replace the pool's defaults instead of adding to them
+    headers = {"User-Agent": USER_AGENT, **(headers or {})}
+
+    started = time.monotonic()
+    response = get_pool().request(
+        method, url, headers=headers, timeout=timeout, preload_content=False, **kwargs
+    )
+    limiter.feedback(url, time.monotonic() - started, response.status, response.headers.get("Retry-After"))
+    return response
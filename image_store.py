@@ -0,0 +1,330 @@
+"""
+image_store.py
+
+Optional local mirror of the images found on detail pages (`image1` / `image2`):
+- Images are stored content-addressed as `<root>/<sha[:2]>/<sha256>.<ext>`, so an image
+  shared by many articles (or served from several URLs) is stored once
+- Downloads run concurrently over the shared keep-alive HTTP pool; an interrupted
+  download is kept as `<root>/.partial/<url hash>.part` and resumed with a `Range` request
+- A SQLite index maps URLs to blobs and tracks last access, and the store is trimmed in
+  LRU order whenever it grows past its byte budget
+- The pipeline's "images" stage writes the local paths into `image1_path` / `image2_path`;
+  evicting an image clears those columns in the scraped table's rows that point to it
+"""
+
+import hashlib
+import logging
+import mimetypes
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urljoin, urlparse
+from http_pool import request
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FIELDS = (("image1", "image1_path"), ("image2", "image2_path"))
+CHUNK_SIZE = 64 * 1024
+
+
+class ImageStore:
+    """
+    Content-addressed image store with resumable downloads and an LRU byte budget.
+
+    Parameters:
+        root (str): Store directory.
+        max_bytes (int): Disk budget for stored images.
+        workers (int): Concurrent downloads.
+        timeout (float): Seconds per request.
+        max_image_bytes (int): Larger images are abandoned.
+        db_name (str, optional): Database of the scraped table whose image paths are
+                    cleared when their images are evicted.
+        table_name (str, optional): Scraped table in `db_name`.
+    """
+
+    def __init__(self, root="Outputs/images", max_bytes=2 * 1024 ** 3, workers=8, timeout=30,
+                 max_image_bytes=50 * 1024 ** 2, db_name=None, table_name=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.max_image_bytes = max_image_bytes
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="images")
+        self.partial_dir = os.path.join(self.root, ".partial")
+        self.index_path = os.path.join(self.root, "index.db")
+        self.db_name = db_name
+        self.table_name = table_name
+        # One download per URL at a time; later callers wait, then find it in the index.
+        # Entries are [lock, users] and are dropped when the last user is done.
+        self.url_locks = {}
+        self.lock = threading.Lock()
+        self.downloaded = 0
+        self.reused = 0
+        self.failed = 0
+
+        os.makedirs(self.partial_dir, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS blobs (
+                    hash TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, hash TEXT NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_blobs_last_access ON blobs (last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_urls_hash ON urls (hash)")
+
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build from the IMAGE_STORE* settings.
+
+        Returns:
+            ImageStore or None: None when `IMAGE_STORE` is off.
+        """
+        if not getattr(config, "IMAGE_STORE", False):
+            return None
+
+        return cls(
+            root=getattr(config, "IMAGE_STORE_DIR", os.path.join("Outputs", "images")),
+            max_bytes=getattr(config, "IMAGE_STORE_MAX_BYTES", 2 * 1024 ** 3),
+            workers=getattr(config, "IMAGE_STORE_WORKERS", 8),
+            timeout=getattr(config, "IMAGE_STORE_TIMEOUT", 30),
+            db_name=config.DATABASE,
+            table_name=config.TABLE_NAME,
+        )
+
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+
+    @contextmanager
+    def _url_lock(self, url):
+        with self.lock:
+            entry = self.url_locks.setdefault(url, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self.lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self.url_locks[url]
+
+
+    def lookup(self, url) -> str:
+        """Local path of an already stored image URL (touching it for LRU), or None."""
+        with self._connect() as conn:
+            entry = conn.execute(
+                "SELECT blobs.hash, blobs.path FROM urls JOIN blobs ON blobs.hash = urls.hash WHERE urls.url = ?",
+                (url,),
+            ).fetchone()
+            if not entry:
+                return None
+            if not os.path.isfile(entry[1]):
+                conn.execute("DELETE FROM blobs WHERE hash = ?", (entry[0],))
+                return None
+            conn.execute("UPDATE blobs SET last_access = ? WHERE hash = ?", (time.time(), entry[0]))
+        return entry[1]
+
+
+    def fetch(self, url) -> str:
+        """
+        Local path of the image at `url`, downloading it if needed.
+
+        Returns:
+            str | None: Path of the stored image, or None if it could not be downloaded.
+        """
+        if not url:
+            return None
+
+        with self._url_lock(url):
+            path = self.lookup(url)
+            if path:
+                with self.lock:
+                    self.reused += 1
+                return path
+
+            try:
+                path = self._download(url)
+            except Exception as e:
+                logger.warning(f"Image download failed for {url}: {e}")
+                path = None
+
+        with self.lock:
+            if path:
+                self.downloaded += 1
+            else:
+                self.failed += 1
+        return path
+
+
+    def _download(self, url):
+        partial_path = os.path.join(self.partial_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".part")
+        offset = os.path.getsize(partial_path) if os.path.exists(partial_path) else 0
+
+        headers = {"Range": f"bytes={offset}-"} if offset else None
+        response = request("GET", url, headers=headers, timeout=self.timeout)
+        try:
+            if response.status == 416:
+                # The partial file already holds the whole image
+                pass
+            elif response.status == 206 and offset:
+                self._append(response, partial_path, "ab", offset)
+            elif response.status == 200:
+                self._append(response, partial_path, "wb", 0)
+            else:
+                raise OSError(f"HTTP {response.status}")
+            content_type = response.headers.get("Content-Type", "")
+        finally:
+            response.release_conn()
+
+        digest = hashlib.sha256()
+        with open(partial_path, "rb") as partial:
+            for chunk in iter(lambda: partial.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        image_hash = digest.hexdigest()
+
+        size = os.path.getsize(partial_path)
+
+        with self._connect() as conn:
+            stored = conn.execute("SELECT path FROM blobs WHERE hash = ?", (image_hash,)).fetchone()
+            if stored and os.path.isfile(stored[0]):
+                # Same content already stored under another URL
+                path = stored[0]
+                os.remove(partial_path)
+            else:
+                path = os.path.join(self.root, image_hash[:2], image_hash + _extension(url, content_type))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(partial_path, path)
+
+            conn.execute(
+                "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?)", (image_hash, path, size, time.time())
+            )
+            conn.execute("INSERT OR REPLACE INTO urls VALUES (?, ?)", (url, image_hash))
+
+        self.evict()
+        return path
+
+
+    def _append(self, response, partial_path, mode, offset):
+        written = offset
+        with open(partial_path, mode) as partial:
+            for chunk in response.stream(CHUNK_SIZE):
+                written += len(chunk)
+                if written > self.max_image_bytes:
+                    partial.close()
+                    os.remove(partial_path)
+                    raise OSError(f"image larger than {self.max_image_bytes} bytes")
+                partial.write(chunk)
+
+
+    def evict(self) -> int:
+        """
+        Delete least recently used images until the store fits its byte budget.
+
+        Returns:
+            int: Number of images removed.
+        """
+        removed = []
+        with self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+
+            for image_hash, path, size in conn.execute(
+                "SELECT hash, path, size FROM blobs ORDER BY last_access"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                conn.execute("DELETE FROM blobs WHERE hash = ?", (image_hash,))
+                conn.execute("DELETE FROM urls WHERE hash = ?", (image_hash,))
+                total -= size
+                removed.append(path)
+
+        if removed:
+            logger.info(f"Image store over budget, evicted {len(removed)} image(s)")
+            self._clear_row_paths(removed)
+        return len(removed)
+
+
+    def _clear_row_paths(self, paths) -> None:
+        # Stored rows must not keep pointing at deleted files; they get the image again
+        # (and a new path) only if their page is scraped again
+        if not self.db_name or not self.table_name or not os.path.isfile(self.db_name):
+            return
+
+        conn = sqlite3.connect(self.db_name, timeout=30)
+        try:
+            for start in range(0, len(paths), 500):
+                batch = paths[start:start + 500]
+                placeholders = ", ".join("?" * len(batch))
+                for _, path_field in IMAGE_FIELDS:
+                    conn.execute(
+                        f"UPDATE {self.table_name} SET {path_field} = '' WHERE {path_field} IN ({placeholders})",
+                        batch,
+                    )
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            # No such table or path columns yet: nothing points at the images
+            logger.debug(f"Image paths not cleared in {self.table_name}: {e}")
+        finally:
+            conn.close()
+
+
+    def mirror(self, row):
+        """
+        Pipeline stage: download a row's images concurrently and record their local paths.
+
+        Paths are written to `image1_path` / `image2_path` when the row type has them.
+        """
+        if row is None:
+            return row
+
+        futures = {
+            path_field: self.executor.submit(self.fetch, urljoin(row["href"], row[field]))
+            for field, path_field in IMAGE_FIELDS
+            if field in row and row[field]
+        }
+        for path_field, future in futures.items():
+            path = future.result()
+            if path and path_field in row:
+                row[path_field] = path
+
+        return row
+
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"downloaded": self.downloaded, "reused": self.reused, "failed": self.failed}
+
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+
+
+def _extension(url, content_type) -> str:
+    extension = os.path.splitext(urlparse(url).path)[1].lower()
+    if extension in (".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif", ".bmp", ".svg"):
+        return extension
+    return mimetypes.guess_extension(content_type.split(";")[0].strip()) or ""
@@ -0,0 +1,265 @@
+"""
+link_resolver.py
+
+Optional resolver that fills `filename` and `size` of a row from its FILE_PROVIDERS links:
+- Links are probed with HEAD, or a one-byte `Range` GET when HEAD is refused or gives no
+  length; no file bodies are downloaded
+- Filenames come from `Content-Disposition`, else from the final URL after redirects;
+  sizes from `Content-Length` / `Content-Range`
+- Probes run concurrently on a thread pool over the shared keep-alive HTTP pool, with a
+  per-provider concurrency limit, and results are cached in SQLite with a TTL
+- Runs as its own pipeline stage, so the listing loop never waits on it
+
+Only rows whose page gave no `File size:` line (placeholder filename or empty size) are
+resolved.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import unquote, urlparse
+from http_pool import request
+from extraction import has_placeholder_filename
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_RE = re.compile(r"(\S+?): \[([^\]]*)\]")
+LINK_RE = re.compile(r"'([^']+)'")
+FILENAME_RE = re.compile(r"filename\*\s*=\s*(?:UTF-8|utf-8)?''([^;]+)|filename\s*=\s*\"?([^\";]+)\"?", re.IGNORECASE)
+CONTENT_RANGE_RE = re.compile(r"/(\d+)\s*$")
+
+
+def file_links(fileurl: str) -> list:
+    """
+    Provider links from a row's `fileurl` ("provider: ['url', ...]; ..." as built by extraction).
+
+    Returns:
+        list[tuple]: (provider, url) pairs in provider order.
+    """
+    return [
+        (provider, url)
+        for provider, links in PROVIDER_RE.findall(fileurl or "")
+        for url in LINK_RE.findall(links)
+    ]
+
+
+def format_size(size: int) -> str:
+    """Human readable size, e.g. 1.46 GB."""
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.2f} {unit}"
+        value /= 1024
+
+
+def _filename(response, url) -> str:
+    disposition = response.headers.get("Content-Disposition", "")
+    match = FILENAME_RE.search(disposition)
+    if match:
+        return unquote(match.group(1) or match.group(2)).strip()
+
+    # Without a disposition header, only trust a last path segment that looks like a file
+    final_url = response.geturl() or url
+    name = unquote(os.path.basename(urlparse(final_url).path))
+    return name if "." in name else ""
+
+
+def _size(response) -> int:
+    content_range = CONTENT_RANGE_RE.search(response.headers.get("Content-Range", ""))
+    if content_range:
+        return int(content_range.group(1))
+
+    length = response.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() and response.status == 200 else None
+
+
+class LinkResolver:
+    """
+    Concurrent HEAD/range prober with a per-provider limit and a SQLite result cache.
+
+    Parameters:
+        workers (int): Probe threads shared by all rows.
+        per_provider (int): Concurrent probes allowed per provider.
+        timeout (float): Seconds per request.
+        cache_path (str): SQLite cache file (None for an in-memory cache only).
+        cache_ttl (float): Seconds a cached result is reused.
+    """
+
+    def __init__(self, workers=16, per_provider=2, timeout=15, cache_path="state/link_cache.db", cache_ttl=7 * 86400):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="resolve")
+        self.per_provider = per_provider
+        self.timeout = timeout
+        self.cache_path = cache_path
+        self.cache_ttl = cache_ttl
+        self.limits = {}
+        self.lock = threading.Lock()
+        self.memory = {}
+        self.resolved = 0
+        self.cached = 0
+        self.failed = 0
+
+        if self.cache_path:
+            if os.path.dirname(self.cache_path):
+                os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS links (
+                        url TEXT PRIMARY KEY,
+                        filename TEXT,
+                        size INTEGER,
+                        checked_at REAL NOT NULL
+                    )
+                    """
+                )
+
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build from the LINK_RESOLVER* settings.
+
+        Returns:
+            LinkResolver or None: None when `LINK_RESOLVER` is off.
+        """
+        if not getattr(config, "LINK_RESOLVER", False):
+            return None
+
+        return cls(
+            workers=getattr(config, "LINK_RESOLVER_WORKERS", 16),
+            per_provider=getattr(config, "LINK_RESOLVER_PER_PROVIDER", 2),
+            timeout=getattr(config, "LINK_RESOLVER_TIMEOUT", 15),
+            cache_path=getattr(config, "LINK_RESOLVER_CACHE", os.path.join("state", "link_cache.db")),
+            cache_ttl=getattr(config, "LINK_RESOLVER_CACHE_TTL", 7 * 86400),
+        )
+
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.cache_path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+
+    def _cached(self, url):
+        entry = self.memory.get(url)
+        if entry is None and self.cache_path:
+            with self._connect() as conn:
+                entry = conn.execute("SELECT filename, size, checked_at FROM links WHERE url = ?", (url,)).fetchone()
+        if entry and time.time() - entry[2] <= self.cache_ttl:
+            return entry[:2]
+        return None
+
+
+    def _store(self, url, filename, size):
+        entry = (filename, size, time.time())
+        self.memory[url] = entry
+        if self.cache_path:
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO links VALUES (?, ?, ?, ?)", (url,) + entry)
+
+
+    def _limit(self, provider):
+        with self.lock:
+            limit = self.limits.get(provider)
+            if limit is None:
+                limit = self.limits[provider] = threading.BoundedSemaphore(self.per_provider)
+            return limit
+
+
+    def probe(self, provider, url) -> tuple:
+        """
+        Filename and size of one link, from the cache or the network.
+
+        Returns:
+            tuple (str, int | None): Filename ("" if unknown) and size in bytes.
+        """
+        cached = self._cached(url)
+        if cached:
+            with self.lock:
+                self.cached += 1
+            return cached
+
+        filename, size = "", None
+        with self._limit(provider):
+            try:
+                response = request("HEAD", url, timeout=self.timeout)
+                try:
+                    if response.status < 400:
+                        filename, size = _filename(response, url), _size(response)
+                finally:
+                    response.release_conn()
+
+                if size is None:
+                    # HEAD refused or without a length: ask for the first byte only
+                    response = request("GET", url, headers={"Range": "bytes=0-0"}, timeout=self.timeout)
+                    try:
+                        if response.status in (200, 206):
+                            filename = filename or _filename(response, url)
+                            size = _size(response)
+                    finally:
+                        # A 200 means the range was ignored; close rather than read the body
+                        if response.status == 206:
+                            response.drain_conn()
+                        else:
+                            response.close()
+                        response.release_conn()
+            except Exception as e:
+                logger.debug(f"Link probe failed for {url}: {e}")
+                with self.lock:
+                    self.failed += 1
+                return "", None
+
+        self._store(url, filename, size)
+        with self.lock:
+            self.resolved += 1
+        return filename, size
+
+
+    def resolve(self, row):
+        """
+        Pipeline stage: fill a placeholder filename and empty size from the row's links.
+
+        All links of the row are probed concurrently; the first link (in provider order)
+        that gives a size wins.
+        """
+        if row is None or not (has_placeholder_filename(row["filename"]) or not row["size"]):
+            return row
+
+        links = file_links(row["fileurl"])
+        if not links:
+            return row
+
+        futures = [self.executor.submit(self.probe, provider, url) for provider, url in links]
+        for future in futures:
+            filename, size = future.result()
+            if size is None:
+                continue
+
+            if has_placeholder_filename(row["filename"]) and filename:
+                row["filename"] = filename
+            if not row["size"]:
+                row["size"] = format_size(size)
+            break
+
+        for future in futures:
+            future.cancel()
+
+        return row
+
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"resolved": self.resolved, "cached": self.cached, "failed": self.failed}
+
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,204 @@
+"""
+logging_setup.py
+
+Non-blocking, structured logging for the scraper:
+- Every logger writes into a `QueueHandler`; a single `QueueListener` thread does the
+  file and console I/O, so the crawl never waits on disk
+- The log file keeps the `LOG_DIR/YYYY.MM/<run timestamp>.log` layout, rotates by size,
+  and holds one JSON object per line with `event`, `stage`, `site` and `page` fields
+- Per-row messages can be tagged with an `event` name and rate limited per event, with
+  a summary of how many messages were suppressed
+- Worker processes (parse pool) send their records back over a multiprocessing queue,
+  so they reach the same file and console as the parent's
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+_context = {}
+_listener = None
+_worker_queue = None
+_worker_listener = None
+
+
+def set_log_context(**fields) -> None:
+    """Set process-wide fields (e.g. site, page) attached to every following log event."""
+    for key, value in fields.items():
+        if value is None:
+            _context.pop(key, None)
+        else:
+            _context[key] = value
+
+
+class ContextFilter(logging.Filter):
+    """Attach the run context and the pipeline stage (from the worker thread name) to records."""
+
+    def filter(self, record):
+        fields = dict(_context)
+        fields.update(getattr(record, "fields", None) or {})
+        if "stage" not in fields:
+            fields["stage"] = record.threadName.split("-")[0]
+        record.fields = fields
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let at most `limit` records per `window` seconds through for each rate-limited event.
+
+    Parameters:
+        limits (dict): {event: (limit, window_seconds)}. Records without a matching
+                    `event` are never limited.
+    """
+
+    def __init__(self, limits):
+        super().__init__()
+        self.limits = limits
+        self.windows = {}
+        self.lock = threading.Lock()
+
+
+    def filter(self, record):
+        event = getattr(record, "event", None)
+        if event not in self.limits:
+            return True
+
+        limit, window = self.limits[event]
+        now = time.monotonic()
+
+        with self.lock:
+            started, count, suppressed = self.windows.get(event, (now, 0, 0))
+
+            if now - started >= window:
+                if suppressed:
+                    record.msg = f"{record.msg} ({suppressed} similar '{event}' messages suppressed)"
+                started, count, suppressed = now, 0, 0
+
+            if count < limit:
+                self.windows[event] = (started, count + 1, suppressed)
+                return True
+
+            self.windows[event] = (started, count, suppressed + 1)
+            return False
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+            "level": record.levelname,
+            "logger": record.name,
+            "event": getattr(record, "event", None),
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def setup_logging(log_root="logs", level="INFO", max_bytes=10 * 1024 * 1024, backup_count=5, rate_limits=None) -> str:
+    """
+    Route all logging through a queue to a rotating JSON file and the console.
+
+    Parameters:
+        log_root (str): Root log directory; files go to `<log_root>/YYYY.MM/`.
+        level (str): Root log level.
+        max_bytes (int): Rotate the log file at this size (0 disables size rotation).
+        backup_count (int): Rotated files to keep.
+        rate_limits (dict, optional): {event: (limit, window_seconds)} for per-row messages.
+
+    Returns:
+        str: Path of the log file for this run.
+    """
+    global _listener
+
+    log_dir = os.path.join(log_root, datetime.now().strftime("%Y.%m"))
+    os.makedirs(log_dir, exist_ok=True)
+    log_file = os.path.join(log_dir, f"{datetime.now().strftime('%Y.%m.%d_%H.%M.%S')}.log")
+
+    file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter())
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter('[%(asctime)s] %(levelname)s: %(message)s', datefmt="%Y-%m-%d %H:%M:%S")
+    )
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(rate_limits or {}))
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+
+    if _listener:
+        _listener.stop()
+    _listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    return log_file
+
+
+def worker_log_queue(context):
+    """
+    Queue the worker processes of a multiprocessing `context` log into (see
+    `init_worker_logging`), created on first use.
+
+    A listener thread hands their records to this process's root handlers.
+    """
+    global _worker_queue, _worker_listener
+
+    if _worker_queue is None:
+        _worker_queue = context.Queue()
+        _worker_listener = QueueListener(_worker_queue, *logging.getLogger().handlers, respect_handler_level=True)
+        _worker_listener.start()
+        atexit.register(stop_logging)
+
+    return _worker_queue
+
+
+def init_worker_logging(log_queue, level=logging.INFO, **fields) -> None:
+    """
+    In a worker process: send every log record to the parent through `log_queue`.
+
+    Parameters:
+        log_queue: Queue from the parent's `worker_log_queue()`.
+        level (int): Root log level, normally the parent's.
+        **fields: Context attached to every record of this process, e.g. stage="parse".
+    """
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    set_log_context(**fields)
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener threads."""
+    global _listener, _worker_listener
+
+    # Worker records are handed on to the main queue, so that one is stopped last
+    if _worker_listener:
+        _worker_listener.stop()
+        _worker_listener = None
+
+    if _listener:
+        _listener.stop()
+        _listener = None
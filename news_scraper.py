@@ -20,6 +20,11 @@ import os
 import threading
 import sqlite3
 import logging
+import sys
+import argparse
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -27,63 +32,99 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
 import config
 import driver_config
+from page_cache import PageCache
+from db_schema import ensure_schema
+from content_dedup import ContentDeduper
+from crawl_state import CrawlState
+from work_queue import WorkQueue, LISTING, DETAIL
+from selector_health import SelectorHealth
+from feed_discovery import FeedDiscovery, feed_url_for
+from link_resolver import LinkResolver
+from image_store import ImageStore
+from tab_pool import TabPool
+from resource_governor import ResourceGovernor
+from change_feed import ChangeFeed
+from page_archive import PageArchive, LISTING as ARCHIVE_LISTING, DETAIL as ARCHIVE_DETAIL
+from extraction import (
+    parse_listing, title_allowed, parse_detail, extract_detail, parse_pool, extract_page,
+    projected_fields, needs_detail, listing_row,
+)
+from pipeline import Pipeline, Stage
+from logging_setup import setup_logging, set_log_context
+from profiling import RunProfiler
+from title_filter import filter_stats
+from records import Record
+from rate_limiter import get_shared_limiter, fetch_with_limits, status_from_page, THROTTLE_STATUSES
 
 existing_records = 0
 successful_records = 0
 update_site = False
-
-log_dir = os.path.join(config.LOG_DIR, datetime.now().strftime("%Y.%m"))
-os.makedirs(log_dir, exist_ok=True)
-
-log_file = os.path.join(log_dir, f"{datetime.now().strftime('%Y.%m.%d_%H.%M.%S')}.log")
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='[%(asctime)s] %(levelname)s: %(message)s',
-    datefmt="%Y-%m-%d %H:%M:%S",
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ],
+page_cache = PageCache.from_config(config)
+rate_limiter = get_shared_limiter(getattr(config, "RATE_LIMIT", {}), getattr(config, "RESPECT_ROBOTS", True))
+content_deduper = None
+crawl_state = None
+work_queue = None
+selector_health = None
+feed_discovery = FeedDiscovery.from_config(config, rate_limiter)
+link_resolver = LinkResolver.from_config(config)
+image_store = ImageStore.from_config(config)
+page_archive = PageArchive.from_config(config)
+change_feed = ChangeFeed.from_config(config)
+tab_pool = TabPool.from_config(
+    config,
+    lambda: create_driver(f"./{driver_config.chromedriver_path}", driver_config, page_load_strategy="none"),
 )
+governor = None
+_worker_local = threading.local()
+_counter_lock = threading.Lock()
+parse_executor = None
+run_fields = projected_fields(getattr(config, "REQUIRED_FIELDS", None), getattr(config, "LISTING_ONLY", False))
+
+# Parse worker processes re-import this script as __mp_main__; they log through the
+# parent (see extraction.parse_pool) and must not open a log file of their own
+log_file = None
+if __name__ != "__mp_main__":
+    log_file = setup_logging(
+        log_root=config.LOG_DIR,
+        level=getattr(config, "LOG_LEVEL", "INFO"),
+        max_bytes=getattr(config, "LOG_MAX_BYTES", 10 * 1024 * 1024),
+        backup_count=getattr(config, "LOG_BACKUP_COUNT", 5),
+        rate_limits=getattr(config, "LOG_RATE_LIMITS", {}),
+    )
+profiler = RunProfiler()
 
-def log(level: str, message: str) -> None:
+def log(level: str, message: str, event: str = None, **fields) -> None:
     """
     Log a message with the given level.
 
+    Records are queued and written by a background listener (see logging_setup.py),
+    so this never blocks on file or console I/O.
+
     Parameters:
         level (str): Logging level as a string. 
                      Examples: 'debug', 'info', 'warning', 'error', 'critical'.
                      Case-insensitive.
         message (str): The message to log.
+        event (str, optional): Message type, used for structured output and for
+                     per-event rate limits (`config.LOG_RATE_LIMITS`).
+        **fields: Extra structured fields for the JSON log, e.g. site, page, href.
 
     Returns:
         None
     """
     level = level.upper()
     numeric_level = getattr(logging, level, logging.INFO)
-    logging.log(numeric_level, message)
+    logging.log(numeric_level, message, extra={"event": event, "fields": fields})
 
 
 log(
-    "info",
-    "".join(
-        f"\n{' ' * 28} {key}: {value}" 
-        for key, value in config.__dict__.items() 
-        if not key.startswith("__")
-    )
-)
-
-log(
-    "info",
-    "".join(
-        f"\n{' ' * 28} {key}: {value}" 
-        for key, value in driver_config.__dict__.items() 
-        if not key.startswith("__")
-    )
+    "debug",
+    "Run configuration",
+    event="config",
+    config={key: value for key, value in config.__dict__.items() if not key.startswith("__")},
+    driver_config={key: value for key, value in driver_config.__dict__.items() if not key.startswith("__")},
 )
 
 
@@ -92,8 +133,9 @@ def database_op(data: dict = None, db_name: str = None, table_name: str = None,
     Perform insert operation on a dictionary data onto a table of a particular database.
 
     Parameters:
-        data (dict, required): 
-                    Dictionary of data in `attr: value` pairs to be inserted.
+        data (dict | Record, required): 
+                    Dictionary of data in `attr: value` pairs to be inserted, or a
+                    `records.Record`, whose precomputed INSERT statement is used.
         db_name (str, default: `YYYY.MM.DD_HH.MM.SS.db`): 
                     Database name or path. If database not found, then it is created.
         table_name (str, default: `table_YYYYMMDD_HHMMSS`): 
@@ -150,7 +192,9 @@ def database_op(data: dict = None, db_name: str = None, table_name: str = None,
         conn.commit()
         conn.close()
         return (False, f"Unable to create table: {table_name}; header: {table_header}")
-    
+
+    ensure_schema(conn, table_name, fieldnames=config.FIELDNAMES)
+
     pk_attr = [
         data[1]
         for data in cursor.execute(f"PRAGMA TABLE_INFO({table_name})").fetchall()
@@ -175,7 +219,7 @@ def database_op(data: dict = None, db_name: str = None, table_name: str = None,
                 ) 
             
                 if cursor.fetchone():
-                    log("info", "Key values exists. Skipping DB insert.")
+                    log("info", "Key values exists. Skipping DB insert.", event="db_exists")
                     op_success, op_message = False, "Key values exists. Skipping DB insert."
 
             except Exception:
@@ -187,18 +231,20 @@ def database_op(data: dict = None, db_name: str = None, table_name: str = None,
             conn.close()
             return (op_success, op_message)
 
-    header_fields = ', '.join(str(field) for field in data.keys())
-    field_placeholder = ', '.join('?' * len(data))
-    values = [value for value in data.values()]
-
-    try:
-        cursor.execute(
-            f"""
+    if isinstance(data, Record):
+        insert_sql = data.insert_sql(table_name)
+        values = data.values()
+    else:
+        header_fields = ', '.join(str(field) for field in data.keys())
+        field_placeholder = ', '.join('?' * len(data))
+        insert_sql = f"""
             INSERT OR IGNORE INTO {table_name} 
             ({header_fields}) VALUES ({field_placeholder})
-            """,
-            values
-        )
+            """
+        values = [value for value in data.values()]
+
+    try:
+        cursor.execute(insert_sql, values)
     except Exception:
         log("error", "Unsuccessful insert operation")
         op_success, op_message = False, "Unsuccessful insert operation"
@@ -210,7 +256,7 @@ def database_op(data: dict = None, db_name: str = None, table_name: str = None,
             success_msg += f"{[val[:10] for val in data.values()]}"
 
         op_message = success_msg
-        log("info", success_msg)
+        log("info", success_msg, event="db_insert")
 
     conn.commit()
     conn.close()
@@ -222,8 +268,9 @@ def csv_op(data: dict = None, csv_file: str = None) -> tuple:
     Create a csv file based on the data <dict>. data.keys will be the column tiles.
 
     Parameters:
-        data (dict, required): 
-                    Dictionary of data in `column: value` pairs to be inserted.
+        data (dict | Record, required): 
+                    Dictionary of data in `column: value` pairs to be inserted, or a
+                    `records.Record`, written in its precomputed `CSV_FIELDS` order.
         csv_file (str, default: `YYYY.MM.DD_HH.MM.SS.csv`): 
                     CSV file name or path. If file not found, then it is created.
 
@@ -243,16 +290,20 @@ def csv_op(data: dict = None, csv_file: str = None) -> tuple:
     os.makedirs(os.path.dirname(csv_file), exist_ok=True)
 
     try:
-        fieldnames = list(data.keys())
+        if isinstance(data, Record):
+            fieldnames = data.CSV_FIELDS
+            row_values = data.csv_values()
+        else:
+            fieldnames = list(data.keys())
+            row_values = [data[field] for field in fieldnames]
 
-        if not os.path.isfile(csv_file):
-            with open(csv_file, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
+        write_header = not os.path.isfile(csv_file)
 
         with open(csv_file, 'a', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writerow(data)
+            writer = csv.writer(csvfile)
+            if write_header:
+                writer.writerow(fieldnames)
+            writer.writerow(row_values)
 
     except Exception as e:
         log("error", f"Unsuccessful csv operation: {str(e)}")
@@ -261,7 +312,7 @@ def csv_op(data: dict = None, csv_file: str = None) -> tuple:
     return (True, "Successful")
 
 
-def create_driver(chromedriver_path: str, driver_config, disable_images=True) -> webdriver.Chrome:
+def create_driver(chromedriver_path: str, driver_config, disable_images=True, page_load_strategy=None) -> webdriver.Chrome:
     """
     Create and configure a Chrome WebDriver instance.
 
@@ -274,6 +325,8 @@ def create_driver(chromedriver_path: str, driver_config, disable_images=True) ->
         driver_config: An object containing configuration flags and helper methods
                        such as disable_site_permissions, disable_js, detect_os_arch,
                        and build_chromedriver_path.
+        page_load_strategy (str, optional): "normal", "eager" or "none"; the tab pool
+                       uses "none" so navigations in several tabs overlap.
 
     Returns:
         webdriver.Chrome: A configured Chrome WebDriver instance ready for automation.
@@ -281,6 +334,15 @@ def create_driver(chromedriver_path: str, driver_config, disable_images=True) ->
     options = Options()
     prefs = {}
 
+    if page_load_strategy:
+        options.page_load_strategy = page_load_strategy
+
+    if page_load_strategy == "none":
+        # Tab pool: pages load in background tabs, which Chrome would otherwise throttle
+        options.add_argument("--disable-background-timer-throttling")
+        options.add_argument("--disable-renderer-backgrounding")
+        options.add_argument("--disable-backgrounding-occluded-windows")
+
     if driver_config.disable_site_permissions:
         options.add_argument("--disable-infobars")
         options.add_argument("--disable-notifications")
@@ -317,7 +379,322 @@ def create_driver(chromedriver_path: str, driver_config, disable_images=True) ->
     return webdriver.Chrome(service=service, options=options)
 
 
-def browser(site=None):
+def fetch_options() -> dict:
+    """
+    Browser settings that change the rendered page source, used as part of the page cache key.
+    Kept in sync with ConfigGenerator.fetch_page_source so both share cached pages.
+    """
+    return {
+        "headless": driver_config.headless,
+        "disable_js": driver_config.disable_js,
+    }
+
+
+def load_page(url: str, driver: webdriver.Chrome = None, archive_kind: str = None, item: dict = None) -> tuple:
+    """
+    Load a page through the page cache, launching Chrome only on a cache miss.
+    Live loads are paced by the shared per-host rate limiter, which honours the site's
+    robots.txt crawl delay.
+
+    With the tab pool enabled (`config.BROWSER_TABS`), live loads run in a tab of the
+    shared Chrome instance and `driver` is passed through unused.
+
+    With the resource governor enabled (`config.RESOURCE_GOVERNOR`), live loads wait
+    for a free load slot, and a browser over its memory/CPU ceiling is quit after
+    the load (None is returned, so the caller's next load starts a fresh one).
+
+    With `archive_kind` set, live loads are appended to the page archive; pages served
+    from the page cache were archived when they were first loaded and are not again.
+
+    Parameters:
+        url (str): The page URL to load.
+        driver (webdriver.Chrome, optional): Driver to reuse. Created lazily when
+                    None and the page is not served from the cache.
+        archive_kind (str, optional): `ARCHIVE_LISTING` or `ARCHIVE_DETAIL`.
+        item (dict, optional): Listing item of a detail page, stored with its archive record.
+
+    Returns:
+        tuple (str, webdriver.Chrome | None): Page source ("" on a replay miss),
+                    and the driver that was used, so callers can reuse and quit it.
+    """
+    options = fetch_options()
+
+    if page_cache:
+        page_source = page_cache.get(url, options)
+        if page_source is not None:
+            return (page_source, driver)
+
+        if page_cache.mode == "replay":
+            log("warning", f"Page not cached, skipping in replay mode: {url}")
+            return ("", driver)
+
+    # Browser loads are the crawled sites; their robots.txt crawl delay applies
+    rate_limiter.add_site(url)
+
+    def release_driver():
+        # A worker parked by the governor gives its idle browser's memory back
+        nonlocal driver
+        if driver:
+            driver.quit()
+            driver = None
+
+    with governor.slot(on_wait=release_driver) if governor else nullcontext():
+        if tab_pool:
+            with tab_pool.tab() as tab:
+                page_source = fetch_with_limits(
+                    tab, url, rate_limiter, max_retries=getattr(config, "THROTTLE_RETRIES", 2)
+                )
+        else:
+            if driver is None:
+                driver = create_driver(f"./{driver_config.chromedriver_path}", driver_config)
+
+            page_source = fetch_with_limits(
+                driver, url, rate_limiter, max_retries=getattr(config, "THROTTLE_RETRIES", 2)
+            )
+
+    # Between items: recycle a browser that outgrew the governor's ceilings
+    if governor:
+        if tab_pool:
+            if governor.should_recycle(tab_pool.driver, "tab pool browser"):
+                tab_pool.recycle()
+        elif governor.should_recycle(driver):
+            release_driver()
+
+    if page_cache and status_from_page(page_source) not in THROTTLE_STATUSES:
+        page_cache.put(url, page_source, options)
+
+    if archive_kind:
+        archive_page(url, page_source, archive_kind, item)
+
+    return (page_source, driver)
+
+
+def archive_page(url: str, page_source: str, kind: str, item: dict = None) -> None:
+    """Append a loaded page to the page archive (see page_archive.py); throttle pages are not kept."""
+    if page_archive and page_source and status_from_page(page_source) not in THROTTLE_STATUSES:
+        page_archive.put(url, page_source, kind, item)
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process in MB (Chrome runs in separate processes).
+
+    Returns:
+        float: Peak RSS, or 0.0 where the `resource` module is unavailable (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def fetch_detail(item: dict) -> dict:
+    """
+    Pipeline fetch stage: load the detail page of an item.
+
+    Each fetch worker thread keeps its own browser, created on first use.
+    """
+    item["page_source"], _worker_local.driver = load_page(
+        item["href"], getattr(_worker_local, "driver", None), ARCHIVE_DETAIL, item
+    )
+    if item.get("feed_url"):
+        item["throttled"] = status_from_page(item["page_source"]) in THROTTLE_STATUSES
+    return item
+
+
+def reject_feed_misses(extract):
+    """
+    Wrap the stage that returns rows: an untitled feed entry (plain sitemap) whose page
+    gave no row, e.g. because its page title is filtered out, is remembered by feed
+    discovery, so later runs do not load its page again. Throttle pages are not final.
+    """
+    def run(item):
+        row = extract(item)
+        if row is None and item.get("feed_url") and not item.get("throttled"):
+            feed_discovery.reject(item["feed_url"], item["href"])
+        return row
+
+    return run
+
+
+def quit_worker_driver() -> None:
+    """Quit the browser owned by the current fetch worker thread."""
+    driver = getattr(_worker_local, "driver", None)
+    if driver:
+        driver.quit()
+        _worker_local.driver = None
+
+
+def href_exists(href: str) -> bool:
+    """Whether an href is already stored (served by the href index, see db_schema.py)."""
+    if not os.path.isfile(config.DATABASE):
+        return False
+
+    conn = sqlite3.connect(config.DATABASE)
+    try:
+        return conn.execute(f"SELECT 1 FROM {config.TABLE_NAME} WHERE href = ? LIMIT 1", (href,)).fetchone() is not None
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+
+def store_row(row: Record) -> None:
+    """
+    Pipeline sink stage: dedup, insert into SQLite, append to CSV and journal the item.
+
+    Runs in a single worker, so the module-level counters are only updated here
+    and, under `_counter_lock`, by the listing producer.
+
+    When the run's field projection (`REQUIRED_FIELDS` / `LISTING_ONLY`) leaves out
+    a primary key field, rows are only written to CSV, marked new or known by href.
+    """
+    global existing_records
+    global successful_records
+
+    dup_of = None
+    if content_deduper and needs_detail(run_fields):
+        fingerprint, dup_of = content_deduper.check(row)
+
+    if run_fields is not None and not set(config.PRIMARY_KEYS) <= set(run_fields):
+        known = href_exists(row["href"])
+        db_status = False
+        db_msg = f"{'Known' if known else 'New'} item. Projection without primary keys, DB insert skipped."
+        if known:
+            with _counter_lock:
+                existing_records += 1
+    elif dup_of and content_deduper.mode == "suppress":
+        db_status, db_msg = False, f"Near-duplicate of {dup_of}. Skipping DB insert."
+        log("info", db_msg)
+        with _counter_lock:
+            existing_records += 1
+        # Remembered so its detail page is not fetched again, but never a duplicate reference
+        content_deduper.record(row, fingerprint, dup_of, stored=False)
+    else:
+        db_status, db_msg = database_op(
+            data = row, 
+            db_name = config.DATABASE, 
+            table_name = config.TABLE_NAME, 
+            table_header = config.TABLE_HEADER,
+        )
+        if dup_of:
+            db_msg += f" Near-duplicate of {dup_of}."
+
+        # Only a stored row may become the reference later copies are flagged against
+        if db_status and content_deduper and needs_detail(run_fields):
+            content_deduper.record(row, fingerprint, dup_of)
+    
+    if not db_status and "Key values exists" in db_msg:
+        with _counter_lock:
+            existing_records += 1
+    
+    row['db_status'] = db_status
+    row['db_msg'] = db_msg
+    
+    csv_status, _ = csv_op(
+        data = row, 
+        csv_file = config.CSV_FILE,
+    )
+
+    if csv_status:
+        with _counter_lock:
+            successful_records += 1
+
+    if crawl_state:
+        crawl_state.mark_processed(row["href"])
+
+
+def get_parse_executor() -> ProcessPoolExecutor:
+    """
+    Process pool for parsing detail pages, created on first use when
+    `config.PARSE_PROCESSES` is set, so BeautifulSoup work scales past one core.
+    """
+    global parse_executor
+
+    processes = getattr(config, "PARSE_PROCESSES", 0)
+    if processes and parse_executor is None:
+        parse_executor = parse_pool(processes)
+        log("info", f"Started {processes} parse worker processes")
+
+    return parse_executor
+
+
+def extract_in_process(item: dict) -> dict:
+    """Pipeline parse stage when parse workers are enabled: ship page bytes out, get a row back."""
+    page_bytes = (item.pop("page_source") or "").encode("utf-8")
+    return parse_executor.submit(extract_page, page_bytes, item).result()
+
+
+def build_pipeline() -> Pipeline:
+    """
+    Create the fetch -> parse -> extract [-> resolve] [-> images] -> sink pipeline for detail pages.
+
+    Worker counts come from `config.PIPELINE_WORKERS`; the sink always has one
+    worker, since it owns the CSV file and the run counters. With
+    `config.PARSE_PROCESSES`, parse and extract run together in worker processes
+    and the parse stage gets one thread per process to keep them all busy.
+    """
+    workers = getattr(config, "PIPELINE_WORKERS", {})
+    queue_size = getattr(config, "PIPELINE_QUEUE_SIZE", 16)
+
+    stages = [
+        Stage(
+            "fetch",
+            profiler.wrap("fetch", fetch_detail),
+            # With tabs, at least one fetch thread per tab keeps every tab loading
+            max(workers.get("fetch", 1), tab_pool.max_tabs) if tab_pool else workers.get("fetch", 1),
+            queue_size,
+            worker_exit=quit_worker_driver,
+        )
+    ]
+
+    if get_parse_executor():
+        stages.append(Stage("parse", profiler.wrap("parse", reject_feed_misses(extract_in_process)), config.PARSE_PROCESSES, queue_size))
+    else:
+        stages.append(Stage("parse", profiler.wrap("parse", parse_detail), workers.get("parse", 1), queue_size))
+        stages.append(Stage("extract", profiler.wrap("extract", reject_feed_misses(extract_detail)), workers.get("extract", 1), queue_size))
+
+    if link_resolver and needs_detail(run_fields) and (run_fields is None or "fileurl" in run_fields):
+        stages.append(Stage("resolve", profiler.wrap("resolve", link_resolver.resolve), workers.get("resolve", 2), queue_size))
+
+    if image_store and (run_fields is None or "image1" in run_fields or "image2" in run_fields):
+        stages.append(Stage("images", profiler.wrap("images", image_store.mirror), workers.get("images", 2), queue_size))
+
+    stages.append(Stage("sink", profiler.wrap("sink", store_row), 1, queue_size))
+
+    return Pipeline(stages, stats_interval=getattr(config, "PIPELINE_STATS_INTERVAL", 0))
+
+
+def site_healthy(site: str) -> bool:
+    """
+    Selector preflight for a site (see selector_health.py), so a changed layout is
+    caught once per `SELECTOR_HEALTH_TTL` instead of on every page.
+
+    Returns:
+        bool: False if the configured selectors are known to be broken on `site`.
+    """
+    if not selector_health:
+        return True
+
+    driver = None
+
+    def fetch(url):
+        nonlocal driver
+        page_source, driver = load_page(url, driver)
+        return page_source
+
+    try:
+        return selector_health.is_healthy(site, fetch)
+    finally:
+        if driver:
+            driver.quit()
+
+
+def browser(site=None, items=None):
     """
     Scrape news articles from a website and save results to CSV and SQLite database.
 
@@ -325,8 +702,14 @@ def browser(site=None):
     load pages and BeautifulSoup to parse HTML content. Extracted news data is
     filtered, saved, and managed to avoid duplicate entries.
 
+    Listing items that pass the filters are fed through a staged pipeline
+    (see `build_pipeline`), so fetching, parsing and storage overlap.
+
     Parameters:
         site (str, optional): The URL of the site to scrape. If None, prompts the user to input a URL.
+        items (list, optional): Items already discovered from the site's feed (see
+                    `ingest_feed`); no listing page is loaded and hrefs already stored
+                    are skipped before their detail page is fetched.
 
     Returns:
         None
@@ -342,154 +725,361 @@ def browser(site=None):
     global successful_records
     global update_site
 
-    now = datetime.now()
-    formatted_ym = now.strftime("%Y.%m")
-    
-    formatted_dt = config.OUTPUT_DATETIME
-    if not formatted_dt:
-        formatted_dt = now.strftime("%Y.%m.%d_%H.%M.%S")
-
     if not site:
         site = input("Enter site URL to scrape: ").strip()
 
-    chromedriver_path = f"./{driver_config.chromedriver_path}"
+    from_feed = items is not None
 
-    # Main browser
-    driver = create_driver(chromedriver_path, driver_config)
-    driver.get(site)
+    if not from_feed:
+        # Main browser
+        page_source, driver = load_page(site, archive_kind=ARCHIVE_LISTING)
+        if driver:
+            driver.quit()
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    driver.quit()
+        with profiler.stage("listing"):
+            items = parse_listing(page_source, streaming=getattr(config, "STREAMING_LISTING", False))
+        page_source = None
+        if items is None:
+            return
 
-    parent_div = soup.find("div", class_=config.PARENT_DIV_CLASS)
-    if not parent_div:
-        log("warning", "Can't find main content div.")
-        return
+    # Without detail fields to fill, rows go straight to the sink and no detail page is loaded
+    pipeline = build_pipeline().start() if needs_detail(run_fields) else None
 
-    news_section_div = parent_div.find("div", class_=config.NEWS_LIST_DIV_CLASS)
-    if not news_section_div:
-        log("warning", "Can't find news list div.")
-        return
+    try:
+        for item in items:
+            if config.END_DATE in item["date"]:
+                log("warning", "Encounted terminate date.")
+                update_site = True
+                break
 
-    news_section = news_section_div.find(config.NEWS_LIST_UL_TAG)
-    if not news_section:
-        log("warning", "Can't find news list section.")
-        return
+            # Untitled feed entries (plain sitemaps) are filtered once the detail page gives a title
+            if not item.get("title_from_page") and not title_allowed(item["title"], site):
+                continue
 
-    detail_driver = create_driver(chromedriver_path, driver_config)
-    
-    for li in news_section.find_all(config.NEWS_ITEM_LI_TAG):
-        title_tag = li.find(config.TITLE_A_TAG, title=True)
-        title = title_tag[config.TITLE_A_TITLE_ATTR].strip() if title_tag else ""
-        href = title_tag[config.TITLE_A_HREF_ATTR].strip() if title_tag else ""
-        date_span = li.find("span", class_=config.NEWS_DATE_CLASS)
-        date = date_span.get_text(strip=True).replace("/", ".") if date_span else ""
-        
-        if date:
-            try:
-                date = datetime.strptime(date, "%d.%m.%Y").strftime("%Y.%m.%d")
-            except ValueError:
-                pass
+            if crawl_state and crawl_state.is_processed(item["href"]):
+                continue
+
+            if from_feed and href_exists(item["href"]):
+                continue
+
+            if content_deduper and content_deduper.mode == "suppress" and content_deduper.seen_href(item["href"]):
+                log("info", f"Already fingerprinted, skipping detail fetch: {item['href']}")
+                with _counter_lock:
+                    existing_records += 1
+                continue
+
+            item["site"] = site
+
+            if pipeline:
+                item["fields"] = run_fields
+                pipeline.submit(item)
+            else:
+                store_row(listing_row(item))
+    finally:
+        if pipeline:
+            pipeline.close()
+
+        # Once per listing page, not per row: each sync takes the write lock and fsyncs
+        if change_feed:
+            change_feed.sync()
+
+    if page_cache:
+        log("info", f"Page cache: {page_cache.stats()}")
+
+    if link_resolver:
+        log("info", f"Link resolver: {link_resolver.stats()}", event="link_resolver")
+
+    if image_store:
+        log("info", f"Image store: {image_store.stats()}", event="image_store")
+
+    if page_archive:
+        log("info", f"Page archive: {page_archive.stats()}", event="page_archive")
+
+    if tab_pool:
+        log("info", f"Tab pool: {tab_pool.stats()}", event="tab_pool")
+
+    if governor:
+        log("info", f"Resource governor: {governor.stats()}", event="governor")
+
+    log("info", f"Host rates (req/s): {rate_limiter.stats()}", event="rate_limit")
+    log("info", f"Title filter hits: {filter_stats()}", event="title_filter")
+
+    peak_rss = peak_rss_mb()
+    log("info", f"Peak RSS: {peak_rss:.1f} MB", event="memory", peak_rss_mb=round(peak_rss, 1))
+
+    if successful_records == 0:
+        log("warning", "ZERO SUCCESSFUL RECORDS FOUND")
+    else:
+        log("info", f"Scraping completed. Data saved to {config.CSV_FILE}")
+        successful_records = 0
+
+
+def feed_items(site_index: int) -> tuple:
+    """
+    New items from the site's feed or sitemap (`config.FEED_URLS`), see feed_discovery.py.
+
+    Returns:
+        tuple (list, callable) | None: Items, and a function that advances the feed's
+                    watermark once they are handled. None when the site has no usable
+                    feed and its pages have to be crawled.
+    """
+    feed_url = feed_url_for(config, site_index) if feed_discovery else None
+    if not feed_url:
+        return None
+
+    # A replayed run must not touch the network; its listing pages come from the cache
+    if page_cache and page_cache.mode == "replay":
+        return None
+
+    result = feed_discovery.entries(feed_url)
+    if result is None:
+        return None
+
+    items, watermark = result
+    for item in items:
+        item["title_from_page"] = not item["title"]
+        if item["title_from_page"]:
+            item["feed_url"] = feed_url
+
+    return items, lambda: feed_discovery.commit(feed_url, watermark)
+
+
+def ingest_feed(site_index: int) -> bool:
+    """
+    Feed-first discovery for a site: scrape the new items of its feed instead of
+    rendering its listing pages.
+
+    Returns:
+        bool: False when the site has no usable feed, so the caller crawls its pages.
+    """
+    global update_site
+
+    discovered = feed_items(site_index)
+    if discovered is None:
+        return False
+
+    items, commit = discovered
+    site = config.DEFAULT_WEBSITES[site_index]
+    set_log_context(site=site, page=None)
+    log("info", f"{site}: {len(items)} new item(s) from feed")
+
+    browser(site, items)
+    update_site = False
+    commit()
+    return True
+
+
+def process_listing_job(job) -> None:
+    """
+    Worker mode: queue the detail pages of a listing page, then the next listing
+    page unless the terminate date (`config.END_DATE`) was reached.
+    """
+    global existing_records
+
+    page_source, _worker_local.driver = load_page(
+        job.url, getattr(_worker_local, "driver", None), ARCHIVE_LISTING
+    )
+    with profiler.stage("listing"):
+        items = parse_listing(page_source, streaming=getattr(config, "STREAMING_LISTING", False))
+    page_source = None
+    if items is None:
+        log("warning", f"No listing found, not paging further: {job.url}")
+        return
 
-        if config.END_DATE in date:
+    reached_end = False
+    for item in items:
+        if config.END_DATE in item["date"]:
             log("warning", "Encounted terminate date.")
-            update_site = True
+            reached_end = True
             break
 
-        if config.TITLE_FILTER_INCLUDE not in title:
-            continue
-        if config.TITLE_FILTER_EXCLUDE in title:
+        if not title_allowed(item["title"], job.url):
             continue
 
-        detail_driver.get(href)
-        
-        detail_soup = BeautifulSoup(detail_driver.page_source, "html.parser")
-        news_div = detail_soup.find("div", class_=config.DETAIL_NEWS_DIV_CLASS)
-        if not news_div:
+        if content_deduper and content_deduper.mode == "suppress" and content_deduper.seen_href(item["href"]):
+            with _counter_lock:
+                existing_records += 1
             continue
 
-        img1_tag = news_div.find("div", class_=config.DETAIL_IMAGE1_DIV_CLASS)
-        image1 = img1_tag.find(config.DETAIL_IMAGE1_IMG_TAG)["src"] if img1_tag and img1_tag.find(config.DETAIL_IMAGE1_IMG_TAG) else ""
-
-        img2_div = news_div.find("div", class_=config.DETAIL_IMAGE2_DIV_CLASS)
-        image2 = ""
-        if img2_div and img2_div.find("img"):
-            image2 = img2_div.find("img").get("src", "")
-
-        filename, size = "", ""
-        for txt in news_div.stripped_strings:
-            if txt.startswith(config.FILE_SIZE_PREFIX):
-                parts = txt[len(config.FILE_SIZE_PREFIX):].split(":")
-                if len(parts) >= 2:
-                    filename = parts[0].strip()
-                    size = parts[1].strip()
-        
-        process_dt = datetime.now().strftime("%Y.%m.%d_%H.%M.%S")
-        
-        if not filename or filename == '':
-            filename = f"FILE_{process_dt.replace('.', '')}"
-
-        fileurl_dict = {}
-        for p in config.FILE_PROVIDERS:
-            file_list = []
-            for a in news_div.find_all("a", href=True):
-                if p in a["href"]:
-                    file_list.append(a["href"])
-            fileurl_dict[p] = file_list
-
-        fileurl = "; ".join(f"{k}: {v}" for k, v in fileurl_dict.items())
-        
-        try:
-            row = {field: locals()[field] for field in config.FIELDNAMES}
-        except Exception as e:
-            try:
-                row = eval(config.ROW_HARDCODE)
-                log(
-                    "info",
-                    (
-                        f"Issue with {str(e)}. Using Hardcode: {{"
-                        + ", ".join(
-                            f"{key}: {value}" if len(value) < 20 else f"{key}: {value[:20]}..."
-                            for key, value in row.items()
-                        )
-                        + "}"
-                    )
-                )
-            except Exception as e1:
-                log("error", f"Unknown error in row hardcode")
+        item["site"] = job.url
 
-        db_status, db_msg = database_op(
-            data = row, 
-            db_name = config.DATABASE, 
-            table_name = config.TABLE_NAME, 
-            table_header = config.TABLE_HEADER,
-        )
-        
-        if not db_status and "Key values exists" in db_msg:
-            existing_records += 1
-        
-        row['db_status'] = db_status
-        row['db_msg'] = db_msg
-        
-        csv_status, _ = csv_op(
-            data = row, 
-            csv_file = config.CSV_FILE,
+        if needs_detail(run_fields):
+            work_queue.enqueue(DETAIL, item["href"], item)
+        else:
+            store_row(listing_row(item))
+
+    if not reached_end:
+        site_index, page_no = job.payload["site_index"], job.payload["page"] + 1
+        work_queue.enqueue(
+            LISTING,
+            config.WEBSITES[site_index].replace("| PAGENO |", str(page_no)),
+            {"site_index": site_index, "page": page_no},
+            requeue_done=True,
         )
 
-        if csv_status:
-            successful_records += 1
 
-    detail_driver.quit()
+def process_detail_job(job) -> None:
+    """Worker mode: fetch, parse and store one detail page."""
+    with profiler.stage("fetch"):
+        item = fetch_detail(dict(job.payload, fields=run_fields))
+
+    with profiler.stage("parse"):
+        if get_parse_executor():
+            row = extract_in_process(item)
+        else:
+            row = extract_detail(parse_detail(item))
+
+    if row and link_resolver:
+        with profiler.stage("resolve"):
+            row = link_resolver.resolve(row)
+
+    if row and image_store:
+        with profiler.stage("images"):
+            row = image_store.mirror(row)
+
+    if row:
+        with profiler.stage("sink"):
+            store_row(row)
+
+
+def run_worker(poll_interval: float = 5) -> None:
+    """
+    Claim and run jobs from the shared work queue until it is drained.
+
+    Any number of workers on the machine holding the queue file and `config.DATABASE`
+    can run at once: each job is leased to one worker, and rows are written with
+    `INSERT OR IGNORE` on the primary keys.
+
+    Parameters:
+        poll_interval (float): Seconds to wait when every remaining job is leased
+                    by other workers (they may still queue more).
+    """
+    jobs_done = 0
+    try:
+        while True:
+            job = work_queue.claim()
+            if job is None:
+                if work_queue.idle():
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            set_log_context(site=job.payload.get("site", job.url), page=job.payload.get("page"))
+            try:
+                with work_queue.lease(job):
+                    if job.kind == LISTING:
+                        process_listing_job(job)
+                    else:
+                        process_detail_job(job)
+            except Exception:
+                continue
+
+            jobs_done += 1
+            # Once per listing page, or per CHANGE_FEED_SYNC_JOBS jobs when only details are queued
+            if change_feed and (job.kind == LISTING or jobs_done % getattr(config, "CHANGE_FEED_SYNC_JOBS", 100) == 0):
+                change_feed.sync()
+    finally:
+        quit_worker_driver()
+        set_log_context(site=None, page=None)
+        if change_feed:
+            change_feed.sync()
+
+    log("info", f"Work queue drained: {jobs_done} job(s) run by {work_queue.worker_id}, {work_queue.stats()}", event="work_queue")
+    log("info", f"Host rates (req/s): {rate_limiter.stats()}", event="rate_limit")
+    log("info", f"Title filter hits: {filter_stats()}", event="title_filter")
+
     if successful_records == 0:
         log("warning", "ZERO SUCCESSFUL RECORDS FOUND")
     else:
         log("info", f"Scraping completed. Data saved to {config.CSV_FILE}")
-        successful_records = 0
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape the configured news sites")
+    parser.add_argument("--worker", action="store_true", help="run jobs from the shared work queue (config.WORK_QUEUE)")
+    parser.add_argument("--seed", action="store_true", help="queue page 1 of every site in the work queue")
+    parser.add_argument("--profile", choices=("cprofile", "sample"), help="profile this run (overrides config.PROFILE_MODE)")
+    args = parser.parse_args()
+
+    profiler = RunProfiler.from_config(config, log_file, mode=args.profile).start()
+    atexit.register(profiler.stop)
+
+    content_deduper = ContentDeduper.from_config(config)
+    selector_health = SelectorHealth.from_config(config)
+
+    # Concurrent page loads: tabs of the shared browser, or one browser per fetch worker
+    load_concurrency = tab_pool.max_tabs if tab_pool else getattr(config, "PIPELINE_WORKERS", {}).get("fetch", 1)
+    governor = ResourceGovernor.from_config(config, load_concurrency)
+    if governor:
+        governor.start()
+
+    if args.worker or args.seed:
+        work_queue = WorkQueue.from_config(config)
+
+        if args.seed:
+            listing_sites = []
+            for index, site in enumerate(config.DEFAULT_WEBSITES):
+                if not site_healthy(site):
+                    continue
+
+                discovered = feed_items(index)
+                if discovered is None:
+                    listing_sites.append(index)
+                    continue
+
+                items, commit = discovered
+                queued = sum(
+                    work_queue.enqueue(DETAIL, item["href"], dict(item, site=site))
+                    for item in items
+                    if item["title_from_page"] or title_allowed(item["title"], site)
+                )
+                commit()
+                log("info", f"Queued {queued} detail job(s) from the feed of {site}", event="work_queue")
+
+            log("info", f"Seeded {work_queue.seed(config, listing_sites)} listing job(s)", event="work_queue")
+
+        if args.worker:
+            run_worker(getattr(config, "WORK_QUEUE_POLL_INTERVAL", 5))
+
+        if parse_executor:
+            parse_executor.shutdown()
+
+        if link_resolver:
+            link_resolver.close()
+
+        if image_store:
+            image_store.close()
+
+        if page_archive:
+            page_archive.close()
+
+        if tab_pool:
+            tab_pool.close()
+
+        if governor:
+            governor.stop()
+
+        sys.exit(0)
+
+    crawl_state = CrawlState.from_config(config)
+
+    resume_site, resume_page = crawl_state.resume_point() if crawl_state else (0, 1)
+    if crawl_state and crawl_state.resumed:
+        existing_records = crawl_state.existing_records
+
     for site_flip in [0, 1]:
-        page_no = 1
+        if site_flip < resume_site:
+            continue
+
+        if not site_healthy(config.DEFAULT_WEBSITES[site_flip]):
+            continue
+
+        if ingest_feed(site_flip):
+            if crawl_state:
+                crawl_state.site_done(site_flip)
+            continue
+
+        page_no = resume_page if site_flip == resume_site else 1
 
         while True:
             if page_no == 1:
@@ -497,12 +1087,38 @@ if __name__ == "__main__":
             else:
                 site = config.WEBSITES[site_flip].replace("| PAGENO |", str(page_no))
 
+            if crawl_state:
+                crawl_state.start_page(site_flip, page_no, existing_records)
+
+            set_log_context(site=site, page=page_no)
             log("info", site)
             browser(site)
 
             if update_site:
                 update_site = False
+                if crawl_state:
+                    crawl_state.site_done(site_flip)
                 break
             else:
                 page_no += 1
 
+    if parse_executor:
+        parse_executor.shutdown()
+
+    if link_resolver:
+        link_resolver.close()
+
+    if image_store:
+        image_store.close()
+
+    if page_archive:
+        page_archive.close()
+
+    if tab_pool:
+        tab_pool.close()
+
+    if governor:
+        governor.stop()
+
+    if crawl_state:
+        crawl_state.finish()
@@ -0,0 +1,406 @@
+"""
+page_archive.py
+
+Append-only archive of the raw listing and detail pages a run loaded, so historical
+rows can be rebuilt after a selector fix or a new `config.FIELDNAMES` field without
+re-crawling:
+- Pages are appended to segment files `<root>/pages-<timestamp>-<pid>.<gz|zst>`; each
+  page is its own gzip member / zstd frame, so any page can be read with one seek
+- Segments rotate past `segment_bytes`, and every process writes its own segments,
+  so work-queue workers never interleave writes
+- A SQLite index (`<root>/index.db`) maps URL and fetch time to segment and offset,
+  with the listing item (title, date, site) stored alongside each detail page
+- `reextract()` replays the latest archived copy of each detail page through the current
+  extraction code in a process pool, and upserts the rows by href
+
+Requires:
+    zstandard  - optional, only for `PAGE_ARCHIVE_CODEC = "zstd"` (`pip install zstandard`)
+
+Usage:
+    python page_archive.py --stats
+    python page_archive.py --show URL [--at YYYY.MM.DD]
+    python page_archive.py --reextract [--since YYYY.MM.DD] [--until YYYY.MM.DD] [--match TEXT] [--processes N]
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import config
+from change_feed import ChangeFeed
+from db_schema import ensure_schema
+from extraction import extract_page, has_placeholder_filename, parse_pool
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+LISTING = "listing"
+DETAIL = "detail"
+CODECS = {"gzip": ".gz", "zstd": ".zst"}
+
+# Listing item fields stored with a detail page; `extract_detail` needs them to rebuild the row
+ITEM_FIELDS = ("title", "href", "date", "site", "title_from_page")
+
+
+def compress(codec: str, body: bytes, level: int = None) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=level or 3).compress(body)
+    return gzip.compress(body, compresslevel=level or 6)
+
+
+def decompress(codec: str, blob: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError("Reading zstd archive segments needs zstandard: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return gzip.decompress(blob)
+
+
+class PageArchive:
+    """
+    Compressed, append-only page archive indexed by URL and fetch time.
+
+    Parameters:
+        root (str): Archive directory (segments and index).
+        codec (str): "gzip" or "zstd".
+        level (int, optional): Compression level (codec default when None).
+        segment_bytes (int): Size at which a new segment file is started.
+    """
+
+    def __init__(self, root="Outputs/archive", codec="gzip", level=None, segment_bytes=256 * 1024 ** 2):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown page archive codec: {codec} (expected one of {tuple(CODECS)})")
+        if codec == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, archiving pages with gzip")
+            codec = "gzip"
+
+        self.root = root
+        self.codec = codec
+        self.level = level
+        self.segment_bytes = segment_bytes
+        self.lock = threading.Lock()
+        self.segment = None
+        self.segment_path = None
+        self.archived = 0
+        self.archived_bytes = 0
+
+        os.makedirs(self.root, exist_ok=True)
+        self.index_path = os.path.join(self.root, "index.db")
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    id INTEGER PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    segment TEXT NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    codec TEXT NOT NULL,
+                    item TEXT
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_url ON pages (url, fetched_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_kind ON pages (kind, fetched_at)")
+
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build from the PAGE_ARCHIVE* settings.
+
+        Returns:
+            PageArchive or None: None when `PAGE_ARCHIVE` is off.
+        """
+        if not getattr(config, "PAGE_ARCHIVE", False):
+            return None
+
+        return cls(
+            root=getattr(config, "PAGE_ARCHIVE_DIR", os.path.join("Outputs", "archive")),
+            codec=getattr(config, "PAGE_ARCHIVE_CODEC", "gzip"),
+            level=getattr(config, "PAGE_ARCHIVE_LEVEL", None),
+            segment_bytes=getattr(config, "PAGE_ARCHIVE_SEGMENT_BYTES", 256 * 1024 ** 2),
+        )
+
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+
+    def _open_segment(self):
+        if self.segment:
+            self.segment.close()
+
+        name = f"pages-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}{CODECS[self.codec]}"
+        self.segment_path = os.path.join(self.root, name)
+        self.segment = open(self.segment_path, "ab")
+
+
+    def put(self, url: str, body: str, kind: str, item: dict = None) -> None:
+        """
+        Append one page to the current segment and index it.
+
+        Parameters:
+            url (str): Page URL.
+            body (str): Page source.
+            kind (str): LISTING or DETAIL.
+            item (dict, optional): Listing item of a detail page; its `ITEM_FIELDS` are kept.
+        """
+        if not body:
+            return
+
+        blob = compress(self.codec, body.encode("utf-8"), self.level)
+        item = json.dumps({field: item.get(field) for field in ITEM_FIELDS}) if item else None
+
+        with self.lock:
+            if self.segment is None or self.segment.tell() >= self.segment_bytes:
+                self._open_segment()
+
+            offset = self.segment.tell()
+            self.segment.write(blob)
+            self.segment.flush()
+
+            # A crash before the index insert only leaves unreferenced bytes in the segment
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    INSERT INTO pages (url, kind, fetched_at, segment, offset, length, codec, item)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (url, kind, time.time(), os.path.basename(self.segment_path), offset, len(blob), self.codec, item),
+                )
+
+            self.archived += 1
+            self.archived_bytes += len(blob)
+
+
+    def read_blob(self, segment: str, offset: int, length: int) -> bytes:
+        """Compressed bytes of one archived page."""
+        with open(os.path.join(self.root, segment), "rb") as segment_file:
+            segment_file.seek(offset)
+            return segment_file.read(length)
+
+
+    def get(self, url: str, at: float = None) -> str:
+        """
+        Page source of `url` as archived at or before `at` (latest when None).
+
+        Returns:
+            str | None: Page source, or None if the URL was never archived.
+        """
+        with self._connect() as conn:
+            entry = conn.execute(
+                """
+                SELECT segment, offset, length, codec FROM pages
+                WHERE url = ? AND fetched_at <= ? ORDER BY fetched_at DESC LIMIT 1
+                """,
+                (url, at if at is not None else time.time()),
+            ).fetchone()
+
+        if not entry:
+            return None
+
+        segment, offset, length, codec = entry
+        return decompress(codec, self.read_blob(segment, offset, length)).decode("utf-8")
+
+
+    def latest(self, kind: str = DETAIL, since: float = None, until: float = None, match: str = None) -> list:
+        """
+        Latest archived copy of each URL of a kind, in segment order for sequential reads.
+
+        Parameters:
+            since, until (float, optional): Fetch time window (POSIX timestamps).
+            match (str, optional): Only URLs containing this text.
+
+        Returns:
+            list[tuple]: (url, segment, offset, length, codec, item dict or None).
+        """
+        with self._connect() as conn:
+            # With MAX(), SQLite takes the bare columns from the row holding the maximum
+            entries = conn.execute(
+                """
+                SELECT url, segment, offset, length, codec, item FROM (
+                    SELECT url, MAX(fetched_at), segment, offset, length, codec, item FROM pages
+                    WHERE kind = ? AND fetched_at BETWEEN ? AND ? AND url LIKE ?
+                    GROUP BY url
+                )
+                ORDER BY segment, offset
+                """,
+                (kind, since or 0, until or time.time(), f"%{match or ''}%"),
+            ).fetchall()
+
+        return [entry[:5] + (json.loads(entry[5]) if entry[5] else None,) for entry in entries]
+
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            counts = dict(conn.execute("SELECT kind, COUNT(*) FROM pages GROUP BY kind").fetchall())
+            size, urls = conn.execute("SELECT COALESCE(SUM(length), 0), COUNT(DISTINCT url) FROM pages").fetchone()
+
+        return {
+            "pages": counts,
+            "urls": urls,
+            "bytes": size,
+            "archived": self.archived,
+            "archived_bytes": self.archived_bytes,
+            "codec": self.codec,
+        }
+
+
+    def close(self) -> None:
+        with self.lock:
+            if self.segment:
+                self.segment.close()
+                self.segment = None
+
+
+def _extract_archived(codec: str, blob: bytes, item: dict):
+    """Parse worker: decompress one archived detail page and extract its row."""
+    return extract_page(decompress(codec, blob), item)
+
+
+def upsert_row(conn: sqlite3.Connection, table_name: str, row) -> str:
+    """
+    Write a re-extracted row over the stored rows with the same href, or insert it.
+
+    Empty values never overwrite stored ones, `process_dt` keeps the original crawl
+    time, and an invented `FILE_<timestamp>` filename keeps the stored filename.
+
+    Returns:
+        str: "updated", "inserted", "unchanged" (an identical row exists) or "conflict"
+             (the new primary key belongs to another stored row).
+    """
+    values = {
+        field: value
+        for field, value in row.items()
+        if value not in ("", None) and field not in ("href", "process_dt")
+    }
+    if has_placeholder_filename(values.get("filename")):
+        values.pop("filename", None)
+    if not values:
+        return "unchanged"
+
+    try:
+        cursor = conn.execute(
+            f"UPDATE {table_name} SET {', '.join(f'{field} = ?' for field in values)} WHERE href = ?",
+            list(values.values()) + [row["href"]],
+        )
+        if cursor.rowcount:
+            return "updated"
+
+        cursor = conn.execute(row.insert_sql(table_name), row.values())
+    except sqlite3.IntegrityError:
+        return "conflict"
+
+    return "inserted" if cursor.rowcount else "unchanged"
+
+
+def reextract(archive: PageArchive, processes: int = None, since: float = None, until: float = None,
+              match: str = None, batch_size: int = 500) -> dict:
+    """
+    Rebuild rows from archived detail pages with the current extraction code and
+    upsert them into `config.DATABASE` / `config.TABLE_NAME`.
+
+    Pages are read in segment order by this process and parsed in `processes` worker
+    processes; at most a few batches are in flight, and each batch is written in
+    one transaction.
+
+    Returns:
+        dict: Page and row counts by outcome.
+    """
+    entries = archive.latest(DETAIL, since, until, match)
+    counts = {"pages": len(entries), "updated": 0, "inserted": 0, "unchanged": 0, "conflict": 0, "skipped": 0}
+    processes = processes or getattr(config, "PARSE_PROCESSES", 0) or os.cpu_count()
+    logger.info(f"Re-extracting {len(entries)} archived detail page(s) in {processes} process(es)")
+
+    conn = sqlite3.connect(config.DATABASE, timeout=30)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {config.TABLE_NAME} ({config.TABLE_HEADER})")
+    ensure_schema(conn, config.TABLE_NAME, fieldnames=config.FIELDNAMES)
+
+    def write(futures):
+        for future in futures:
+            row = future.result()
+            if row is None:
+                counts["skipped"] += 1
+            else:
+                counts[upsert_row(conn, config.TABLE_NAME, row)] += 1
+        conn.commit()
+
+    try:
+        with parse_pool(processes) as executor:
+            in_flight = []
+            for url, segment, offset, length, codec, item in entries:
+                item = dict(item or {"title": "", "href": url, "date": "", "site": ""}, fields=None)
+                in_flight.append(
+                    executor.submit(_extract_archived, codec, archive.read_blob(segment, offset, length), item)
+                )
+
+                if len(in_flight) >= batch_size * 2:
+                    write(in_flight[:batch_size])
+                    in_flight = in_flight[batch_size:]
+                    logger.info(f"Re-extraction progress: {counts}")
+
+            write(in_flight)
+    finally:
+        conn.close()
+
+    # Rows inserted (not updated) by the replay are new to downstream consumers too
+    change_feed = ChangeFeed.from_config(config)
+    if change_feed and counts["inserted"]:
+        change_feed.sync()
+
+    logger.info(f"Re-extraction finished: {counts}")
+    return counts
+
+
+def _timestamp(date: str) -> float:
+    return datetime.strptime(date, "%Y.%m.%d").timestamp() if date else None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
+
+    parser = argparse.ArgumentParser(description="Archived page store and offline re-extraction")
+    parser.add_argument("--stats", action="store_true", help="print archive statistics")
+    parser.add_argument("--show", metavar="URL", help="print the archived source of a page")
+    parser.add_argument("--at", metavar="YYYY.MM.DD", help="with --show: the copy archived before this date")
+    parser.add_argument("--reextract", action="store_true", help="re-extract archived detail pages and upsert the rows")
+    parser.add_argument("--since", metavar="YYYY.MM.DD", help="only pages archived from this date")
+    parser.add_argument("--until", metavar="YYYY.MM.DD", help="only pages archived before this date")
+    parser.add_argument("--match", help="only page URLs containing this text")
+    parser.add_argument("--processes", type=int, help="parse processes (default: PARSE_PROCESSES or CPU count)")
+    args = parser.parse_args()
+
+    archive = PageArchive(
+        root=getattr(config, "PAGE_ARCHIVE_DIR", os.path.join("Outputs", "archive")),
+        codec=getattr(config, "PAGE_ARCHIVE_CODEC", "gzip"),
+    )
+
+    if args.show:
+        page_source = archive.get(args.show, _timestamp(args.at))
+        print(page_source if page_source is not None else f"Not archived: {args.show}")
+    elif args.reextract:
+        print(reextract(archive, args.processes, _timestamp(args.since), _timestamp(args.until), args.match))
+    else:
+        print(json.dumps(archive.stats(), indent=2))
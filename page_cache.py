@@ -0,0 +1,260 @@
+"""
+page_cache.py
+
+On-disk page cache used while developing selectors and generating configs:
+- Entries are keyed by a SHA-256 of the URL plus the fetch options (JS, headless, ...)
+- Bodies are stored gzip-compressed under `<cache_dir>/<key[:2]>/<key>.html.gz`
+- A small SQLite index tracks fetch time, last access and size of every entry
+- Expired entries (TTL) are dropped on lookup, and the cache is trimmed in
+  LRU order whenever it grows past its byte budget
+
+Modes:
+    off     - cache is bypassed entirely
+    auto    - serve hits from disk, fetch and store misses
+    record  - always fetch live and (re)store the result
+    replay  - serve from disk only; misses are reported and never fetched
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from rate_limiter import fetch_with_limits, status_from_page, THROTTLE_STATUSES
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "auto", "record", "replay")
+
+
+class PageCache:
+    def __init__(self, cache_dir="cache/pages", mode="auto", ttl=86400, max_bytes=512 * 1024 * 1024):
+        if mode not in MODES:
+            raise ValueError(f"Unknown page cache mode: {mode} (expected one of {MODES})")
+
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.index_path = os.path.join(self.cache_dir, "index.db")
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    options TEXT,
+                    fetched_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_last_access ON pages (last_access)")
+
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a cache from the PAGE_CACHE_* settings of a config module.
+
+        Returns:
+            PageCache or None: None when the cache mode is `off` or unset.
+        """
+        mode = getattr(config, "PAGE_CACHE_MODE", "off")
+        if not mode or mode == "off":
+            return None
+
+        return cls(
+            cache_dir=getattr(config, "PAGE_CACHE_DIR", "cache/pages"),
+            mode=mode,
+            ttl=getattr(config, "PAGE_CACHE_TTL", 86400),
+            max_bytes=getattr(config, "PAGE_CACHE_MAX_BYTES", 512 * 1024 * 1024),
+        )
+
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+
+    @staticmethod
+    def make_key(url, options=None):
+        """Content address of a fetch: hash of the URL and canonicalised fetch options."""
+        payload = json.dumps({"url": url, "options": options or {}}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+    def _blob_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.html.gz")
+
+
+    def get(self, url, options=None):
+        """
+        Return the cached page source for `url`, or None on a miss.
+
+        In `record` mode every lookup is a miss so pages are refreshed.
+        """
+        if self.mode in ("off", "record"):
+            return None
+
+        key = self.make_key(url, options)
+        now = time.time()
+
+        with self._connect() as conn:
+            entry = conn.execute("SELECT fetched_at FROM pages WHERE key = ?", (key,)).fetchone()
+
+            if not entry:
+                self.misses += 1
+                return None
+
+            if self.ttl and now - entry[0] > self.ttl:
+                self._remove(conn, key)
+                self.misses += 1
+                return None
+
+            try:
+                with gzip.open(self._blob_path(key), "rt", encoding="utf-8") as blob:
+                    body = blob.read()
+            except (OSError, EOFError):
+                self._remove(conn, key)
+                self.misses += 1
+                return None
+
+            conn.execute("UPDATE pages SET last_access = ? WHERE key = ?", (now, key))
+
+        self.hits += 1
+        return body
+
+
+    def put(self, url, body, options=None):
+        """Store a page source and trim the cache back under its byte budget."""
+        if self.mode in ("off", "replay") or body is None:
+            return
+
+        key = self._write_blob(url, body, options)
+        logger.debug(f"Cached page {url} as {key}")
+        self.evict()
+
+
+    def _write_blob(self, url, body, options):
+        key = self.make_key(url, options)
+        path = self._blob_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = path + ".tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as blob:
+            blob.write(body)
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO pages (key, url, options, fetched_at, last_access, size)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, url, json.dumps(options or {}, sort_keys=True), now, now, os.path.getsize(path)),
+            )
+
+        return key
+
+
+    def fetch(self, driver, url, options=None, wait=0, limiter=None):
+        """
+        Read-through fetch: serve `url` from the cache or load it with `driver`.
+
+        Parameters:
+            driver: Selenium WebDriver used on a miss.
+            url (str): Page to load.
+            options (dict, optional): Fetch options that change the rendered page.
+            wait (float): Seconds to sleep after a live `driver.get`.
+            limiter (HostRateLimiter, optional): Paces live loads per host.
+
+        Returns:
+            str or None: Page source, or None on a miss in `replay` mode.
+        """
+        body = self.get(url, options)
+        if body is not None:
+            return body
+
+        if self.mode == "replay":
+            logger.warning(f"Page cache miss in replay mode: {url}")
+            return None
+
+        body = fetch_with_limits(driver, url, limiter, wait=wait)
+        # A throttle page is not the page; the next fetch should load it again
+        if status_from_page(body) not in THROTTLE_STATUSES:
+            self.put(url, body, options)
+        return body
+
+
+    def _remove(self, conn, key):
+        conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+        try:
+            os.remove(self._blob_path(key))
+        except FileNotFoundError:
+            pass
+
+
+    def evict(self):
+        """
+        Drop expired entries, then least-recently-used entries until the cache fits `max_bytes`.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        removed = 0
+        with self._connect() as conn:
+            if self.ttl:
+                expired = conn.execute(
+                    "SELECT key FROM pages WHERE fetched_at < ?", (time.time() - self.ttl,)
+                ).fetchall()
+                for (key,) in expired:
+                    self._remove(conn, key)
+                    removed += 1
+
+            if not self.max_bytes:
+                return removed
+
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+            if total <= self.max_bytes:
+                return removed
+
+            for key, size in conn.execute("SELECT key, size FROM pages ORDER BY last_access").fetchall():
+                if total <= self.max_bytes:
+                    break
+                self._remove(conn, key)
+                total -= size
+                removed += 1
+
+        if removed:
+            logger.info(f"Page cache evicted {removed} entries")
+        return removed
+
+
+    def clear(self):
+        """Remove every cached page."""
+        with self._connect() as conn:
+            for (key,) in conn.execute("SELECT key FROM pages").fetchall():
+                self._remove(conn, key)
+
+
+    def stats(self):
+        with self._connect() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+
+        return {"mode": self.mode, "entries": entries, "bytes": size, "hits": self.hits, "misses": self.misses}
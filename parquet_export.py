@@ -0,0 +1,324 @@
+"""
+parquet_export.py
+
+Columnar export of scraped rows for analytics over long output histories:
+- Reads new rows from the SQLite table (`config.DATABASE` / `config.TABLE_NAME`),
+  or from the per-run CSVs under `Outputs/YYYY.MM/`
+- Writes them as Parquet files partitioned Hive-style by month and site host:
+      <EXPORT_DIR>/month=YYYY.MM/site_host=<host>/part-<timestamp>.parquet
+  (`site_host`, not `site`: the `site` column keeps the full stored URL)
+- Is incremental: a small state file records the last exported SQLite rowid and the
+  byte offset reached in each CSV, so each run only appends rows added since the last one
+- `query()` reads only the requested columns and prunes partitions by month/site; part
+  files from before a FIELDNAMES change read with the missing columns as nulls
+
+Requires:
+    pyarrow  - optional dependency, only needed by this module (`pip install pyarrow`)
+
+Usage:
+    python parquet_export.py                  # incremental export from SQLite
+    python parquet_export.py --source csv     # incremental export from Outputs CSVs
+    python parquet_export.py --compact        # merge part files within each partition
+"""
+
+import argparse
+import csv
+import glob
+import json
+import logging
+import os
+import re
+import sqlite3
+from collections import defaultdict
+from datetime import datetime
+from urllib.parse import urlparse
+
+import config
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = ds = pq = None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = getattr(config, "PARQUET_EXPORT_DIR", os.path.join("Outputs", "parquet"))
+STATE_FILE = "_export_state.json"
+
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow")
+
+
+def load_state(export_dir: str = EXPORT_DIR) -> dict:
+    """
+    Read the incremental export watermark.
+
+    Returns:
+        dict: {"last_rowid": int, "csv_files": {path: byte offset exported up to}}
+    """
+    path = os.path.join(export_dir, STATE_FILE)
+    if not os.path.isfile(path):
+        return {"last_rowid": 0, "csv_files": {}}
+
+    with open(path, encoding="utf-8") as state_file:
+        state = json.load(state_file)
+
+    state.setdefault("last_rowid", 0)
+    state.setdefault("csv_files", {})
+    return state
+
+
+def save_state(state: dict, export_dir: str = EXPORT_DIR) -> None:
+    os.makedirs(export_dir, exist_ok=True)
+    path = os.path.join(export_dir, STATE_FILE)
+    tmp_path = path + ".tmp"
+
+    with open(tmp_path, "w", encoding="utf-8") as state_file:
+        json.dump(state, state_file, indent=2)
+    os.replace(tmp_path, path)
+
+
+def site_partition(site: str) -> str:
+    """Partition value for a site URL: its host, reduced to filesystem-safe characters."""
+    host = urlparse(site or "").netloc or site or "unknown"
+    return re.sub(r"[^A-Za-z0-9._-]", "_", host)
+
+
+def month_partition(date: str) -> str:
+    """Partition value for a `YYYY.MM.DD` date string: `YYYY.MM`."""
+    return date[:7] if date and len(date) >= 7 else "unknown"
+
+
+def read_db_rows(last_rowid: int, db_name: str = config.DATABASE, table_name: str = config.TABLE_NAME):
+    """
+    Yield (rowid, row) for table rows inserted after `last_rowid`.
+
+    SQLite assigns increasing rowids on insert, so the rowid acts as the export watermark.
+    """
+    if not os.path.isfile(db_name):
+        logger.warning(f"Database not found: {db_name}")
+        return
+
+    conn = sqlite3.connect(db_name)
+    try:
+        cursor = conn.execute(
+            f"SELECT rowid, {', '.join(config.FIELDNAMES)} FROM {table_name} WHERE rowid > ? ORDER BY rowid",
+            (last_rowid,),
+        )
+        for record in cursor:
+            yield record[0], dict(zip(config.FIELDNAMES, record[1:]))
+    finally:
+        conn.close()
+
+
+def read_csv_rows(csv_path: str, offset: int = 0):
+    """
+    Yield (offset, row) for the rows of one run CSV after byte `offset`, with `row`
+    restricted to `config.FIELDNAMES` and `offset` the position just past it.
+
+    Rows that `database_op` rejected (`db_status` False, e.g. duplicates) are yielded
+    as None, so the watermark still moves past them. A last row without its line end
+    (the run is still writing it) is left for the next export.
+    """
+    with open(csv_path, newline="", encoding="utf-8") as csvfile:
+        header = next(csv.reader([csvfile.readline()]), None)
+        if not header:
+            return
+        if offset:
+            csvfile.seek(offset)
+
+        truncated = False
+
+        def complete_lines():
+            # readline() instead of iterating the file keeps tell() usable
+            nonlocal truncated
+            while True:
+                line = csvfile.readline()
+                if not line.endswith("\n"):
+                    truncated = bool(line)
+                    return
+                yield line
+
+        for record in csv.reader(complete_lines()):
+            if truncated:
+                return
+
+            row = dict(zip(header, record))
+            if row.get("db_status") == "False":
+                yield csvfile.tell(), None
+                continue
+            yield csvfile.tell(), {field: row.get(field) for field in config.FIELDNAMES}
+
+
+def write_partitions(rows, export_dir: str = EXPORT_DIR) -> int:
+    """
+    Append rows to their month/site partitions as new Parquet part files.
+
+    Returns:
+        int: Number of rows written.
+    """
+    require_pyarrow()
+
+    partitions = defaultdict(list)
+    for row in rows:
+        partitions[(month_partition(row.get("date")), site_partition(row.get("site")))].append(row)
+
+    schema = pa.schema([(field, pa.string()) for field in config.FIELDNAMES])
+    part_name = f"part-{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.parquet"
+    written = 0
+
+    for (month, site), part_rows in partitions.items():
+        part_dir = os.path.join(export_dir, f"month={month}", f"site_host={site}")
+        os.makedirs(part_dir, exist_ok=True)
+
+        columns = {
+            field: [None if row.get(field) is None else str(row.get(field)) for row in part_rows]
+            for field in config.FIELDNAMES
+        }
+        pq.write_table(pa.table(columns, schema=schema), os.path.join(part_dir, part_name), compression="zstd")
+        written += len(part_rows)
+
+    return written
+
+
+def export(source: str = "db", export_dir: str = EXPORT_DIR, batch_size: int = 100000) -> int:
+    """
+    Incrementally export rows added since the previous export.
+
+    Parameters:
+        source (str): `db` to read `config.DATABASE`, `csv` to read `Outputs/*/news_output_*.csv`.
+        export_dir (str): Root directory of the partitioned dataset.
+        batch_size (int): Rows buffered in memory before a set of part files is written.
+
+    Returns:
+        int: Number of rows exported.
+    """
+    require_pyarrow()
+    state = load_state(export_dir)
+    total = 0
+
+    if source == "db":
+        batch = []
+        for rowid, row in read_db_rows(state["last_rowid"]):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                total += write_partitions(batch, export_dir)
+                state["last_rowid"] = rowid
+                save_state(state, export_dir)
+                batch = []
+
+            last_rowid = rowid
+
+        if batch:
+            total += write_partitions(batch, export_dir)
+            state["last_rowid"] = last_rowid
+            save_state(state, export_dir)
+
+    elif source == "csv":
+        csv_pattern = os.path.join("Outputs", "*", "news_output_*.csv")
+        for csv_path in sorted(glob.glob(csv_pattern)):
+            # Run CSVs only ever grow, so rows past the exported offset are new
+            exported_offset = offset = state["csv_files"].get(csv_path, 0)
+            batch = []
+            for offset, row in read_csv_rows(csv_path, exported_offset):
+                if row is not None:
+                    batch.append(row)
+                if len(batch) >= batch_size:
+                    total += write_partitions(batch, export_dir)
+                    state["csv_files"][csv_path] = offset
+                    save_state(state, export_dir)
+                    batch = []
+
+            if offset != state["csv_files"].get(csv_path, 0):
+                total += write_partitions(batch, export_dir)
+                state["csv_files"][csv_path] = offset
+                save_state(state, export_dir)
+
+    else:
+        raise ValueError(f"Unknown export source: {source}")
+
+    logger.info(f"Exported {total} rows to {export_dir}")
+    return total
+
+
+def compact(export_dir: str = EXPORT_DIR) -> int:
+    """
+    Merge the part files of every partition into a single file.
+
+    Returns:
+        int: Number of partitions compacted.
+    """
+    require_pyarrow()
+    compacted = 0
+
+    for part_dir in sorted(glob.glob(os.path.join(export_dir, "month=*", "site_host=*"))):
+        parts = sorted(glob.glob(os.path.join(part_dir, "part-*.parquet")))
+        if len(parts) < 2:
+            continue
+
+        # Parts from before a FIELDNAMES change lack the newer columns; they become nulls
+        table = pa.concat_tables((pq.read_table(part) for part in parts), promote_options="default")
+        merged = os.path.join(part_dir, f"part-{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.parquet")
+        pq.write_table(table, merged + ".tmp", compression="zstd")
+        os.replace(merged + ".tmp", merged)
+
+        for part in parts:
+            os.remove(part)
+        compacted += 1
+
+    logger.info(f"Compacted {compacted} partitions in {export_dir}")
+    return compacted
+
+
+def query(columns: list = None, months: list = None, sites: list = None, export_dir: str = EXPORT_DIR):
+    """
+    Read exported rows, touching only the needed columns and partitions.
+
+    Parameters:
+        columns (list, optional): Subset of `config.FIELDNAMES` to read. Default: all.
+        months (list, optional): `YYYY.MM` partitions to read. Default: all.
+        sites (list, optional): Site hosts (or full site URLs) to read. Default: all.
+
+    Returns:
+        pyarrow.Table: Matching rows.
+    """
+    require_pyarrow()
+
+    # Explicit schema: part files written under an older FIELDNAMES lack newer columns,
+    # and pyarrow would otherwise infer the dataset schema from whichever file it sees first
+    partition_schema = pa.schema([("month", pa.string()), ("site_host", pa.string())])
+    schema = pa.schema([(field, pa.string()) for field in config.FIELDNAMES] + list(partition_schema))
+    dataset = ds.dataset(
+        export_dir,
+        format="parquet",
+        schema=schema,
+        partitioning=ds.partitioning(partition_schema, flavor="hive"),
+        exclude_invalid_files=True,
+    )
+
+    expression = None
+    if months:
+        expression = ds.field("month").isin(months)
+    if sites:
+        site_expression = ds.field("site_host").isin([site_partition(site) for site in sites])
+        expression = site_expression if expression is None else expression & site_expression
+
+    return dataset.to_table(columns=columns or config.FIELDNAMES, filter=expression)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
+
+    parser = argparse.ArgumentParser(description="Export scraped rows to partitioned Parquet files")
+    parser.add_argument("--source", choices=["db", "csv"], default="db")
+    parser.add_argument("--export-dir", default=EXPORT_DIR)
+    parser.add_argument("--compact", action="store_true", help="merge part files after exporting")
+    args = parser.parse_args()
+
+    export(source=args.source, export_dir=args.export_dir)
+    if args.compact:
+        compact(export_dir=args.export_dir)
@@ -0,0 +1,160 @@
+"""
+pipeline.py
+
+Staged producer/consumer pipeline with bounded queues:
+- Each `Stage` has its own queue and worker threads; a worker passes its result to the
+  next stage's queue, or drops the item when the stage function returns None
+- Queues are bounded, so a slow stage blocks the stage feeding it (backpressure) instead
+  of letting work pile up in memory
+- `close()` lets every queued item drain through all stages before the workers exit
+- `stats()` reports queue depth, throughput and busy time per stage, and can be logged
+  periodically to see which stage is the bottleneck
+"""
+
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class Stage:
+    """
+    One pipeline stage.
+
+    Parameters:
+        name (str): Stage name used in stats and thread names.
+        func (callable): `func(item)` returning the item for the next stage, or None to drop it.
+        workers (int): Number of worker threads.
+        queue_size (int): Capacity of the stage's input queue.
+        worker_exit (callable, optional): Called with no arguments in each worker thread
+                    as it exits, e.g. to quit a thread-local browser.
+    """
+
+    def __init__(self, name, func, workers=1, queue_size=16, worker_exit=None):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.worker_exit = worker_exit
+        self.lock = threading.Lock()
+        self.active = 0
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+
+
+class Pipeline:
+    def __init__(self, stages, stats_interval=0):
+        self.stages = stages
+        self.stats_interval = stats_interval
+        self.threads = []
+        self._monitor = None
+        self._closed = threading.Event()
+
+
+    def start(self):
+        for index, stage in enumerate(self.stages):
+            stage.active = stage.workers
+            for number in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work, args=(index,), name=f"{stage.name}-{number}", daemon=True
+                )
+                thread.start()
+                self.threads.append(thread)
+
+        if self.stats_interval:
+            self._monitor = threading.Thread(target=self._log_stats, name="pipeline-stats", daemon=True)
+            self._monitor.start()
+
+        return self
+
+
+    def _work(self, index):
+        stage = self.stages[index]
+        next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+
+        try:
+            while True:
+                item = stage.queue.get()
+                if item is _STOP:
+                    break
+
+                started = time.perf_counter()
+                result, failed = None, False
+                try:
+                    result = stage.func(item)
+                except Exception as e:
+                    failed = True
+                    logger.error(f"Pipeline stage {stage.name} failed: {e}")
+
+                with stage.lock:
+                    stage.busy_seconds += time.perf_counter() - started
+                    stage.processed += 1
+                    stage.errors += failed
+                    stage.dropped += result is None and not failed and next_stage is not None
+
+                if result is not None and next_stage:
+                    next_stage.queue.put(result)
+        finally:
+            if stage.worker_exit:
+                try:
+                    stage.worker_exit()
+                except Exception as e:
+                    logger.error(f"Pipeline stage {stage.name} cleanup failed: {e}")
+
+            with stage.lock:
+                stage.active -= 1
+                last_worker = stage.active == 0
+
+            # The last worker out forwards shutdown, so the next stage drains everything first
+            if last_worker and next_stage:
+                for _ in range(next_stage.workers):
+                    next_stage.queue.put(_STOP)
+
+
+    def submit(self, item):
+        """Queue an item for the first stage; blocks while that stage's queue is full."""
+        self.stages[0].queue.put(item)
+
+
+    def close(self):
+        """Drain every queued item through all stages, then stop the workers."""
+        for _ in range(self.stages[0].workers):
+            self.stages[0].queue.put(_STOP)
+
+        for thread in self.threads:
+            thread.join()
+
+        self._closed.set()
+        if self._monitor:
+            self._monitor.join()
+
+        logger.info(f"Pipeline finished: {self.stats()}")
+
+
+    def stats(self):
+        """
+        Returns:
+            dict: Per stage: queued items, workers, processed/dropped/error counts and busy seconds.
+        """
+        return {
+            stage.name: {
+                "queued": stage.queue.qsize(),
+                "workers": stage.workers,
+                "processed": stage.processed,
+                "dropped": stage.dropped,
+                "errors": stage.errors,
+                "busy_s": round(stage.busy_seconds, 2),
+            }
+            for stage in self.stages
+        }
+
+
+    def _log_stats(self):
+        while not self._closed.wait(self.stats_interval):
+            logger.info(f"Pipeline queues: {self.stats()}")
@@ -0,0 +1,268 @@
+"""
+profiling.py
+
+Built-in profiling for scrape and config-generator runs:
+- `cprofile` mode runs cProfile in the main thread and, through `RunProfiler.wrap()`,
+  in every pipeline worker thread, merged per stage into `.prof` files (readable with
+  `pstats` or snakeviz) plus a text summary of the hottest functions
+- `sample` mode runs a low-overhead sampling thread over all threads and writes
+  collapsed stacks (`frame;frame;frame count`) for flamegraph.pl / speedscope / inferno
+- Profiling can be scoped to chosen stages (e.g. listing, parse, extract, sink); with
+  no stages set the whole run is profiled
+
+Output goes next to the run's log file: `<log>.prof`, `<log>.<stage>.prof`,
+`<log>.profile.txt` and `<log>.collapsed`.
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "cprofile", "sample")
+
+
+class StackSampler:
+    """
+    Sample the Python stacks of all threads at a fixed interval.
+
+    Parameters:
+        interval (float): Seconds between samples.
+        stages (set, optional): Only keep samples taken inside one of these stages.
+        active_stages (dict, optional): {thread id: stage} for threads currently inside a
+                    `RunProfiler.stage()` block. Other threads are labelled by their name
+                    prefix (pipeline workers are named `<stage>-<n>`).
+    """
+
+    def __init__(self, interval=0.005, stages=None, active_stages=None):
+        self.interval = interval
+        self.stages = stages
+        self.active_stages = active_stages if active_stages is not None else {}
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+
+                stage = self.active_stages.get(thread_id) or names.get(thread_id, str(thread_id)).split("-")[0]
+                if self.stages and stage not in self.stages:
+                    continue
+
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(stage)
+                self.samples[";".join(reversed(stack))] += 1
+
+
+    def write_collapsed(self, path) -> int:
+        """Write collapsed stacks for flamegraph tools. Returns the number of samples."""
+        with open(path, "w", encoding="utf-8") as output:
+            for stack, count in self.samples.most_common():
+                output.write(f"{stack} {count}\n")
+        return sum(self.samples.values())
+
+
+class RunProfiler:
+    """
+    Profile a run, optionally limited to named stages.
+
+    Parameters:
+        mode (str): One of `MODES`.
+        output_prefix (str): Path prefix for output files, e.g. the log file without `.log`.
+        stages (list, optional): Stage names to profile; None profiles the whole run.
+        interval (float): Sampling interval in `sample` mode.
+    """
+
+    def __init__(self, mode="off", output_prefix="profile", stages=None, interval=0.005):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode: {mode} (expected one of {MODES})")
+
+        self.mode = mode
+        self.output_prefix = output_prefix
+        self.stages = set(stages) if stages else None
+        self.interval = interval
+        self.profiles = {}
+        self.lock = threading.Lock()
+        self.sampler = None
+        self.main_profile = None
+        self.active_stages = {}
+        self._local = threading.local()
+
+
+    @classmethod
+    def from_config(cls, config, log_file, mode=None):
+        """
+        Build a profiler from the PROFILE_* settings; output sits next to `log_file`.
+        `mode` overrides `PROFILE_MODE` (e.g. from a command line flag).
+        """
+        return cls(
+            mode=mode or getattr(config, "PROFILE_MODE", "off") or "off",
+            output_prefix=os.path.splitext(log_file)[0],
+            stages=getattr(config, "PROFILE_STAGES", None),
+            interval=getattr(config, "PROFILE_SAMPLE_INTERVAL", 0.005),
+        )
+
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+
+    def wants(self, stage) -> bool:
+        return self.enabled and (self.stages is None or stage in self.stages)
+
+
+    def start(self):
+        if self.mode == "sample":
+            self.sampler = StackSampler(self.interval, self.stages, self.active_stages).start()
+        elif self.mode == "cprofile" and self.stages is None:
+            self.main_profile = cProfile.Profile()
+            self.main_profile.enable()
+        return self
+
+
+    def _thread_profile(self, stage):
+        # cProfile only sees the thread that enabled it, so each thread gets its own
+        # profile per stage; stop() merges them
+        if threading.current_thread() is threading.main_thread() and self.main_profile:
+            return None
+
+        profiles = getattr(self._local, "profiles", None)
+        if profiles is None:
+            profiles = self._local.profiles = {}
+
+        profile = profiles.get(stage)
+        if profile is None:
+            profile = profiles[stage] = cProfile.Profile()
+            with self.lock:
+                self.profiles.setdefault(stage, []).append(profile)
+        return profile
+
+
+    @contextmanager
+    def stage(self, name):
+        """Profile a block of code in the calling thread as stage `name`."""
+        if not self.wants(name):
+            yield
+            return
+
+        if self.mode == "sample":
+            thread_id = threading.get_ident()
+            outer = self.active_stages.get(thread_id)
+            self.active_stages[thread_id] = name
+            try:
+                yield
+            finally:
+                if outer:
+                    self.active_stages[thread_id] = outer
+                else:
+                    self.active_stages.pop(thread_id, None)
+            return
+
+        profile = self._thread_profile(name)
+        if profile is None:
+            yield
+            return
+
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ allows only one active cProfile at a time across threads
+            yield
+            return
+
+        try:
+            yield
+        finally:
+            profile.disable()
+
+
+    def wrap(self, stage, func):
+        """Return `func` run inside `stage(stage)`; unchanged when the stage is not profiled."""
+        if not self.wants(stage):
+            return func
+
+        def profiled(*args, **kwargs):
+            with self.stage(stage):
+                return func(*args, **kwargs)
+
+        return profiled
+
+
+    def stop(self) -> list:
+        """
+        Stop profiling and write the output files.
+
+        Returns:
+            list[str]: Paths written.
+        """
+        written = []
+
+        if self.sampler:
+            self.sampler.stop()
+            path = f"{self.output_prefix}.collapsed"
+            samples = self.sampler.write_collapsed(path)
+            written.append(path)
+            logger.info(f"Wrote {samples} stack samples to {path}")
+
+        if self.main_profile:
+            self.main_profile.disable()
+            self.profiles.setdefault("main", []).insert(0, self.main_profile)
+
+        summary = io.StringIO()
+        for stage, profiles in sorted(self.profiles.items()):
+            profiles = [profile for profile in profiles if _has_data(profile)]
+            if not profiles:
+                continue
+
+            stats = pstats.Stats(*profiles, stream=summary)
+            path = f"{self.output_prefix}.prof" if stage == "main" else f"{self.output_prefix}.{stage}.prof"
+            stats.dump_stats(path)
+            written.append(path)
+
+            summary.write(f"\n===== {stage} =====\n")
+            stats.sort_stats("cumulative").print_stats(25)
+
+        if summary.tell():
+            path = f"{self.output_prefix}.profile.txt"
+            with open(path, "w", encoding="utf-8") as output:
+                output.write(summary.getvalue())
+            written.append(path)
+            logger.info(f"Wrote profiles: {', '.join(written)}")
+
+        return written
+
+
+def _has_data(profile) -> bool:
+    profile.create_stats()
+    return bool(profile.stats)
+
@@ -0,0 +1,316 @@
+"""
+rate_limiter.py
+
+Adaptive per-host politeness shared by every fetch path (news_scraper, config_generator,
+and the plain HTTP helpers):
+- One token bucket per host; `acquire()` blocks until the host has a token
+- AIMD control: the rate grows additively while responses are fast and healthy, and is
+  cut multiplicatively on HTTP 429/503 or when latency exceeds the target
+- `Retry-After` blocks the host until the given time; robots.txt `Crawl-delay` /
+  `Request-rate` caps the host's maximum rate. Only the crawled sites' hosts
+  (`add_site()`) are checked, not provider or image hosts; requests to a host wait
+  until its robots.txt has been read
+- Selenium does not expose HTTP status codes, so `status_from_page()` recognises
+  throttling/error pages from their title
+"""
+
+import logging
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUSES = (429, 503)
+USER_AGENT = "Scrato"
+
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+# Matched against the whole title, so articles that merely mention "429" or
+# "rate limit" are not taken for error pages
+_STATUS_TITLES = {
+    429: re.compile(
+        r"(?:http\s+)?(?:error\s+)?429(?:\s*[-:|]?\s*too many requests)?|too many requests|rate limit(?:ed| exceeded)?",
+        re.IGNORECASE,
+    ),
+    503: re.compile(
+        r"(?:http\s+)?(?:error\s+)?503(?:\s*[-:|]?\s*service (?:temporarily )?unavailable)?|service (?:temporarily )?unavailable",
+        re.IGNORECASE,
+    ),
+}
+
+
+def status_from_page(page_source: str) -> int:
+    """
+    Best-effort HTTP status of a page rendered by Chrome, judged from its <title>,
+    which must consist of the status phrase alone (e.g. "429 Too Many Requests").
+
+    Returns:
+        int: 429 or 503 for recognised throttling/error pages, else 200.
+    """
+    match = _TITLE_RE.search(page_source[:4096] if page_source else "")
+    if match:
+        title = " ".join(match.group(1).split())
+        for status, pattern in _STATUS_TITLES.items():
+            if pattern.fullmatch(title):
+                return status
+    return 200
+
+
+def parse_retry_after(value) -> float:
+    """
+    Seconds to wait from a `Retry-After` header (delta-seconds or HTTP date).
+
+    Returns:
+        float | None: Delay in seconds, or None if missing/unparseable.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostState:
+    __slots__ = ("rate", "max_rate", "tokens", "updated", "blocked_until", "robots_checked", "robots_lock")
+
+    def __init__(self, rate, max_rate, burst):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.robots_checked = False
+        self.robots_lock = threading.Lock()
+
+
+class HostRateLimiter:
+    """
+    Per-host token buckets with AIMD rate adaptation.
+
+    Parameters:
+        initial_rate (float): Requests per second a new host starts at.
+        min_rate (float): Floor the rate never drops below.
+        max_rate (float): Ceiling for any host (lowered per host by robots.txt).
+        burst (float): Bucket capacity, i.e. requests allowed back to back.
+        increase (float): Additive increase per healthy response (requests/s).
+        decrease (float): Multiplicative factor applied on throttling or slow responses.
+        target_latency (float): Responses slower than this (seconds) count as congestion.
+        backoff (float): Host block (seconds) on 429/503 without `Retry-After`.
+        respect_robots (bool): Read robots.txt once per site host (`add_site()`) for crawl-delay.
+    """
+
+    def __init__(self, initial_rate=1.0, min_rate=0.1, max_rate=5.0, burst=2.0, increase=0.1,
+                 decrease=0.5, target_latency=5.0, backoff=30.0, respect_robots=True):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.respect_robots = respect_robots
+        self.hosts = {}
+        self.robots_hosts = set()
+        self.lock = threading.Lock()
+
+
+    def add_site(self, url) -> None:
+        """Mark `url`'s host as a crawled site, whose robots.txt crawl delay applies."""
+        with self.lock:
+            self.robots_hosts.add(urlparse(url).netloc.lower())
+
+
+    def _host(self, url):
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            state = self.hosts.get(host)
+            if state is None:
+                state = self.hosts[host] = HostState(self.initial_rate, self.max_rate, self.burst)
+            check_robots = self.respect_robots and not state.robots_checked and host in self.robots_hosts
+
+        if check_robots:
+            # Other threads for this host wait here, so none runs ahead of the crawl delay
+            with state.robots_lock:
+                if not state.robots_checked:
+                    delay = robots_crawl_delay(url)
+                    with self.lock:
+                        if delay:
+                            state.max_rate = min(state.max_rate, 1.0 / delay)
+                            state.rate = min(state.rate, state.max_rate)
+                        # The robots.txt request spends a token; with a crawl delay, the
+                        # next request waits the full delay
+                        state.tokens = 0.0 if delay else max(0.0, state.tokens - 1)
+                        state.updated = time.monotonic()
+                    state.robots_checked = True
+                    if delay:
+                        logger.info(f"robots.txt crawl delay for {host}: {delay}s")
+
+        return host, state
+
+
+    def acquire(self, url) -> float:
+        """
+        Block until a request to `url`'s host is allowed.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        host, state = self._host(url)
+        waited = 0.0
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                state.tokens = min(self.burst, state.tokens + (now - state.updated) * state.rate)
+                state.updated = now
+
+                if now < state.blocked_until:
+                    delay = state.blocked_until - now
+                elif state.tokens >= 1:
+                    state.tokens -= 1
+                    return waited
+                else:
+                    delay = (1 - state.tokens) / state.rate
+
+            time.sleep(delay)
+            waited += delay
+
+
+    def feedback(self, url, latency=None, status=200, retry_after=None) -> None:
+        """
+        Adapt the host's rate to a completed request.
+
+        Parameters:
+            url (str): Requested URL.
+            latency (float, optional): Response time in seconds.
+            status (int): HTTP status (or `status_from_page()` for browser loads).
+            retry_after (str | float, optional): `Retry-After` header value.
+        """
+        host, state = self._host(url)
+
+        with self.lock:
+            if status in THROTTLE_STATUSES:
+                state.rate = max(self.min_rate, state.rate * self.decrease)
+                delay = parse_retry_after(retry_after)
+                state.blocked_until = time.monotonic() + (delay if delay is not None else self.backoff)
+                state.tokens = 0
+                message = f"{host} answered {status}: rate {state.rate:.2f}/s, paused {state.blocked_until - time.monotonic():.0f}s"
+            elif latency is not None and latency > self.target_latency:
+                state.rate = max(self.min_rate, state.rate * self.decrease)
+                message = f"{host} slow ({latency:.1f}s): rate {state.rate:.2f}/s"
+            else:
+                state.rate = min(state.max_rate, state.rate + self.increase)
+                message = None
+
+        if message:
+            logger.warning(message)
+
+
+    def stats(self):
+        with self.lock:
+            return {host: round(state.rate, 2) for host, state in self.hosts.items()}
+
+
+def robots_crawl_delay(url, timeout=5.0) -> float:
+    """
+    Crawl delay for `url`'s host from robots.txt (`Crawl-delay` or `Request-rate`).
+
+    Fetched through the shared keep-alive pool directly: the limiter calls this while
+    setting up the host, so it cannot go through the limiter itself.
+
+    Returns:
+        float | None: Seconds between requests, or None if unset or robots.txt is unavailable.
+    """
+    from http_pool import get_pool  # http_pool imports this module
+
+    parsed = urlparse(url)
+    robots_url = f"{parsed.scheme or 'https'}://{parsed.netloc}/robots.txt"
+
+    try:
+        response = get_pool().request(
+            "GET", robots_url, headers={"User-Agent": USER_AGENT}, timeout=timeout, preload_content=False
+        )
+        try:
+            if response.status >= 400:
+                return None
+            lines = response.read(512 * 1024).decode("utf-8", errors="replace").splitlines()
+        finally:
+            response.release_conn()
+    except Exception:
+        return None
+
+    parser = RobotFileParser(robots_url)
+    parser.parse(lines)
+
+    delay = parser.crawl_delay(USER_AGENT)
+    if delay:
+        return float(delay)
+
+    rate = parser.request_rate(USER_AGENT)
+    if rate and rate.requests:
+        return rate.seconds / rate.requests
+
+    return None
+
+
+def fetch_with_limits(driver, url, limiter=None, max_retries=2, wait=0) -> str:
+    """
+    Load `url` in a Selenium driver, paced by `limiter`, retrying throttled pages.
+
+    Parameters:
+        driver: Selenium WebDriver.
+        url (str): Page to load.
+        limiter (HostRateLimiter, optional): Limiter to pace and adapt with.
+        max_retries (int): Extra attempts when the page looks like a 429/503.
+        wait (float): Seconds to let the page settle after loading.
+
+    Returns:
+        str: Page source of the last attempt.
+    """
+    for attempt in range(max_retries + 1):
+        if limiter:
+            limiter.acquire(url)
+
+        started = time.monotonic()
+        driver.get(url)
+        if wait:
+            time.sleep(wait)
+        page_source = driver.page_source
+        status = status_from_page(page_source)
+
+        if limiter:
+            limiter.feedback(url, time.monotonic() - started, status)
+
+        if status not in THROTTLE_STATUSES:
+            break
+
+    return page_source
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_limiter(settings=None, respect_robots=True) -> HostRateLimiter:
+    """
+    Process-wide limiter shared by all fetch paths; created on first call.
+
+    Parameters:
+        settings (dict, optional): Keyword arguments for `HostRateLimiter` (first call only).
+        respect_robots (bool): See `HostRateLimiter` (first call only).
+    """
+    global _shared
+
+    with _shared_lock:
+        if _shared is None:
+            _shared = HostRateLimiter(respect_robots=respect_robots, **(settings or {}))
+        return _shared
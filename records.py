@@ -0,0 +1,132 @@
+"""
+records.py
+
+Compact row type for scraped items, generated from `config.FIELDNAMES`:
+- Instances use `__slots__` instead of a per-row dict
+- Column orders and the INSERT statement are computed once per class/table, so
+  `database_op()` and `csv_op()` no longer rebuild header and placeholder strings per row
+- Item access (`row["title"]`, `row["db_status"] = ...`) keeps existing dict-style code working
+"""
+
+import config
+
+# Columns the CSV sink appends after the data fields
+STATUS_FIELDS = ("db_status", "db_msg")
+
+
+class Record:
+    """Base class for generated record types; see `make_record_type`."""
+
+    __slots__ = ()
+    FIELDS = ()
+    CSV_FIELDS = ()
+    _insert_sql = {}
+
+    def __init__(self, **values):
+        for field in self.__slots__:
+            setattr(self, field, values.get(field, ""))
+
+        unknown = set(values) - set(self.__slots__)
+        if unknown:
+            raise KeyError(f"Unknown record fields: {sorted(unknown)}")
+
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        """Build a record from any mapping holding every data field (raises KeyError otherwise)."""
+        record = cls.__new__(cls)
+        for field in cls.FIELDS:
+            setattr(record, field, mapping[field])
+        for field in STATUS_FIELDS:
+            setattr(record, field, "")
+        return record
+
+
+    def __getitem__(self, field):
+        try:
+            return getattr(self, field)
+        except AttributeError:
+            raise KeyError(field) from None
+
+
+    def __setitem__(self, field, value):
+        try:
+            setattr(self, field, value)
+        except AttributeError:
+            raise KeyError(field) from None
+
+
+    def __contains__(self, field):
+        return field in self.__slots__
+
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.csv_values() == other.csv_values()
+
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{field}={getattr(self, field)!r}' for field in self.FIELDS)})"
+
+
+    def keys(self):
+        return self.FIELDS
+
+
+    def values(self):
+        """Data field values in `FIELDS` order (the SQL column order)."""
+        return tuple(getattr(self, field) for field in self.FIELDS)
+
+
+    def items(self):
+        return zip(self.FIELDS, self.values())
+
+
+    def csv_values(self):
+        """Values in `CSV_FIELDS` order: data fields, then db_status/db_msg."""
+        return tuple(getattr(self, field) for field in self.CSV_FIELDS)
+
+
+    def as_dict(self):
+        return dict(self.items())
+
+
+    @classmethod
+    def insert_sql(cls, table_name):
+        """`INSERT OR IGNORE` statement for this record type, built once per table."""
+        sql = cls._insert_sql.get(table_name)
+        if sql is None:
+            sql = (
+                f"INSERT OR IGNORE INTO {table_name} ({', '.join(cls.FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(cls.FIELDS))})"
+            )
+            cls._insert_sql[table_name] = sql
+        return sql
+
+
+def make_record_type(fieldnames, name="ScrapedRow"):
+    """
+    Create a `Record` subclass with one slot per field plus the CSV status fields.
+
+    Parameters:
+        fieldnames (list): Data fields, in SQL/CSV column order.
+        name (str): Class name. Assign the result to a module-level name of the same
+                    name so instances pickle (e.g. across parse worker processes).
+
+    Returns:
+        type: The record class.
+    """
+    fields = tuple(fieldnames)
+    return type(
+        name,
+        (Record,),
+        {
+            "__slots__": fields + tuple(field for field in STATUS_FIELDS if field not in fields),
+            "__module__": __name__,
+            "FIELDS": fields,
+            "CSV_FIELDS": fields + tuple(field for field in STATUS_FIELDS if field not in fields),
+            "_insert_sql": {},
+        },
+    )
+
+
+ScrapedRow = make_record_type(config.FIELDNAMES)
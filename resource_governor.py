@@ -0,0 +1,307 @@
+"""
+resource_governor.py
+
+Keeps long daemon runs inside the machine's memory by watching the browsers (Linux /proc):
+- Samples the memory (PSS, or RSS where smaps_rollup is unreadable) and CPU of each
+  driver's whole process tree: chromedriver, Chrome and all its renderers
+- A driver over `max_browser_mb`, or above `max_browser_cpu` percent since its last
+  check, is reported for recycling; callers quit it between items, never mid-page
+- A monitor thread reads MemAvailable and memory PSI (`/proc/pressure/memory`) and
+  lowers the number of concurrent page loads under pressure, one step per interval,
+  raising it again once pressure has cleared for a few intervals
+- Every decision is logged
+
+On platforms without /proc the governor is disabled.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _read(path: str) -> str:
+    try:
+        with open(path) as proc_file:
+            return proc_file.read()
+    except OSError:
+        return ""
+
+
+def _stat_fields(pid: int) -> list:
+    # The command name (field 2) may contain spaces; everything after its ")" is fixed
+    stat = _read(f"/proc/{pid}/stat")
+    return stat[stat.rfind(")") + 2:].split() if stat else []
+
+
+def process_tree(root_pid: int) -> list:
+    """PIDs of a process and all its descendants."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            fields = _stat_fields(int(entry))
+            if fields:
+                children.setdefault(int(fields[1]), []).append(int(entry))
+
+    tree, pending = [], [root_pid]
+    while pending:
+        pid = pending.pop()
+        tree.append(pid)
+        pending.extend(children.get(pid, ()))
+    return tree
+
+
+def process_memory_mb(pid: int) -> float:
+    """Proportional set size of a process in MB (RSS when smaps_rollup is unavailable)."""
+    for line in _read(f"/proc/{pid}/smaps_rollup").splitlines():
+        if line.startswith("Pss:"):
+            return int(line.split()[1]) / 1024
+
+    statm = _read(f"/proc/{pid}/statm").split()
+    return int(statm[1]) * PAGE_SIZE / 1024 ** 2 if len(statm) > 1 else 0.0
+
+
+def process_cpu_seconds(pid: int) -> float:
+    """User plus system CPU time of a process."""
+    fields = _stat_fields(pid)
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS if len(fields) > 12 else 0.0
+
+
+def system_memory() -> tuple:
+    """
+    Memory headroom of the machine.
+
+    Returns:
+        tuple (float, float | None): MemAvailable in MB, and the memory PSI "some avg10"
+                    percentage (None on kernels without PSI).
+    """
+    available_mb = 0.0
+    for line in _read("/proc/meminfo").splitlines():
+        if line.startswith("MemAvailable:"):
+            available_mb = int(line.split()[1]) / 1024
+            break
+
+    pressure = None
+    for line in _read("/proc/pressure/memory").splitlines():
+        if line.startswith("some"):
+            pressure = float(line.split()[1].split("=")[1])
+            break
+
+    return available_mb, pressure
+
+
+def driver_pid(driver) -> int:
+    """PID of a Selenium driver's chromedriver process (Chrome runs under it), or None."""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return getattr(process, "pid", None)
+
+
+class ResourceGovernor:
+    """
+    Browser recycling and adaptive page-load concurrency.
+
+    Parameters:
+        max_concurrency (int): Concurrent page loads when there is no pressure.
+        max_browser_mb (float): Memory ceiling per driver process tree (None = no limit).
+        max_browser_cpu (float): CPU ceiling per driver in percent of one core, averaged
+                    since its previous check (None = no limit).
+        min_available_mb (float): Below this MemAvailable the machine is under pressure.
+        max_pressure (float): Memory PSI "some avg10" above which the machine is under pressure.
+        interval (float): Seconds between pressure samples.
+        check_interval (float): Minimum seconds between samples of one driver.
+    """
+
+    def __init__(self, max_concurrency=1, max_browser_mb=1500, max_browser_cpu=None, min_available_mb=400,
+                 max_pressure=25.0, interval=5, check_interval=10):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_browser_mb = max_browser_mb
+        self.max_browser_cpu = max_browser_cpu
+        self.min_available_mb = min_available_mb
+        self.max_pressure = max_pressure
+        self.interval = interval
+        self.check_interval = check_interval
+        self.limit = self.max_concurrency
+        self.active = 0
+        self.condition = threading.Condition()
+        self.samples = {}
+        self.calm_intervals = 0
+        self.recycled = 0
+        self.shrinks = 0
+        self._stop = threading.Event()
+        self._monitor = None
+
+
+    @classmethod
+    def from_config(cls, config, max_concurrency=1):
+        """
+        Build from the GOVERNOR_* settings.
+
+        Returns:
+            ResourceGovernor or None: None when `RESOURCE_GOVERNOR` is off or /proc is missing.
+        """
+        if not getattr(config, "RESOURCE_GOVERNOR", False):
+            return None
+
+        if not os.path.exists("/proc/meminfo"):
+            logger.warning("Resource governor needs /proc (Linux), disabled")
+            return None
+
+        return cls(
+            max_concurrency=max_concurrency,
+            max_browser_mb=getattr(config, "GOVERNOR_MAX_BROWSER_MB", 1500),
+            max_browser_cpu=getattr(config, "GOVERNOR_MAX_BROWSER_CPU", None),
+            min_available_mb=getattr(config, "GOVERNOR_MIN_AVAILABLE_MB", 400),
+            max_pressure=getattr(config, "GOVERNOR_MAX_PRESSURE", 25.0),
+            interval=getattr(config, "GOVERNOR_INTERVAL", 5),
+        )
+
+
+    def start(self):
+        self._monitor = threading.Thread(target=self._watch, name="resource-governor", daemon=True)
+        self._monitor.start()
+        return self
+
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._monitor:
+            self._monitor.join(timeout=self.interval + 1)
+
+
+    def sample(self, pid: int) -> dict:
+        """
+        Memory and CPU of a process tree.
+
+        Returns:
+            dict: {"memory_mb", "cpu_percent" (since the previous sample, None on the
+                  first), "processes"}.
+
+        Samples of PIDs that have exited (drivers quit by their callers) are dropped here.
+        """
+        pids = process_tree(pid)
+        now = time.monotonic()
+        cpu_seconds = sum(process_cpu_seconds(child) for child in pids)
+
+        with self.condition:
+            previous = self.samples.get(pid)
+            self.samples[pid] = (now, cpu_seconds)
+            for gone in [known for known in self.samples if not os.path.exists(f"/proc/{known}")]:
+                del self.samples[gone]
+
+        cpu_percent = None
+        if previous and now > previous[0]:
+            # Exited renderers take their CPU time with them, so the delta can go negative
+            cpu_percent = max(0.0, (cpu_seconds - previous[1]) / (now - previous[0]) * 100)
+
+        return {
+            "memory_mb": round(sum(process_memory_mb(child) for child in pids), 1),
+            "cpu_percent": None if cpu_percent is None else round(cpu_percent, 1),
+            "processes": len(pids),
+        }
+
+
+    def should_recycle(self, driver, name: str = "browser") -> bool:
+        """
+        Whether a driver is over its ceilings; call between items and quit it if so.
+
+        Drivers are sampled at most every `check_interval` seconds.
+        """
+        pid = driver_pid(driver)
+        if pid is None:
+            return False
+
+        with self.condition:
+            previous = self.samples.get(pid)
+        if previous and time.monotonic() - previous[0] < self.check_interval:
+            return False
+
+        usage = self.sample(pid)
+        reason = None
+        if self.max_browser_mb and usage["memory_mb"] > self.max_browser_mb:
+            reason = f"memory {usage['memory_mb']} MB > {self.max_browser_mb} MB"
+        elif self.max_browser_cpu and usage["cpu_percent"] and usage["cpu_percent"] > self.max_browser_cpu:
+            reason = f"CPU {usage['cpu_percent']}% > {self.max_browser_cpu}%"
+
+        if reason is None:
+            logger.debug(f"{name} (pid {pid}): {usage}")
+            return False
+
+        logger.warning(f"Recycling {name} (pid {pid}, {usage['processes']} processes): {reason}")
+        with self.condition:
+            self.samples.pop(pid, None)
+            self.recycled += 1
+        return True
+
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            available_mb, pressure = system_memory()
+            pressured = available_mb < self.min_available_mb or (
+                pressure is not None and self.max_pressure and pressure > self.max_pressure
+            )
+
+            with self.condition:
+                if pressured:
+                    self.calm_intervals = 0
+                    if self.limit > 1:
+                        self.limit -= 1
+                        self.shrinks += 1
+                        logger.warning(
+                            f"Memory pressure (available {available_mb:.0f} MB, PSI {pressure}): "
+                            f"page-load concurrency lowered to {self.limit}"
+                        )
+                    continue
+
+                self.calm_intervals += 1
+                # Grow back slowly and only with clear headroom, to avoid flapping
+                if self.limit < self.max_concurrency and self.calm_intervals >= 3 and available_mb > 2 * self.min_available_mb:
+                    self.limit += 1
+                    self.calm_intervals = 0
+                    self.condition.notify_all()
+                    logger.info(f"Memory pressure cleared: page-load concurrency raised to {self.limit}")
+
+
+    @contextmanager
+    def slot(self, on_wait=None):
+        """
+        Hold one of the currently allowed page-load slots.
+
+        Parameters:
+            on_wait (callable, optional): Called once before blocking, e.g. to quit the
+                    caller's idle browser so a parked worker gives its memory back.
+        """
+        with self.condition:
+            must_wait = self.active >= self.limit
+        if must_wait and on_wait:
+            on_wait()
+
+        with self.condition:
+            while self.active >= self.limit:
+                self.condition.wait()
+            self.active += 1
+
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.active -= 1
+                self.condition.notify()
+
+
+    def stats(self) -> dict:
+        available_mb, pressure = system_memory()
+        with self.condition:
+            return {
+                "limit": self.limit,
+                "max_concurrency": self.max_concurrency,
+                "recycled": self.recycled,
+                "shrinks": self.shrinks,
+                "available_mb": round(available_mb),
+                "pressure": pressure,
+            }
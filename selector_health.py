@@ -0,0 +1,237 @@
+"""
+selector_health.py
+
+Preflight check of the configured selectors before a crawl:
+- One listing page and the first item's detail page are checked against the listing
+  selectors (`PARENT_DIV_CLASS` ... `NEWS_DATE_CLASS`, traversed as extraction.py does)
+  and `DETAIL_NEWS_DIV_CLASS`
+- The verdict is cached per site in a small JSON file with a TTL, so timer runs skip a
+  broken site without launching Chrome; editing the selectors in config.py invalidates it
+- Throttled or empty pages give no verdict, so a flaky fetch never marks a site broken
+- Optionally, `ConfigGenerator.propose_selectors()` suggests repaired selectors from the
+  pages already fetched
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+import config
+from extraction import listing_item, listing_section
+from rate_limiter import status_from_page, THROTTLE_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# Settings whose values decide whether a verdict still applies
+SELECTOR_SETTINGS = (
+    "PARENT_DIV_CLASS", "NEWS_LIST_DIV_CLASS", "NEWS_LIST_UL_TAG", "NEWS_ITEM_LI_TAG",
+    "TITLE_A_TAG", "TITLE_A_TITLE_ATTR", "TITLE_A_HREF_ATTR", "NEWS_DATE_CLASS",
+    "DETAIL_NEWS_DIV_CLASS", "DETAIL_IMAGE1_DIV_CLASS", "DETAIL_IMAGE2_DIV_CLASS",
+)
+
+
+def selector_fingerprint() -> str:
+    """Hash of the configured selector settings."""
+    values = {name: getattr(config, name, None) for name in SELECTOR_SETTINGS}
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def check_listing(page_source: str) -> tuple:
+    """
+    Check the listing selectors against a listing page.
+
+    Returns:
+        tuple (list, list, str): Problems (selectors that match nothing), warnings
+                    (optional parts missing), and the first item's href ("" if none).
+    """
+    soup = BeautifulSoup(page_source, "html.parser")
+    try:
+        news_section, missing = listing_section(soup)
+        if missing:
+            return [f"{missing} '{getattr(config, missing)}' not found"], [], ""
+        items = [listing_item(li) for li in news_section.find_all(config.NEWS_ITEM_LI_TAG)]
+    finally:
+        soup.decompose()
+
+    if not items:
+        return [f"NEWS_ITEM_LI_TAG '{config.NEWS_ITEM_LI_TAG}' matches no items"], [], ""
+
+    hrefs = [item["href"] for item in items if item["title"] and item["href"]]
+    if not hrefs:
+        return [f"TITLE_A_TAG '{config.TITLE_A_TAG}' with title/href found in no item"], [], ""
+
+    warnings = []
+    if not any(item["date"] for item in items):
+        warnings.append(f"NEWS_DATE_CLASS '{config.NEWS_DATE_CLASS}' found in no item")
+
+    return [], warnings, hrefs[0]
+
+
+def check_detail(page_source: str) -> tuple:
+    """
+    Check the detail selectors against a detail page.
+
+    Returns:
+        tuple (list, list): Problems and warnings.
+    """
+    soup = BeautifulSoup(page_source, "html.parser")
+    try:
+        news_div = soup.find("div", class_=config.DETAIL_NEWS_DIV_CLASS)
+        if not news_div:
+            return [f"DETAIL_NEWS_DIV_CLASS '{config.DETAIL_NEWS_DIV_CLASS}' not found"], []
+
+        warnings = []
+        if not news_div.find("div", class_=config.DETAIL_IMAGE1_DIV_CLASS):
+            warnings.append(f"DETAIL_IMAGE1_DIV_CLASS '{config.DETAIL_IMAGE1_DIV_CLASS}' not found")
+        return [], warnings
+    finally:
+        soup.decompose()
+
+
+def propose_repair(site: str, listing_source: str, detail_source: str = None) -> dict:
+    """Selector proposal from ConfigGenerator for the pages that failed the check."""
+    from config_generator import ConfigGenerator
+
+    try:
+        return ConfigGenerator().propose_selectors(site, listing_source, detail_source)
+    except Exception as e:
+        logger.warning(f"Selector repair proposal failed for {site}: {e}")
+        return None
+
+
+class SelectorHealth:
+    """
+    Cached selector verdicts per site.
+
+    Parameters:
+        path (str): JSON file holding the verdicts.
+        ttl (float): Seconds a verdict stays valid.
+        repair (bool): Ask ConfigGenerator for repaired selectors when a check fails.
+    """
+
+    def __init__(self, path="state/selector_health.json", ttl=6 * 3600, repair=False):
+        self.path = path
+        self.ttl = ttl
+        self.repair = repair
+        self.fingerprint = selector_fingerprint()
+
+        try:
+            with open(self.path, encoding="utf-8") as verdicts:
+                self.verdicts = json.load(verdicts)
+        except (OSError, ValueError):
+            self.verdicts = {}
+
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build from the SELECTOR_HEALTH_* settings.
+
+        Returns:
+            SelectorHealth or None: None when `SELECTOR_HEALTH_CHECK` is off.
+        """
+        if not getattr(config, "SELECTOR_HEALTH_CHECK", False):
+            return None
+
+        return cls(
+            path=getattr(config, "SELECTOR_HEALTH_FILE", os.path.join("state", "selector_health.json")),
+            ttl=getattr(config, "SELECTOR_HEALTH_TTL", 6 * 3600),
+            repair=getattr(config, "SELECTOR_REPAIR", False),
+        )
+
+
+    def cached(self, site: str) -> dict:
+        """The stored verdict for `site`, or None if missing, expired or for other selectors."""
+        verdict = self.verdicts.get(site)
+        if not verdict or verdict.get("fingerprint") != self.fingerprint:
+            return None
+        if time.time() - verdict.get("checked", 0) > self.ttl:
+            return None
+        return verdict
+
+
+    def is_healthy(self, site: str, fetch) -> bool:
+        """
+        Whether the selectors work on `site`, from the cache or by checking it now.
+
+        Parameters:
+            site (str): Listing page URL.
+            fetch (callable): `fetch(url) -> page source`, only called on a cache miss.
+
+        Returns:
+            bool: False only for a (cached or fresh) broken verdict.
+        """
+        verdict = self.cached(site)
+        if verdict is None:
+            verdict = self.check(site, fetch)
+            if verdict is None:
+                return True
+        else:
+            logger.info(f"Selector check for {site} cached: {'ok' if verdict['ok'] else 'broken'}")
+
+        if not verdict["ok"]:
+            logger.error(f"Skipping {site}, selectors broken: {'; '.join(verdict['problems'])}")
+        return verdict["ok"]
+
+
+    def check(self, site: str, fetch) -> dict:
+        """
+        Fetch one listing page and its first detail page, check them and store the verdict.
+
+        Returns:
+            dict | None: Verdict, or None when a page could not be fetched usefully
+                    (empty, throttled), in which case nothing is cached.
+        """
+        listing_source = fetch(site)
+        if not _usable(listing_source):
+            logger.warning(f"Selector check for {site} inconclusive: listing page not loaded")
+            return None
+
+        problems, warnings, href = check_listing(listing_source)
+
+        detail_source = None
+        if not problems:
+            detail_source = fetch(urljoin(site, href))
+            if not _usable(detail_source):
+                logger.warning(f"Selector check for {site} inconclusive: detail page not loaded")
+                return None
+            detail_problems, detail_warnings = check_detail(detail_source)
+            problems += detail_problems
+            warnings += detail_warnings
+
+        verdict = {
+            "ok": not problems,
+            "checked": time.time(),
+            "fingerprint": self.fingerprint,
+            "problems": problems,
+            "warnings": warnings,
+        }
+
+        for warning in warnings:
+            logger.warning(f"Selector check for {site}: {warning}")
+
+        if problems and self.repair:
+            verdict["proposal"] = propose_repair(site, listing_source, detail_source)
+            if verdict["proposal"]:
+                logger.info(f"Proposed selectors for {site}: {json.dumps(verdict['proposal'], ensure_ascii=False)}")
+
+        self.verdicts[site] = verdict
+        self._save()
+        return verdict
+
+
+    def _save(self) -> None:
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as verdicts:
+            json.dump(self.verdicts, verdicts, indent=2, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+
+def _usable(page_source: str) -> bool:
+    return bool(page_source) and status_from_page(page_source) not in THROTTLE_STATUSES
@@ -0,0 +1,274 @@
+"""
+tab_pool.py
+
+Tab-based page loading: one Chrome instance serves several concurrent page loads,
+instead of one Chrome process per fetch worker:
+- The browser runs with `pageLoadStrategy = "none"`, so `get()` returns as soon as the
+  navigation starts; each tab then polls its own `document.readyState`, and the loads
+  of all tabs progress in parallel inside Chrome
+- WebDriver commands go to one window at a time, so they are serialised by a lock;
+  each command is short and no thread holds the lock while a page loads
+- At most `max_tabs` tabs are open; callers block in `tab()` until one is free
+- Tabs are replaced after `recycle_after` navigations (or after an error), which keeps
+  renderer memory from growing over long runs; `recycle()` restarts the whole browser
+  as soon as no tab is loading, which is also how a dead browser is replaced
+
+A checked-out `Tab` has the `get()` / `page_source` interface of a WebDriver, so it can
+be passed to `rate_limiter.fetch_with_limits()` unchanged.
+"""
+
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Set on the old document before navigating, so polling does not mistake it for the new page
+_STALE_MARKER = "window.__scratoStale = true;"
+_READY_STATE = "return window.__scratoStale ? 'loading' : document.readyState;"
+
+
+class Tab:
+    """One browser tab of a `TabPool`, usable in place of a WebDriver for page loads."""
+
+    def __init__(self, pool, handle, generation):
+        self.pool = pool
+        self.handle = handle
+        self.generation = generation
+        self.navigations = 0
+        self.broken = False
+
+
+    def get(self, url: str) -> None:
+        """Navigate this tab to `url` and wait (without holding the pool lock) until it has loaded."""
+        pool = self.pool
+        deadline = time.monotonic() + pool.load_timeout
+
+        with pool.lock:
+            pool.switch_to(self)
+            pool.driver.execute_script(_STALE_MARKER)
+            pool.driver.get(url)
+        self.navigations += 1
+
+        while True:
+            time.sleep(pool.poll_interval)
+            with pool.lock:
+                pool.switch_to(self)
+                state = pool.driver.execute_script(_READY_STATE)
+
+            if state == "complete":
+                return
+
+            if time.monotonic() > deadline:
+                logger.warning(f"Tab load timed out after {pool.load_timeout}s, using partial page: {url}")
+                with pool.lock:
+                    pool.switch_to(self)
+                    pool.driver.execute_script("window.stop();")
+                return
+
+
+    @property
+    def page_source(self) -> str:
+        with self.pool.lock:
+            self.pool.switch_to(self)
+            return self.pool.driver.page_source
+
+
+class TabPool:
+    """
+    Bounded pool of tabs in a single Chrome instance.
+
+    Parameters:
+        driver_factory (callable): Returns a new WebDriver created with
+                    `page_load_strategy="none"`.
+        max_tabs (int): Concurrent page loads (open tabs).
+        recycle_after (int): Navigations after which a tab is replaced (0 = never).
+        load_timeout (float): Seconds before a load is stopped and its partial page used.
+        poll_interval (float): Seconds between `readyState` polls of a loading tab.
+    """
+
+    def __init__(self, driver_factory, max_tabs=4, recycle_after=50, load_timeout=60, poll_interval=0.1):
+        self.driver_factory = driver_factory
+        self.max_tabs = max_tabs
+        self.recycle_after = recycle_after
+        self.load_timeout = load_timeout
+        self.poll_interval = poll_interval
+        self.driver = None
+        self.current_handle = None
+        self.generation = 0
+        self.lock = threading.RLock()
+        self.free = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(max_tabs)
+        self.idle = threading.Condition(self.lock)
+        self.in_use = 0
+        self.recycle_pending = False
+        self.opened = 0
+        self.recycled = 0
+        self.restarts = 0
+
+
+    @classmethod
+    def from_config(cls, config, driver_factory):
+        """
+        Build from the BROWSER_TABS* settings.
+
+        Returns:
+            TabPool or None: None when `BROWSER_TABS` is 0 (one Chrome per fetch worker).
+        """
+        max_tabs = getattr(config, "BROWSER_TABS", 0)
+        if not max_tabs:
+            return None
+
+        return cls(
+            driver_factory,
+            max_tabs=max_tabs,
+            recycle_after=getattr(config, "BROWSER_TAB_RECYCLE", 50),
+            load_timeout=getattr(config, "BROWSER_TAB_TIMEOUT", 60),
+        )
+
+
+    def switch_to(self, tab: Tab) -> None:
+        """Make `tab` the WebDriver's current window (call with the lock held)."""
+        if self.current_handle != tab.handle:
+            self.driver.switch_to.window(tab.handle)
+            self.current_handle = tab.handle
+
+
+    def _open_tab(self) -> Tab:
+        with self.lock:
+            if self.driver is None:
+                self.driver = self.driver_factory()
+                handle = self.driver.current_window_handle
+            else:
+                self.driver.switch_to.new_window("tab")
+                handle = self.driver.current_window_handle
+
+            self.current_handle = handle
+            self.opened += 1
+            return Tab(self, handle, self.generation)
+
+
+    def _close_tab(self, tab: Tab) -> None:
+        with self.lock:
+            if tab.generation != self.generation or self.driver is None:
+                return
+
+            # Closing the last window would end the session, so open the replacement first
+            replacement = self._open_tab()
+            self.driver.switch_to.window(tab.handle)
+            self.driver.close()
+            self.driver.switch_to.window(replacement.handle)
+            self.current_handle = replacement.handle
+            self.free.put(replacement)
+
+
+    def _restart(self) -> None:
+        with self.lock:
+            if self.driver is None:
+                return
+
+            logger.warning("Restarting the tab pool browser")
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+
+            self.driver = None
+            self.current_handle = None
+            self.generation += 1
+            self.restarts += 1
+
+
+    def _checkout(self) -> Tab:
+        while True:
+            try:
+                tab = self.free.get_nowait()
+            except queue.Empty:
+                return self._open_tab()
+
+            # Tabs of a browser that was restarted are gone
+            if tab.generation == self.generation:
+                return tab
+
+
+    def _checkin(self, tab: Tab) -> None:
+        if not tab.broken and not (self.recycle_after and tab.navigations >= self.recycle_after):
+            self.free.put(tab)
+            return
+
+        try:
+            self._close_tab(tab)
+            self.recycled += 1
+        except Exception as e:
+            # Other tabs may still be loading in this browser; restart once they are done
+            logger.warning(f"Could not recycle tab ({e}), browser is probably gone")
+            self.recycle()
+
+
+    @contextmanager
+    def tab(self):
+        """
+        Check out a tab for one page load, blocking while `max_tabs` are busy.
+
+        Yields:
+            Tab: Pass it to `fetch_with_limits()` like a driver.
+        """
+        with self.slots:
+            with self.lock:
+                # A pending browser recycle lets the running loads finish first
+                while self.recycle_pending:
+                    self.idle.wait()
+                self.in_use += 1
+
+            try:
+                try:
+                    tab = self._checkout()
+                except Exception as e:
+                    # Opening a tab fails once the browser is gone
+                    if self.driver is not None:
+                        logger.warning(f"Could not open a tab ({e}), browser is probably gone")
+                        self.recycle()
+                    raise
+
+                try:
+                    yield tab
+                except Exception:
+                    tab.broken = True
+                    raise
+                finally:
+                    self._checkin(tab)
+            finally:
+                with self.lock:
+                    self.in_use -= 1
+                    if self.recycle_pending and self.in_use == 0:
+                        self._restart()
+                        self.recycle_pending = False
+                        self.idle.notify_all()
+
+
+    def recycle(self) -> None:
+        """Restart the browser once no tab is loading; new loads wait until it is done."""
+        with self.lock:
+            if self.in_use == 0:
+                self._restart()
+            else:
+                self.recycle_pending = True
+
+
+    def stats(self) -> dict:
+        return {
+            "max_tabs": self.max_tabs,
+            "idle": self.free.qsize(),
+            "opened": self.opened,
+            "recycled": self.recycled,
+            "restarts": self.restarts,
+        }
+
+
+    def close(self) -> None:
+        with self.lock:
+            if self.driver:
+                self.driver.quit()
+                self.driver = None
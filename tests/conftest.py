@@ -0,0 +1,73 @@
+"""
+Shared fixtures: the project modules import a top-level `config`, so each test gets
+one built from config.template, with its output paths moved into pytest's tmp_path,
+and imports the project modules afresh against it. `scraper` runs news_scraper with a
+fake Chrome driver serving a dict of pages.
+"""
+
+import importlib
+import os
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules that do not import config (title_filter, document_index, ...) are imported directly
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(ROOT)
+
+    # Drop project modules imported against another test's config; restored on teardown
+    for name, module in list(sys.modules.items()):
+        if os.path.dirname(getattr(module, "__file__", None) or "") == ROOT or name == "config":
+            monkeypatch.delitem(sys.modules, name)
+
+    config = types.ModuleType("config")
+    with open(os.path.join(ROOT, "config.template"), encoding="utf-8") as template:
+        exec(compile(template.read(), "config.template", "exec"), config.__dict__)
+    config.DATABASE = str(tmp_path / "test.db")
+    config.CSV_FILE = str(tmp_path / "Outputs" / "news_output.csv")
+    monkeypatch.setitem(sys.modules, "config", config)
+    return config
+
+
+class FakeDriver:
+    """Serves `pages` ({url: html}) in place of Chrome."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.page_source = ""
+
+    def get(self, url):
+        self.page_source = self.pages[url]
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def scraper(config, monkeypatch):
+    """news_scraper with a fake browser; returns (module, config, pages) with pages to fill in."""
+    for module in ("bs4", "selenium", "dateutil"):
+        pytest.importorskip(module)
+
+    config.RESPECT_ROBOTS = False
+    config.RATE_LIMIT = {"initial_rate": 100.0, "max_rate": 100.0, "burst": 100}
+
+    # The real driver_config looks for a ChromeDriver binary at import time
+    driver_config = types.ModuleType("driver_config")
+    driver_config.chromedriver_path = "chromedriver"
+    driver_config.headless = True
+    driver_config.disable_js = False
+    driver_config.disable_site_permissions = False
+    monkeypatch.setitem(sys.modules, "driver_config", driver_config)
+
+    pages = {}
+    news_scraper = importlib.import_module("news_scraper")
+    monkeypatch.setattr(news_scraper, "create_driver", lambda *args, **kwargs: FakeDriver(pages))
+    return news_scraper, config, pages
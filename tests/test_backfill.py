@@ -0,0 +1,99 @@
+"""
+backfill.py on run CSVs written by hand: key dedup across files and against the table,
+skipped rows, and counts that match what SQLite actually inserted.
+"""
+
+import csv
+import importlib
+import sqlite3
+
+import pytest
+
+
+def row(date, filename, title, db_msg=""):
+    return {
+        "date": date, "site": "https://example.com", "title": title, "href": f"https://example.com/{filename}",
+        "image1": "", "image2": "", "filename": filename, "size": "1 MB", "fileurl": "",
+        "process_dt": "2024.02.01_10.00.00", "db_status": "True", "db_msg": db_msg,
+    }
+
+
+def write_csv(path, rows, fieldnames):
+    with open(path, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+
+@pytest.fixture
+def backfill(config):
+    config.CHANGE_FEED = False
+    return importlib.import_module("backfill")
+
+
+def stored(config):
+    conn = sqlite3.connect(config.DATABASE)
+    try:
+        return conn.execute(f"SELECT date, filename, title, seq FROM {config.TABLE_NAME} ORDER BY seq").fetchall()
+    finally:
+        conn.close()
+
+
+def test_dedup_and_counts(backfill, config, tmp_path):
+    fieldnames = config.FIELDNAMES + ["db_status", "db_msg"]
+    first = write_csv(tmp_path / "first.csv", [
+        row("2024.02.01", "a.zip", "A"),
+        row("2024.02.01", "b.zip", "B"),
+        row("2024.02.01", "a.zip", "A again"),
+        row("2024.02.02", "", "No filename"),
+        row("2024.02.02", "c.zip", "C copy", db_msg="Near-duplicate of https://example.com/c"),
+    ], fieldnames)
+    # Older layout: no fileurl column, which is filled in empty
+    second = write_csv(tmp_path / "second.csv", [
+        row("2024.02.01", "b.zip", "B again"),
+        row("2024.02.03", "d.zip", "D"),
+    ], [name for name in fieldnames if name != "fileurl"])
+
+    counts = backfill.backfill([first, second], batch_size=2)
+
+    assert {key: counts[key] for key in ("files", "read", "inserted", "duplicate", "skipped")} == {
+        "files": 2, "read": 7, "inserted": 3, "duplicate": 2, "skipped": 2,
+    }
+    assert stored(config) == [
+        ("2024.02.01", "a.zip", "A", 1),
+        ("2024.02.01", "b.zip", "B", 2),
+        ("2024.02.03", "d.zip", "D", 3),
+    ]
+
+    # A second run finds every key in the table
+    counts = backfill.backfill([first, second])
+    assert (counts["inserted"], counts["duplicate"]) == (0, 5)
+    assert len(stored(config)) == 3
+
+
+def test_rows_ignored_by_sqlite_are_not_counted(backfill, config, tmp_path, monkeypatch):
+    fieldnames = config.FIELDNAMES + ["db_status", "db_msg"]
+    path = write_csv(tmp_path / "run.csv", [
+        row("2024.02.01", "a.zip", "A"),
+        row("2024.02.01", "b.zip", "B"),
+    ], fieldnames)
+
+    read_csv_records = backfill.read_csv_records
+
+    def racing_reader(csv_path, counts):
+        # Another writer stores b.zip after backfill loaded the table's keys
+        conn = sqlite3.connect(config.DATABASE)
+        conn.execute(
+            f"INSERT INTO {config.TABLE_NAME} (date, filename, title) VALUES ('2024.02.01', 'b.zip', 'scraped')"
+        )
+        conn.commit()
+        conn.close()
+        yield from read_csv_records(csv_path, counts)
+
+    monkeypatch.setattr(backfill, "read_csv_records", racing_reader)
+    counts = backfill.backfill([path])
+
+    assert (counts["inserted"], counts["duplicate"]) == (1, 1)
+    # Numbered after the row the scraper inserted, not on top of it
+    assert [title for _, _, title, _ in stored(config)] == ["scraped", "A"]
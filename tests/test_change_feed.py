@@ -0,0 +1,76 @@
+"""
+change_feed: inserted rows come out of the feed once each, in `seq` order, across
+syncs, writer restarts and a torn last line.
+"""
+
+import importlib
+import os
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def table(config):
+    db_schema = importlib.import_module("db_schema")
+    conn = sqlite3.connect(config.DATABASE)
+    db_schema.ensure_schema(conn, config.TABLE_NAME, config.TABLE_HEADER, config.FIELDNAMES)
+
+    def insert(*numbers):
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {config.TABLE_NAME} ({', '.join(config.FIELDNAMES)}) "
+            f"VALUES ({', '.join('?' for _ in config.FIELDNAMES)})",
+            [[f"{field}-{n}" for field in config.FIELDNAMES] for n in numbers],
+        )
+        conn.commit()
+
+    yield insert
+    conn.close()
+
+
+@pytest.fixture
+def change_feed(config):
+    return importlib.import_module("change_feed")
+
+
+def make_feed(change_feed, config, tmp_path, **kwargs):
+    return change_feed.ChangeFeed(str(tmp_path / "changes"), config.DATABASE, config.TABLE_NAME, **kwargs)
+
+
+def test_rows_come_out_in_seq_order(config, table, change_feed, tmp_path):
+    feed = make_feed(change_feed, config, tmp_path)
+    table(3, 1, 2)
+    table(1)  # ignored duplicate: no seq, no change
+
+    assert feed.sync() == 3
+    changes = list(change_feed.read_changes(feed.feed_dir))
+    assert [change["seq"] for change in changes] == [1, 2, 3]
+    assert [change["title"] for change in changes] == ["title-3", "title-1", "title-2"]
+
+    assert [change["seq"] for change in change_feed.read_changes(feed.feed_dir, since=2)] == [3]
+
+
+def test_resumed_sync_writes_no_duplicates(config, table, change_feed, tmp_path):
+    feed = make_feed(change_feed, config, tmp_path, segment_bytes=1)
+    table(1, 2)
+    assert feed.sync() == 2
+    assert feed.sync() == 0
+
+    # A new writer (next run) resumes from the feed itself, cutting off a torn last line
+    table(3)
+    path = change_feed.segments(feed.feed_dir)[-1][1]
+    with open(path, "a", encoding="utf-8") as segment:
+        segment.write('{"seq": 3, "tit')
+    feed = make_feed(change_feed, config, tmp_path, segment_bytes=1)
+    assert feed.sync() == 1
+
+    table(4, 5)
+    assert feed.sync() == 2
+
+    changes = list(change_feed.read_changes(feed.feed_dir))
+    assert [change["seq"] for change in changes] == [1, 2, 3, 4, 5]
+    assert [change["href"] for change in changes] == [f"href-{n}" for n in range(1, 6)]
+    # A full segment is closed; later batches start new ones named by their first seq
+    assert [os.path.basename(path) for _, path in change_feed.segments(feed.feed_dir)] == [
+        "changes-000000000001.ndjson", "changes-000000000003.ndjson", "changes-000000000004.ndjson",
+    ]
@@ -0,0 +1,104 @@
+"""
+Runs news_scraper.browser() end to end with a fake Chrome driver and CONTENT_DEDUP="flag",
+so the near-duplicate filter is exercised from the pipeline's sink thread.
+"""
+
+import csv
+import sqlite3
+
+import pytest
+
+SITE = "https://example.com/news-page-1.html"
+NEXT_PAGE = "https://example.com/news-page-2.html"
+
+LISTING = """
+<html><body>
+<div class="category_news_phai_chinh"><div class="category_news"><ul>
+  <li><a title="[NEW] Alpha Suite 2024 Edition" href="https://example.com/a">x</a><span class="news_date">01/02/2024</span></li>
+  <li><a title="[NEW] Alpha Suite 2024 Edition" href="https://example.com/a-repost">x</a><span class="news_date">02/02/2024</span></li>
+  <li><a title="[NEW] Beta Toolkit Final Version" href="https://example.com/b">x</a><span class="news_date">03/02/2024</span></li>
+</ul></div></div>
+</body></html>
+"""
+
+NEXT_LISTING = """
+<html><body>
+<div class="category_news_phai_chinh"><div class="category_news"><ul>
+  <li><a title="[NEW] Gamma Pack Deluxe Bundle" href="https://example.com/c">x</a><span class="news_date">01/02/2024</span></li>
+  <li><a title="[NEW] Gamma Pack Deluxe Bundle" href="https://example.com/c-copy">x</a><span class="news_date">04/02/2024</span></li>
+</ul></div></div>
+</body></html>
+"""
+
+DETAIL = """
+<html><head><title>{name}</title></head><body>
+<div class="news">
+  <p>File size: {name}.zip: 10 MB</p>
+  <a href="https://source1.example/{link}">mirror</a>
+</div>
+</body></html>
+"""
+
+PAGES = {
+    SITE: LISTING,
+    "https://example.com/a": DETAIL.format(name="alpha", link="alpha"),
+    # Same title and download link as /a, different filename: a near-duplicate, not a key clash
+    "https://example.com/a-repost": DETAIL.format(name="alpha-repost", link="alpha"),
+    "https://example.com/b": DETAIL.format(name="beta", link="beta"),
+    NEXT_PAGE: NEXT_LISTING,
+    # Same (date, filename) key as /a, so its insert fails
+    "https://example.com/c": DETAIL.format(name="alpha", link="gamma"),
+    "https://example.com/c-copy": DETAIL.format(name="gamma-copy", link="gamma"),
+}
+
+
+@pytest.fixture
+def dedup_scraper(scraper):
+    news_scraper, config, pages = scraper
+    pages.update(PAGES)
+    config.CONTENT_DEDUP = "flag"
+    news_scraper.content_deduper = news_scraper.ContentDeduper.from_config(config)
+    return news_scraper, config
+
+
+def test_content_dedup_flag_through_pipeline(dedup_scraper):
+    news_scraper, config = dedup_scraper
+
+    news_scraper.browser(SITE)
+
+    with open(config.CSV_FILE, newline="", encoding="utf-8") as csvfile:
+        rows = list(csv.DictReader(csvfile))
+
+    # Every row reached the CSV, i.e. the sink ran past the deduper for all of them
+    assert sorted(row["href"] for row in rows) == [
+        "https://example.com/a", "https://example.com/a-repost", "https://example.com/b",
+    ]
+    assert all(row["db_status"] == "True" for row in rows)
+
+    flagged = [row for row in rows if "Near-duplicate of" in row["db_msg"]]
+    assert [row["href"] for row in flagged] == ["https://example.com/a-repost"]
+
+    conn = sqlite3.connect(config.DATABASE)
+    try:
+        assert conn.execute(f"SELECT COUNT(*) FROM {config.TABLE_NAME}").fetchone()[0] == 3
+        assert conn.execute(
+            f"SELECT dup_of FROM {config.TABLE_NAME}_fingerprints WHERE href = ?",
+            ("https://example.com/a-repost",),
+        ).fetchone() == ("https://example.com/a",)
+    finally:
+        conn.close()
+
+
+def test_rows_not_stored_are_not_duplicate_references(dedup_scraper):
+    news_scraper, config = dedup_scraper
+
+    news_scraper.browser(SITE)
+    news_scraper.browser(NEXT_PAGE)
+
+    with open(config.CSV_FILE, newline="", encoding="utf-8") as csvfile:
+        rows = {row["href"]: row for row in csv.DictReader(csvfile)}
+
+    assert rows["https://example.com/c"]["db_status"] == "False"
+    # /c was never stored, so its copy is the first stored item of its kind
+    assert rows["https://example.com/c-copy"]["db_status"] == "True"
+    assert "Near-duplicate" not in rows["https://example.com/c-copy"]["db_msg"]
@@ -0,0 +1,63 @@
+"""
+crawl_state journal: an interrupted run resumes at its last page with its processed
+hrefs, a torn last line is ignored, and a finished run starts over.
+"""
+
+import json
+
+from crawl_state import CrawlState
+
+
+def interrupted_run(path):
+    state = CrawlState(str(path), fsync=False)
+    state.start_page(0, 1)
+    state.mark_processed("https://example.com/a")
+    state.site_done(0)
+    state.start_page(1, 1)
+    state.start_page(1, 2, existing_records=3)
+    state.mark_processed("https://example.com/b")
+    # Killed mid-write
+    state.journal.write('{"event":"href","href":"https://exa')
+    state.journal.close()
+
+
+def test_resume_after_crash(tmp_path):
+    path = tmp_path / "state" / "crawl_journal.jsonl"
+    interrupted_run(path)
+
+    state = CrawlState(str(path), fsync=False)
+    assert state.resumed
+    assert state.resume_point() == (1, 2)
+    assert state.existing_records == 3
+    assert state.processed_hrefs == {"https://example.com/a", "https://example.com/b"}
+
+    # The resumed run appends after the torn line instead of onto it
+    state.mark_processed("https://example.com/c")
+    state.journal.close()
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[-1]) == {"event": "href", "href": "https://example.com/c"}
+
+    assert CrawlState(str(path), fsync=False).is_processed("https://example.com/c")
+
+
+def test_finished_run_starts_over(tmp_path):
+    path = tmp_path / "crawl_journal.jsonl"
+    interrupted_run(path)
+
+    state = CrawlState(str(path), fsync=False)
+    state.site_done(1)
+    state.finish()
+    assert not path.exists()
+
+    state = CrawlState(str(path), fsync=False)
+    assert not state.resumed
+    assert state.resume_point() == (0, 1)
+    assert not state.is_processed("https://example.com/a")
+    state.journal.close()
+
+
+def test_disabled_by_config():
+    class Config:
+        CRAWL_JOURNAL = None
+
+    assert CrawlState.from_config(Config) is None
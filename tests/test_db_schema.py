@@ -0,0 +1,96 @@
+"""
+db_schema migrations on a baseline database: a table created from config.TABLE_HEADER
+before any migration existed, holding rows.
+"""
+
+import importlib
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def db_schema(config, monkeypatch):
+    db_schema = importlib.import_module("db_schema")
+    # Each connection below stands for a new process
+    monkeypatch.setattr(db_schema, "_migrated", set())
+    return db_schema
+
+
+@pytest.fixture
+def baseline(config):
+    conn = sqlite3.connect(config.DATABASE)
+    conn.execute(f"CREATE TABLE {config.TABLE_NAME} ({config.TABLE_HEADER})")
+    conn.executemany(
+        f"INSERT INTO {config.TABLE_NAME} (date, site, title, href, filename) VALUES (?, ?, ?, ?, ?)",
+        [
+            ("2024.02.01", "https://example.com", "Alpha", "https://example.com/a", "a.zip"),
+            ("2024.01.15", "https://example.com", "Beta", "https://example.com/b", "b.zip"),
+        ],
+    )
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def test_migrates_baseline_table(db_schema, baseline, config):
+    table = config.TABLE_NAME
+    assert db_schema.current_version(baseline.cursor(), table) == 1
+
+    version = db_schema.ensure_schema(baseline, table, config.TABLE_HEADER, config.FIELDNAMES + ["image1_path"])
+    assert version == db_schema.SCHEMA_VERSION == 4
+
+    applied = baseline.execute(
+        f"SELECT version FROM {db_schema.MIGRATIONS_TABLE} WHERE table_name = ? ORDER BY version", (table,)
+    ).fetchall()
+    assert [version for (version,) in applied] == [2, 3, 4]
+
+    # date_num is a hidden generated column; seq follows the existing insert order
+    assert baseline.execute(f"SELECT href, date_num, seq FROM {table} ORDER BY seq").fetchall() == [
+        ("https://example.com/a", 20240201, 1),
+        ("https://example.com/b", 20240115, 2),
+    ]
+    assert "date_num" not in [info[1] for info in baseline.execute(f"PRAGMA table_info({table})")]
+    assert "image1_path" in db_schema.table_columns(baseline.cursor(), table)
+
+    indexes = {name for (name,) in baseline.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (table,)
+    )}
+    assert {f"idx_{table}_href", f"idx_{table}_site_date", f"idx_{table}_date_num", db_schema.seq_index_name(table)} <= indexes
+
+    # Later inserts are numbered by the trigger; ignored duplicates are not
+    baseline.execute(f"INSERT INTO {table} (date, href, filename) VALUES ('2024.02.03', 'https://example.com/c', 'c.zip')")
+    baseline.execute(f"INSERT OR IGNORE INTO {table} (date, href, filename) VALUES ('2024.02.01', 'https://example.com/a2', 'a.zip')")
+    baseline.commit()
+    assert baseline.execute(f"SELECT href, seq FROM {table} WHERE seq > 2").fetchall() == [("https://example.com/c", 3)]
+
+    plan = " ".join(row[-1] for row in baseline.execute(
+        f"EXPLAIN QUERY PLAN SELECT href FROM {table} WHERE date_num BETWEEN 20240101 AND 20240131"
+    ))
+    assert f"idx_{table}_date_num" in plan
+
+
+def test_rerun_restores_dropped_indexes(db_schema, baseline, config):
+    table = config.TABLE_NAME
+    db_schema.ensure_schema(baseline, table)
+
+    # A bulk load killed before it rebuilt its indexes
+    baseline.execute(f"DROP INDEX idx_{table}_href")
+    baseline.commit()
+    db_schema._migrated.clear()
+
+    assert db_schema.ensure_schema(baseline, table) == 4
+    assert baseline.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (f"idx_{table}_href",)
+    ).fetchone()
+    assert baseline.execute(f"SELECT COUNT(*) FROM {db_schema.MIGRATIONS_TABLE}").fetchone()[0] == 3
+
+
+def test_other_tables_left_alone(db_schema, config):
+    conn = sqlite3.connect(config.DATABASE)
+    try:
+        assert db_schema.ensure_schema(conn, "missing") == 0
+        assert db_schema.ensure_schema(conn, "notes", "id INTEGER PRIMARY KEY, body TEXT") == 1
+        assert db_schema.table_columns(conn.cursor(), "notes") == ["id", "body"]
+    finally:
+        conn.close()
@@ -0,0 +1,102 @@
+"""
+document_index answers checked against soupsieve (`soup.select`) and bs4 itself on a
+page with repeated classes, ids, nested lists and layout-grid classes.
+"""
+
+import pytest
+
+bs4 = pytest.importorskip("bs4")
+pytest.importorskip("soupsieve")
+
+from document_index import DocumentIndex  # noqa: E402
+
+PAGE = """
+<html><head><title>News</title></head><body>
+<div id="main" class="container row-fluid">
+  <div class="category_news col-md-8">
+    <ul class="list">
+      <li class="item"><a class="title" title="Alpha" href="/a">Alpha</a><span class="news_date">01/02/2024</span></li>
+      <li class="item hot"><a class="title" title="Beta" href="/b">Beta <b>now</b></a><span class="news_date">02/02/2024</span></li>
+      <li class="item"><a class="title" title="Gamma" href="/c">Gamma</a><span class="news_date">03/02/2024</span></li>
+    </ul>
+  </div>
+  <div class="sidebar col-md-4">
+    <ul class="list"><li class="item"><a class="title" href="/popular">Popular</a></li></ul>
+    <p id="note">  Updated <![CDATA[daily]]> <!-- not text --> </p>
+  </div>
+</div>
+<div class="footer"><a href="/about">About</a></div>
+</body></html>
+"""
+
+
+@pytest.fixture
+def page():
+    soup = bs4.BeautifulSoup(PAGE, "html.parser")
+    return soup, DocumentIndex(soup)
+
+
+@pytest.mark.parametrize("selector", [
+    "li", ".item", "li.item", "#main", "div#main", "a.title", ".hot", "span.news_date",
+    "p#main", ".missing", "ul li a", "li.item.hot", "div > ul",
+])
+def test_count_and_select_match_soupsieve(page, selector):
+    soup, index = page
+    assert index.select(selector) == soup.select(selector)
+    assert index.count(selector) == len(soup.select(selector))
+
+    sidebar = soup.select_one(".sidebar")
+    assert index.select(selector, within=sidebar) == sidebar.select(selector)
+    assert index.count(selector, within=sidebar) == len(sidebar.select(selector))
+
+
+def test_node_metrics_match_bs4(page):
+    soup, index = page
+    for node in soup.find_all(True):
+        assert index.indexed(node)
+        assert index.text_length(node) == len(node.get_text(strip=True))
+        assert index.node_depth(node) == len(list(node.parents))
+
+    main = soup.select_one("#main")
+    assert index.contains(main, soup.select_one(".hot"))
+    assert not index.contains(main, main)
+    assert not index.contains(main, soup.select_one(".footer a"))
+    assert not index.indexed(bs4.BeautifulSoup(PAGE, "html.parser").select_one("#main"))
+
+
+def test_unique_selector(page):
+    soup, index = page
+    for node in soup.find_all(True):
+        selector = index.unique_selector(node)
+        if selector is not None:
+            assert soup.select(selector) == [node], selector
+
+    assert index.unique_selector(soup.select_one(".hot")) == ".hot"
+    # Layout-grid classes are a last resort
+    assert index.unique_selector(soup.select_one(".category_news")) == ".category_news"
+
+    sidebar_link = soup.select_one(".sidebar a")
+    selector = index.unique_selector(sidebar_link)
+    assert selector is not None and soup.select(selector) == [sidebar_link]
+
+    container = soup.select_one(".category_news")
+    first_date = container.select_one(".news_date")
+    assert index.unique_selector(first_date, within=container) is None
+    hot_date = soup.select_one(".hot .news_date")
+    selector = index.unique_selector(hot_date, within=container)
+    assert container.select(selector) == [hot_date]
+
+
+def test_group_selector(page):
+    soup, index = page
+    items = soup.select(".category_news li")
+    selector = index.group_selector(items)
+    # No simple selector matches only these three; the closest one adds the sidebar item
+    assert selector in ("li", ".item", "li.item")
+    assert set(items) < set(soup.select(selector))
+
+    dates = soup.select(".news_date")
+    assert soup.select(index.group_selector(dates)) == dates
+
+    mixed = [soup.select_one(".footer a"), soup.select_one(".hot")]
+    assert index.group_selector(mixed) is None
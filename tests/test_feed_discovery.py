@@ -0,0 +1,135 @@
+"""
+feed_discovery against a local HTTP server: RSS and sitemap parsing (plain, gzip file,
+gzip transfer encoding), conditional refetches, watermarks and rejected entries.
+"""
+
+import gzip
+import http.server
+import threading
+import types
+
+import pytest
+
+pytest.importorskip("urllib3")
+
+from feed_discovery import FeedDiscovery  # noqa: E402
+from rate_limiter import HostRateLimiter  # noqa: E402
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Example</title>
+  <item><title>[NEW] Older</title><link>https://example.com/older</link>
+    <pubDate>Mon, 01 Jan 2024 10:00:00 +0000</pubDate></item>
+  <item><title>[NEW] Newer</title><link>https://example.com/newer</link>
+    <pubDate>Fri, 05 Jan 2024 10:00:00 +0000</pubDate></item>
+</channel></rss>
+"""
+
+SITEMAP = b"""<?xml version="1.0"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/a</loc></url>
+  <url><loc>https://example.com/b</loc></url>
+</urlset>
+"""
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        Handler.requests.append((self.path, self.headers.get("User-Agent")))
+
+        if self.path == "/rss.xml":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.reply(RSS, ETag='"v1"')
+        elif self.path == "/sitemap.xml.gz":
+            self.reply(gzip.compress(SITEMAP))
+        elif self.path == "/sitemap.xml":
+            # Transfer compression: the client must see plain XML
+            self.reply(gzip.compress(SITEMAP), **{"Content-Encoding": "gzip"})
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+    def reply(self, body, **headers):
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    Handler.requests = []
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_discovery(tmp_path):
+    limiter = HostRateLimiter(initial_rate=1000, max_rate=1000, burst=1000, respect_robots=False)
+    return FeedDiscovery(str(tmp_path / "feeds.json"), limiter=limiter)
+
+
+def test_rss_watermark_and_conditional_refetch(server, tmp_path):
+    feed_url = f"{server}/rss.xml"
+    discovery = make_discovery(tmp_path)
+
+    items, watermark = discovery.entries(feed_url)
+    assert [item["href"] for item in items] == ["https://example.com/newer", "https://example.com/older"]
+    assert items[0]["date"] == "2024.01.05"
+    discovery.commit(feed_url, watermark)
+
+    # Next run: the stored ETag turns the refetch into a 304
+    discovery = make_discovery(tmp_path)
+    assert discovery.entries(feed_url) == ([], watermark)
+    assert all(agent == "Scrato" for _, agent in Handler.requests)
+    assert [path for path, _ in Handler.requests] == ["/rss.xml", "/rss.xml"]
+
+
+@pytest.mark.parametrize("path", ["/sitemap.xml", "/sitemap.xml.gz"])
+def test_sitemap_encodings(server, tmp_path, path):
+    items, _ = make_discovery(tmp_path).entries(server + path)
+    assert sorted(item["href"] for item in items) == ["https://example.com/a", "https://example.com/b"]
+    assert all(item["title"] == "" and item["date"] == "" for item in items)
+
+
+def test_rejected_undated_entries_are_skipped_on_later_runs(server, tmp_path):
+    feed_url = f"{server}/sitemap.xml"
+    discovery = make_discovery(tmp_path)
+
+    items, watermark = discovery.entries(feed_url)
+    assert len(items) == 2  # undated: returned on every run until handled
+    discovery.reject(feed_url, "https://example.com/a")
+    discovery.commit(feed_url, watermark)
+
+    items, _ = make_discovery(tmp_path).entries(feed_url)
+    assert [item["href"] for item in items] == ["https://example.com/b"]
+
+
+def test_unavailable_feed_falls_back(server, tmp_path):
+    assert make_discovery(tmp_path).entries(f"{server}/missing.xml") is None
+
+
+def test_untitled_entries_without_a_row_are_rejected(scraper, monkeypatch):
+    news_scraper, config, pages = scraper
+    rejected = []
+    monkeypatch.setattr(news_scraper, "feed_discovery", types.SimpleNamespace(reject=lambda *args: rejected.append(args)))
+
+    run = news_scraper.reject_feed_misses(lambda item: None)
+    run({"href": "/filtered", "feed_url": "/sitemap.xml"})
+    run({"href": "/throttled", "feed_url": "/sitemap.xml", "throttled": True})
+    run({"href": "/listing-item"})
+    news_scraper.reject_feed_misses(lambda item: {"href": item["href"]})({"href": "/kept", "feed_url": "/sitemap.xml"})
+
+    assert rejected == [("/sitemap.xml", "/filtered")]
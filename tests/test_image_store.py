@@ -0,0 +1,101 @@
+"""
+image_store bookkeeping without the network: LRU eviction clears the image paths of
+stored rows, and per-URL download locks do not outlive their downloads.
+"""
+
+import os
+import sqlite3
+import threading
+
+import pytest
+
+pytest.importorskip("urllib3")
+
+from image_store import ImageStore  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    db_name = str(tmp_path / "test.db")
+    conn = sqlite3.connect(db_name)
+    conn.execute("CREATE TABLE news (href TEXT, image1_path TEXT, image2_path TEXT)")
+    conn.commit()
+    conn.close()
+
+    store = ImageStore(root=str(tmp_path / "images"), max_bytes=10, workers=1, db_name=db_name, table_name="news")
+    yield store
+    store.close()
+
+
+def add_blob(store, name, last_access):
+    path = os.path.join(store.root, f"{name}.jpg")
+    with open(path, "wb") as blob:
+        blob.write(b"x" * 6)
+    with store._connect() as conn:
+        conn.execute("INSERT INTO blobs VALUES (?, ?, ?, ?)", (name, path, 6, last_access))
+        conn.execute("INSERT INTO urls VALUES (?, ?)", (f"https://img.example/{name}.jpg", name))
+    return path
+
+
+def test_eviction_clears_row_paths(store):
+    old = add_blob(store, "old", 1.0)
+    new = add_blob(store, "new", 2.0)
+
+    conn = sqlite3.connect(store.db_name)
+    conn.executemany(
+        "INSERT INTO news VALUES (?, ?, ?)",
+        [("/a", old, new), ("/b", new, old), ("/c", new, "")],
+    )
+    conn.commit()
+    conn.close()
+
+    assert store.evict() == 1
+    assert not os.path.exists(old) and os.path.exists(new)
+    assert store.lookup("https://img.example/old.jpg") is None
+
+    conn = sqlite3.connect(store.db_name)
+    rows = conn.execute("SELECT href, image1_path, image2_path FROM news ORDER BY href").fetchall()
+    conn.close()
+    assert rows == [("/a", "", new), ("/b", new, ""), ("/c", new, "")]
+
+
+def test_eviction_without_path_columns(tmp_path):
+    store = ImageStore(root=str(tmp_path / "images"), max_bytes=10, workers=1,
+                       db_name=str(tmp_path / "missing.db"), table_name="news")
+    try:
+        add_blob(store, "old", 1.0)
+        add_blob(store, "new", 2.0)
+        assert store.evict() == 1
+    finally:
+        store.close()
+
+
+def test_url_locks_are_dropped(store, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    downloads = []
+
+    def download(url):
+        downloads.append(url)
+        started.set()
+        release.wait(5)
+        return None
+
+    monkeypatch.setattr(store, "_download", download)
+
+    url = "https://img.example/a.jpg"
+    first = threading.Thread(target=store.fetch, args=(url,))
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=store.fetch, args=(url,))
+    second.start()
+
+    # The second caller waits on the same lock instead of downloading alongside
+    second.join(0.2)
+    assert downloads == [url]
+
+    release.set()
+    first.join()
+    second.join()
+    assert store.url_locks == {}
+    assert store.stats()["failed"] == 2
@@ -0,0 +1,96 @@
+"""
+link_resolver helpers on extraction's `fileurl` format and on response headers, and
+the resolve stage with the network probe replaced.
+"""
+
+import importlib
+
+import pytest
+
+urllib3 = pytest.importorskip("urllib3")
+
+
+class Response:
+    def __init__(self, status, url="https://source1.example/d/abc", **headers):
+        self.status = status
+        self.url = url
+        self.headers = urllib3.HTTPHeaderDict({name.replace("_", "-"): value for name, value in headers.items()})
+
+    def geturl(self):
+        return self.url
+
+
+@pytest.fixture
+def link_resolver(config):
+    return importlib.import_module("link_resolver")
+
+
+def test_file_links(link_resolver):
+    fileurl = (
+        "source1: ['https://source1.example/a', 'https://source1.example/b']; "
+        "source2: []; source3: ['https://source3.example/c?x=1']; source4: []"
+    )
+    assert link_resolver.file_links(fileurl) == [
+        ("source1", "https://source1.example/a"),
+        ("source1", "https://source1.example/b"),
+        ("source3", "https://source3.example/c?x=1"),
+    ]
+    assert link_resolver.file_links("") == []
+    assert link_resolver.file_links(None) == []
+
+
+@pytest.mark.parametrize("status, headers, size", [
+    (206, {"Content_Range": "bytes 0-0/1572864", "Content_Length": "1"}, 1572864),
+    (200, {"Content_Length": "2048"}, 2048),
+    # A partial response's length is the range's, not the file's
+    (206, {"Content_Length": "1"}, None),
+    (200, {"Content_Range": "bytes */*", "Content_Length": "abc"}, None),
+    (416, {"Content_Length": "0"}, None),
+    (200, {}, None),
+])
+def test_size(link_resolver, status, headers, size):
+    assert link_resolver._size(Response(status, **headers)) == size
+
+
+def test_filename(link_resolver):
+    disposition = Response(200, Content_Disposition="attachment; filename*=UTF-8''Alpha%20Suite.zip")
+    assert link_resolver._filename(disposition, "https://source1.example/d/abc") == "Alpha Suite.zip"
+
+    quoted = Response(200, Content_Disposition='attachment; filename="beta.rar"')
+    assert link_resolver._filename(quoted, "https://source1.example/d/abc") == "beta.rar"
+
+    redirected = Response(200, url="https://cdn.example/files/gamma%201.7z")
+    assert link_resolver._filename(redirected, "https://source1.example/d/abc") == "gamma 1.7z"
+    assert link_resolver._filename(Response(200), "https://source1.example/d/abc") == ""
+
+
+def test_format_size(link_resolver):
+    assert link_resolver.format_size(512) == "512 B"
+    assert link_resolver.format_size(1536) == "1.50 KB"
+    assert link_resolver.format_size(3 * 1024 ** 4) == "3072.00 GB"
+
+
+def test_resolve_first_sized_link_wins(link_resolver, monkeypatch):
+    resolver = link_resolver.LinkResolver(workers=2, cache_path=None)
+    probes = {
+        "https://source1.example/a": ("", None),
+        "https://source2.example/b": ("alpha.zip", 1024 ** 2),
+        "https://source3.example/c": ("other.zip", 5),
+    }
+    monkeypatch.setattr(resolver, "probe", lambda provider, url: probes[url])
+
+    row = {
+        "filename": "FILE_20240201_100000",
+        "size": "",
+        "fileurl": "source1: ['https://source1.example/a']; source2: ['https://source2.example/b']; "
+                   "source3: ['https://source3.example/c']",
+    }
+    try:
+        assert resolver.resolve(row) is row
+        assert (row["filename"], row["size"]) == ("alpha.zip", "1.00 MB")
+
+        # Rows with a real filename and size are left alone
+        row = {"filename": "kept.zip", "size": "2 MB", "fileurl": row["fileurl"]}
+        assert resolver.resolve(row) == {"filename": "kept.zip", "size": "2 MB", "fileurl": row["fileurl"]}
+    finally:
+        resolver.close()
@@ -0,0 +1,117 @@
+"""
+parquet_export: rows written to SQLite or run CSVs come back from query() unchanged,
+and repeated exports only append what was added since the previous one.
+"""
+
+import csv
+import importlib
+import os
+import sqlite3
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+SITE = "https://example.com/news-page-1.html"
+OTHER_SITE = "https://other.example/list"
+
+
+def make_row(config, n, site=SITE, date="2024.02.01"):
+    row = {field: f"{field}-{n}" for field in config.FIELDNAMES}
+    row.update(date=date, site=site, href=f"https://example.com/{n}")
+    return row
+
+
+@pytest.fixture
+def parquet_export(config):
+    return importlib.import_module("parquet_export")
+
+
+def insert_rows(config, rows):
+    db_schema = importlib.import_module("db_schema")
+    conn = sqlite3.connect(config.DATABASE)
+    try:
+        db_schema.ensure_schema(conn, config.TABLE_NAME, config.TABLE_HEADER, config.FIELDNAMES)
+        conn.executemany(
+            f"INSERT INTO {config.TABLE_NAME} ({', '.join(config.FIELDNAMES)}) "
+            f"VALUES ({', '.join('?' for _ in config.FIELDNAMES)})",
+            [[row[field] for field in config.FIELDNAMES] for row in rows],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_db_round_trip_keeps_site_column(config, parquet_export, tmp_path):
+    export_dir = str(tmp_path / "parquet")
+    rows = [make_row(config, 1), make_row(config, 2, date="2024.03.05"), make_row(config, 3, site=OTHER_SITE)]
+    insert_rows(config, rows)
+
+    assert parquet_export.export("db", export_dir) == 3
+    assert os.path.isdir(os.path.join(export_dir, "month=2024.02", "site_host=example.com"))
+
+    table = parquet_export.query(export_dir=export_dir)
+    assert table.column_names == config.FIELDNAMES
+    assert sorted(table.to_pylist(), key=lambda row: row["href"]) == rows
+
+    # The stored URL, not the partition host
+    table = parquet_export.query(["title", "site"], sites=[SITE], export_dir=export_dir)
+    assert table.to_pylist() == [{"title": row["title"], "site": SITE} for row in rows[:2]]
+
+    table = parquet_export.query(["href"], months=["2024.03"], export_dir=export_dir)
+    assert table.column("href").to_pylist() == [rows[1]["href"]]
+
+
+def test_db_export_is_incremental(config, parquet_export, tmp_path):
+    export_dir = str(tmp_path / "parquet")
+    insert_rows(config, [make_row(config, 1), make_row(config, 2)])
+
+    assert parquet_export.export("db", export_dir) == 2
+    assert parquet_export.export("db", export_dir) == 0
+
+    insert_rows(config, [make_row(config, 3)])
+    assert parquet_export.export("db", export_dir) == 1
+    assert parquet_export.compact(export_dir) == 1
+    assert sorted(parquet_export.query(["href"], export_dir=export_dir).column("href").to_pylist()) == [
+        "https://example.com/1", "https://example.com/2", "https://example.com/3",
+    ]
+
+
+def test_csv_export_resumes_from_offset(config, parquet_export, tmp_path):
+    export_dir = str(tmp_path / "parquet")
+    csv_path = os.path.join("Outputs", "2024.02", "news_output_1.csv")
+    os.makedirs(os.path.dirname(csv_path))
+    header = config.FIELDNAMES + ["db_status"]
+
+    def append(rows, partial=None):
+        with open(csv_path, "a", newline="", encoding="utf-8") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=header)
+            if csvfile.tell() == 0:
+                writer.writeheader()
+            writer.writerows(rows)
+            if partial:
+                csvfile.write(partial)
+
+    first = make_row(config, 1)
+    first["title"] = "multi\nline, quoted"
+    append([dict(first, db_status="True"), dict(make_row(config, 2), db_status="False")])
+    assert parquet_export.export("csv", export_dir) == 1
+
+    # A row still being written is not exported until its line is complete
+    third = dict(make_row(config, 3), db_status="True")
+    line = ",".join(third[field] for field in header) + "\r\n"
+    append([], partial=line[:10])
+    assert parquet_export.export("csv", export_dir) == 0
+
+    with open(csv_path, "a", newline="", encoding="utf-8") as csvfile:
+        csvfile.write(line[10:])
+    append([dict(make_row(config, 4), db_status="True")])
+    assert parquet_export.export("csv", export_dir) == 2
+    assert parquet_export.export("csv", export_dir) == 0
+
+    table = parquet_export.query(["href", "title"], export_dir=export_dir)
+    assert sorted(table.to_pylist(), key=lambda row: row["href"]) == [
+        {"href": "https://example.com/1", "title": "multi\nline, quoted"},
+        {"href": "https://example.com/3", "title": "title-3"},
+        {"href": "https://example.com/4", "title": "title-4"},
+    ]
@@ -0,0 +1,97 @@
+"""
+rate_limiter against a local HTTP server: robots.txt crawl delay for crawled site hosts
+only, applied before any concurrent request to the host goes out.
+"""
+
+import http.server
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("urllib3")
+
+from rate_limiter import HostRateLimiter, status_from_page  # noqa: E402
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        Handler.requests.append((self.headers.get("Host"), self.path))
+        if self.path == "/robots.txt":
+            # Slow enough that a second thread arrives while it is being read
+            time.sleep(0.2)
+            body = b"User-agent: *\nCrawl-delay: 1\n"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def port():
+    Handler.requests = []
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield httpd.server_port
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_limiter():
+    return HostRateLimiter(initial_rate=100, max_rate=100, burst=100)
+
+
+def test_concurrent_requests_wait_for_the_crawl_delay(port):
+    limiter = make_limiter()
+    site = f"http://127.0.0.1:{port}"
+    limiter.add_site(site + "/news-page-1.html")
+
+    waits = []
+    threads = [
+        threading.Thread(target=lambda: waits.append(limiter.acquire(f"{site}/item-{number}")))
+        for number in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert Handler.requests == [(f"127.0.0.1:{port}", "/robots.txt")]
+    assert limiter.stats()[f"127.0.0.1:{port}"] == 1.0
+    # robots.txt spent the first slot: neither request went out at the initial rate
+    assert min(waits) >= 0.9
+    assert max(waits) >= 1.9
+
+
+def test_other_hosts_skip_robots(port):
+    limiter = make_limiter()
+    limiter.add_site(f"http://127.0.0.1:{port}/")
+
+    assert limiter.acquire(f"http://localhost:{port}/image.jpg") == 0.0
+    assert Handler.requests == []
+
+
+def test_respect_robots_off(port):
+    limiter = HostRateLimiter(initial_rate=100, max_rate=100, burst=100, respect_robots=False)
+    limiter.add_site(f"http://127.0.0.1:{port}/")
+
+    limiter.acquire(f"http://127.0.0.1:{port}/item")
+    assert Handler.requests == []
+
+
+@pytest.mark.parametrize("title, status", [
+    ("429 Too Many Requests", 429),
+    ("Service Unavailable", 503),
+    ("Why we rate limit our API - Example", 200),
+])
+def test_status_from_page(title, status):
+    assert status_from_page(f"<html><head><title>{title}</title></head></html>") == status
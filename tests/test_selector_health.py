@@ -0,0 +1,85 @@
+"""
+selector_health checks against the config.template selectors: the listing traversal
+shared with extraction.py, the detail check, and cached verdicts.
+"""
+
+import importlib
+
+import pytest
+
+pytest.importorskip("bs4")
+
+SITE = "https://example.com/news-page-1.html"
+
+LISTING = """
+<html><body>
+<div class="category_news_phai_chinh"><div class="category_news"><ul>
+  <li><a title="" href="https://example.com/untitled">x</a></li>
+  <li><a title="[NEW] Alpha Suite" href="https://example.com/a">x</a><span class="news_date">01/02/2024</span></li>
+</ul></div></div>
+</body></html>
+"""
+
+DETAIL = """
+<html><body><div class="news"><p>File size: alpha.zip: 10 MB</p></div></body></html>
+"""
+
+
+@pytest.fixture
+def selector_health(config):
+    config.SELECTOR_HEALTH_CHECK = True
+    return importlib.import_module("selector_health")
+
+
+def test_listing_ok(selector_health):
+    problems, warnings, href = selector_health.check_listing(LISTING)
+
+    assert problems == []
+    assert warnings == []
+    assert href == "https://example.com/a"
+
+
+@pytest.mark.parametrize("page, problem", [
+    ("<div class='category_news_phai_chinh'></div>", "NEWS_LIST_DIV_CLASS"),
+    (LISTING.replace("<ul>", "<ol>").replace("</ul>", "</ol>"), "NEWS_LIST_UL_TAG"),
+    (LISTING.replace("<li>", "<p>").replace("</li>", "</p>"), "NEWS_ITEM_LI_TAG"),
+    (LISTING.replace("title=", "data-title="), "TITLE_A_TAG"),
+])
+def test_listing_problems(selector_health, page, problem):
+    problems, warnings, href = selector_health.check_listing(page)
+
+    assert len(problems) == 1 and problems[0].startswith(problem)
+    assert href == ""
+
+
+def test_listing_without_dates_warns(selector_health):
+    problems, warnings, href = selector_health.check_listing(LISTING.replace("news_date", "posted"))
+
+    assert problems == []
+    assert warnings[0].startswith("NEWS_DATE_CLASS")
+
+
+def test_verdicts_are_cached(selector_health, config):
+    health = selector_health.SelectorHealth.from_config(config)
+    fetched = []
+    pages = {SITE: LISTING, "https://example.com/a": DETAIL}
+
+    def fetch(url):
+        fetched.append(url)
+        return pages[url]
+
+    assert health.is_healthy(SITE, fetch)
+    assert fetched == [SITE, "https://example.com/a"]
+
+    # A fresh instance reads the verdict back from the file
+    assert selector_health.SelectorHealth.from_config(config).is_healthy(SITE, fetch)
+    assert len(fetched) == 2
+
+    pages["https://example.com/a"] = "<html><body>Moved</body></html>"
+    health.verdicts.clear()
+    assert not health.is_healthy(SITE, fetch)
+    assert health.cached(SITE)["problems"][0].startswith("DETAIL_NEWS_DIV_CLASS")
+
+
+def test_off_by_default(config):
+    assert importlib.import_module("selector_health").SelectorHealth.from_config(config) is None
@@ -0,0 +1,96 @@
+"""
+title_filter: include/exclude precedence and per-rule hit counts, for literal and
+regex rules alike.
+"""
+
+from title_filter import Rule, TitleFilter, rules_from_config, rules_from_spec
+
+
+def make_filter(spec):
+    return TitleFilter(rules_from_spec(spec))
+
+
+def test_exclude_wins_over_include():
+    title_filter = make_filter({"include": ["[NEW]"], "exclude": ["AD"]})
+
+    assert title_filter.allows("[NEW] Tool 2024")
+    assert not title_filter.allows("[NEW] Tool 2024 AD")
+    assert not title_filter.allows("Tool 2024")  # include rules exist, none matched
+
+
+def test_without_include_rules_everything_not_excluded_passes():
+    title_filter = make_filter({"exclude": [{"pattern": r"\bsponsored\b", "regex": True, "ignore_case": True}]})
+
+    assert title_filter.allows("Tool 2024")
+    assert not title_filter.allows("Tool 2024 (Sponsored)")
+    assert title_filter.allows("Unsponsored tool")
+
+
+def test_case_handling_of_literals():
+    title_filter = make_filter({"include": ["NEW", {"pattern": "update", "ignore_case": True}]})
+
+    assert title_filter.allows("NEW tool")
+    assert not title_filter.allows("new tool")
+    assert title_filter.allows("Tool UPDATE")
+    # lower() changes the length of "İ"; case-sensitive literals are still confirmed
+    assert title_filter.allows("İstanbul NEW")
+    assert not title_filter.allows("İstanbul new")
+
+
+def test_every_matching_rule_is_counted():
+    title_filter = make_filter({
+        "include": [
+            "[NEW]",
+            {"pattern": r"\d{4}", "regex": True},
+            {"pattern": r"tool \d+", "regex": True, "ignore_case": True},
+            {"pattern": "beta", "regex": True},
+        ],
+        "exclude": ["AD", {"pattern": "AD$", "regex": True}],
+    })
+
+    allowed, matched = title_filter.evaluate("[NEW] Tool 2024")
+    assert allowed
+    # The literal hit does not hide the regexes, and both overlapping regexes are credited
+    assert {rule.name for rule in matched} == {"include:[NEW]", r"include:re:\d{4}", r"include:re:tool \d+ (i)"}
+
+    allowed, matched = title_filter.evaluate("Tool 2024 AD")
+    assert not allowed
+    assert {rule.name for rule in matched} == {
+        r"include:re:\d{4}", r"include:re:tool \d+ (i)", "exclude:AD", "exclude:re:AD$",
+    }
+
+    assert title_filter.stats() == {
+        "titles": 2,
+        "accepted": 1,
+        "hits": {
+            "include:[NEW]": 1,
+            r"include:re:\d{4}": 2,
+            r"include:re:tool \d+ (i)": 2,
+            "include:re:beta": 0,
+            "exclude:AD": 1,
+            "exclude:re:AD$": 1,
+        },
+    }
+
+
+def test_overlapping_literals():
+    title_filter = TitleFilter([Rule("include", pattern) for pattern in ("he", "she", "hers", "")])
+
+    allowed, matched = title_filter.evaluate("ushers")
+    assert allowed
+    assert sorted(rule.pattern for rule in matched) == ["he", "hers", "she"]
+    assert len(title_filter.rules) == 3  # empty patterns are ignored
+
+
+def test_site_rules_and_legacy_settings():
+    class Config:
+        TITLE_FILTER_INCLUDE = "[NEW]"
+        TITLE_FILTER_EXCLUDE = "AD"
+        TITLE_FILTER_SITE_RULES = {"example.com": {"exclude": ["Beta"]}}
+
+    site_filter = TitleFilter(rules_from_config(Config, "https://Example.com/news-page-1.html"))
+    assert site_filter.allows("[NEW] Tool")
+    assert not site_filter.allows("[NEW] Tool Beta")
+    assert not site_filter.allows("[NEW] Tool AD")
+
+    assert TitleFilter(rules_from_config(Config, "https://other.example/")).allows("[NEW] Tool Beta")
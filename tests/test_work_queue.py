@@ -0,0 +1,86 @@
+"""
+work_queue leases with two workers on one queue file: expired leases are taken over,
+heartbeats keep them, and jobs fail after their last expired attempt.
+"""
+
+import time
+
+import pytest
+
+from work_queue import DETAIL, LISTING, WorkQueue
+
+
+def make_workers(tmp_path, visibility_timeout, max_attempts=3):
+    path = str(tmp_path / "state" / "work_queue.db")
+    first = WorkQueue(path, visibility_timeout=visibility_timeout, max_attempts=max_attempts)
+    second = WorkQueue(path, visibility_timeout=visibility_timeout, max_attempts=max_attempts)
+    first.worker_id, second.worker_id = "worker-1", "worker-2"
+    return first, second
+
+
+def test_detail_jobs_first_and_no_double_claims(tmp_path):
+    first, second = make_workers(tmp_path, 60)
+    first.enqueue(LISTING, "https://example.com/news-page-1.html", {"site_index": 0, "page": 1})
+    assert first.enqueue(DETAIL, "https://example.com/a")
+    assert not second.enqueue(DETAIL, "https://example.com/a")
+
+    job = first.claim()
+    assert (job.kind, job.url, job.attempts) == (DETAIL, "https://example.com/a", 1)
+    assert second.claim().kind == LISTING
+    assert first.claim() is None
+
+
+def test_expired_lease_is_taken_over(tmp_path):
+    first, second = make_workers(tmp_path, 0.1)
+    first.enqueue(DETAIL, "https://example.com/a")
+
+    job = first.claim()
+    assert second.claim() is None
+
+    time.sleep(0.15)
+    retry = second.claim()
+    assert (retry.id, retry.attempts) == (job.id, 2)
+
+    # The stalled worker lost the job and can no longer finish it
+    assert not first.heartbeat(job)
+    assert not first.complete(job)
+    assert second.complete(retry)
+    assert first.idle()
+
+
+def test_heartbeat_keeps_the_lease(tmp_path):
+    first, second = make_workers(tmp_path, 0.3)
+    first.enqueue(DETAIL, "https://example.com/a")
+
+    with first.lease(first.claim()):
+        time.sleep(0.5)
+        assert second.claim() is None
+
+    assert first.stats() == {DETAIL: {"done": 1}}
+
+
+def test_failed_after_last_expired_attempt(tmp_path):
+    first, second = make_workers(tmp_path, 0.05, max_attempts=2)
+    first.enqueue(DETAIL, "https://example.com/a")
+
+    assert first.claim().attempts == 1
+    time.sleep(0.1)
+    assert second.claim().attempts == 2
+    time.sleep(0.1)
+    assert first.claim() is None
+    assert first.stats() == {DETAIL: {"failed": 1}}
+
+    assert first.retry_failed() == 1
+    assert first.claim().attempts == 1
+
+
+def test_errors_release_the_job(tmp_path):
+    first, second = make_workers(tmp_path, 60)
+    first.enqueue(DETAIL, "https://example.com/a")
+
+    with pytest.raises(RuntimeError):
+        with first.lease(first.claim()):
+            raise RuntimeError("page failed")
+
+    job = second.claim()
+    assert job.attempts == 2
@@ -0,0 +1,248 @@
+"""
+title_filter.py
+
+Compiled include/exclude title filter, evaluated before any detail page is fetched:
+- Rules are literals (case-sensitive or not) or regexes, global and per site
+- All literals go into one Aho-Corasick automaton and all regexes of a kind into one
+  combined pattern, so a title is scanned once however many rules there are; only a
+  title the combined pattern matches is checked against each of its regexes
+- A title passes if it matches at least one include rule (or there are none) and no
+  exclude rule
+- Hits are counted per rule for the end-of-run report: every rule that matches a title
+  is credited, whether or not another rule already decided it
+
+Rule format (config.TITLE_FILTER_RULES, ConfigGenerator.detect_content_filters):
+    {
+        "include": ["[NEW]", {"pattern": "update", "ignore_case": True}],
+        "exclude": ["AD", {"pattern": r"\\bsponsored\\b", "regex": True, "ignore_case": True}],
+    }
+A plain string is a case-sensitive literal. Without TITLE_FILTER_RULES, the legacy
+TITLE_FILTER_INCLUDE / TITLE_FILTER_EXCLUDE strings are used as single literal rules.
+"""
+
+import re
+import threading
+from collections import Counter, deque
+from urllib.parse import urlparse
+
+KINDS = ("include", "exclude")
+
+
+class Rule:
+    __slots__ = ("kind", "pattern", "regex", "ignore_case", "name")
+
+    def __init__(self, kind, pattern, regex=False, ignore_case=False, name=None):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown title rule kind: {kind} (expected one of {KINDS})")
+
+        self.kind = kind
+        self.pattern = pattern
+        self.regex = regex
+        self.ignore_case = ignore_case
+        self.name = name or f"{kind}:{'re:' if regex else ''}{pattern}{' (i)' if ignore_case else ''}"
+
+
+    @classmethod
+    def parse(cls, kind, spec):
+        """Build a rule from a config entry: a literal string or a dict."""
+        if isinstance(spec, str):
+            return cls(kind, spec)
+        return cls(
+            kind,
+            spec["pattern"],
+            regex=spec.get("regex", False),
+            ignore_case=spec.get("ignore_case", False),
+            name=spec.get("name"),
+        )
+
+
+class AhoCorasick:
+    """
+    Multi-pattern literal matcher.
+
+    Patterns are matched on lower-cased text; case-sensitive patterns are confirmed
+    against the original text, so both kinds share one automaton and one pass.
+    """
+
+    def __init__(self, rules):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for rule in rules:
+            state = 0
+            for char in rule.pattern.lower():
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append(rule)
+
+        # Breadth-first failure links; outputs of the fallback state are merged in
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+
+    def matches(self, text) -> set:
+        """Rules whose pattern occurs in `text`."""
+        lowered = text.lower()
+        # lower() can change the length of some characters; then positions no longer
+        # line up and case-sensitive candidates are confirmed with a substring test
+        aligned = len(lowered) == len(text)
+
+        found = set()
+        state = 0
+        for end, char in enumerate(lowered, 1):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+
+            for rule in self.output[state]:
+                if rule in found:
+                    continue
+                if rule.ignore_case:
+                    found.add(rule)
+                elif aligned:
+                    if text[end - len(rule.pattern):end] == rule.pattern:
+                        found.add(rule)
+                elif rule.pattern in text:
+                    found.add(rule)
+
+        return found
+
+
+class TitleFilter:
+    """
+    Compiled include/exclude rules.
+
+    Parameters:
+        rules (list[Rule]): Rules to apply. Empty patterns are ignored.
+    """
+
+    def __init__(self, rules):
+        self.rules = [rule for rule in rules if rule.pattern]
+        self.has_include = any(rule.kind == "include" for rule in self.rules)
+        self.literals = AhoCorasick([rule for rule in self.rules if not rule.regex])
+        self.regexes = {kind: self._combine([rule for rule in self.rules if rule.regex and rule.kind == kind]) for kind in KINDS}
+        self.hits = Counter()
+        self.titles = 0
+        self.accepted = 0
+        self.lock = threading.Lock()
+
+
+    @staticmethod
+    def _combine(rules):
+        # One alternation of all rules of a kind, plus each rule compiled on its own
+        if not rules:
+            return None
+
+        groups = [f"(?i:{rule.pattern})" if rule.ignore_case else f"(?:{rule.pattern})" for rule in rules]
+        compiled = [(rule, re.compile(rule.pattern, re.IGNORECASE if rule.ignore_case else 0)) for rule in rules]
+        return re.compile("|".join(groups)), compiled
+
+
+    @staticmethod
+    def _search(combined, title) -> list:
+        if combined is None:
+            return []
+        pattern, compiled = combined
+        if not pattern.search(title):
+            return []
+        # An alternation reports one rule per position, and rules can match at the same
+        # or overlapping positions; only titles that hit at all pay for the per-rule scan
+        return [rule for rule, rule_pattern in compiled if rule_pattern.search(title)]
+
+
+    def evaluate(self, title: str) -> tuple:
+        """
+        Apply the rules to a title.
+
+        Returns:
+            tuple (bool, list[Rule]): Whether the title passes, and every rule that matched.
+        """
+        matched = list(self.literals.matches(title))
+        for kind in KINDS:
+            matched += self._search(self.regexes[kind], title)
+        kinds = {rule.kind for rule in matched}
+
+        allowed = "exclude" not in kinds and (not self.has_include or "include" in kinds)
+
+        with self.lock:
+            self.titles += 1
+            self.accepted += allowed
+            self.hits.update(rule.name for rule in matched)
+
+        return allowed, matched
+
+
+    def allows(self, title: str) -> bool:
+        return self.evaluate(title)[0]
+
+
+    def stats(self) -> dict:
+        """Titles seen, titles accepted and hit counts per rule (including unused rules)."""
+        with self.lock:
+            return {
+                "titles": self.titles,
+                "accepted": self.accepted,
+                "hits": {rule.name: self.hits[rule.name] for rule in self.rules},
+            }
+
+
+def rules_from_spec(spec) -> list:
+    """Rules from a {"include": [...], "exclude": [...]} mapping."""
+    return [Rule.parse(kind, entry) for kind in KINDS for entry in (spec or {}).get(kind, [])]
+
+
+def rules_from_config(config, site=None) -> list:
+    """
+    Global rules plus the rules for `site`'s host from `TITLE_FILTER_SITE_RULES`.
+    Falls back to TITLE_FILTER_INCLUDE / TITLE_FILTER_EXCLUDE when no rules are set.
+    """
+    spec = getattr(config, "TITLE_FILTER_RULES", None)
+    if spec is None:
+        spec = {
+            "include": [getattr(config, "TITLE_FILTER_INCLUDE", "")],
+            "exclude": [getattr(config, "TITLE_FILTER_EXCLUDE", "")],
+        }
+
+    rules = rules_from_spec(spec)
+
+    if site:
+        host = urlparse(site).netloc.lower()
+        site_rules = getattr(config, "TITLE_FILTER_SITE_RULES", {}) or {}
+        rules += rules_from_spec(site_rules.get(host))
+
+    return rules
+
+
+_filters = {}
+_filters_lock = threading.Lock()
+
+
+def get_title_filter(config, site=None) -> TitleFilter:
+    """Compiled filter for `site`'s host, built once per host and process."""
+    host = urlparse(site).netloc.lower() if site else ""
+    with _filters_lock:
+        title_filter = _filters.get(host)
+        if title_filter is None:
+            title_filter = _filters[host] = TitleFilter(rules_from_config(config, site))
+        return title_filter
+
+
+def filter_stats() -> dict:
+    """Stats of every filter built so far, keyed by host ("" for the global filter)."""
+    with _filters_lock:
+        return {host: title_filter.stats() for host, title_filter in _filters.items()}
@@ -0,0 +1,336 @@
+"""
+work_queue.py
+
+Local, service-free work queue that lets several `news_scraper.py --worker` processes
+on one machine split a crawl:
+- Jobs are listing pages and detail pages, stored in a SQLite database in WAL mode
+- Claiming a job takes a lease (owner + expiry) inside an IMMEDIATE transaction, so
+  two workers never hold the same job
+- A heartbeat thread extends the lease while the job runs; jobs whose lease expired
+  (crashed or stalled worker) become visible again and are retried up to a limit
+- Listing jobs are seeded from `config.DEFAULT_WEBSITES`; a listing job enqueues the
+  next page (from `config.WEBSITES`) until the terminate date is reached
+
+Detail jobs are keyed by URL and stay done across runs, so items are fetched once;
+listing jobs are re-queued by every new seed.
+
+Note: the queue is single-host only. WAL mode coordinates processes through a
+shared-memory index next to the database file, which processes on different machines
+cannot share; keep the queue (and DATABASE) on a local disk, never on NFS/SMB.
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+LISTING = "listing"
+DETAIL = "detail"
+
+
+class Job:
+    __slots__ = ("id", "kind", "url", "payload", "attempts")
+
+    def __init__(self, id, kind, url, payload, attempts):
+        self.id = id
+        self.kind = kind
+        self.url = url
+        self.payload = json.loads(payload) if payload else {}
+        self.attempts = attempts
+
+
+    def __repr__(self):
+        return f"Job({self.id}, {self.kind}, {self.url!r}, attempt {self.attempts})"
+
+
+class WorkQueue:
+    """
+    Leased job queue in a SQLite database.
+
+    Parameters:
+        path (str): Queue database file.
+        visibility_timeout (float): Seconds a lease lasts without a heartbeat.
+        max_attempts (int): Claims allowed per job before it is marked failed.
+    """
+
+    def __init__(self, path="state/work_queue.db", visibility_timeout=300, max_attempts=3):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    url TEXT NOT NULL UNIQUE,
+                    payload TEXT,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    updated REAL NOT NULL,
+                    error TEXT
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs (state, kind, id)")
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a queue from the WORK_QUEUE* settings of a config module."""
+        return cls(
+            path=getattr(config, "WORK_QUEUE", os.path.join("state", "work_queue.db")),
+            visibility_timeout=getattr(config, "WORK_QUEUE_VISIBILITY_TIMEOUT", 300),
+            max_attempts=getattr(config, "WORK_QUEUE_MAX_ATTEMPTS", 3),
+        )
+
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+    @contextmanager
+    def _transaction(self):
+        # IMMEDIATE takes the write lock up front, so claim's read-then-update is atomic
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+
+    def enqueue(self, kind, url, payload=None, requeue_done=False) -> bool:
+        """
+        Add a job unless one for `url` exists.
+
+        Parameters:
+            requeue_done (bool): Reset an existing done/failed job to pending (listing
+                        pages, which change between runs).
+
+        Returns:
+            bool: True if a job was added or re-queued.
+        """
+        now = time.time()
+        payload = json.dumps(payload or {}, ensure_ascii=False)
+
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO jobs (kind, url, payload, updated) VALUES (?, ?, ?, ?)",
+                (kind, url, payload, now),
+            )
+            if cursor.rowcount or not requeue_done:
+                return bool(cursor.rowcount)
+
+            cursor = conn.execute(
+                """
+                UPDATE jobs SET state = 'pending', attempts = 0, payload = ?, lease_owner = NULL,
+                    lease_expires = NULL, updated = ?, error = NULL
+                WHERE url = ? AND state IN ('done', 'failed')
+                """,
+                (payload, now, url),
+            )
+            return bool(cursor.rowcount)
+
+
+    def seed(self, config, site_indexes=None) -> int:
+        """
+        Queue page 1 of the configured sites (all, or those in `site_indexes`).
+
+        Returns:
+            int: Number of jobs (re)queued.
+        """
+        return sum(
+            self.enqueue(LISTING, url, {"site_index": index, "page": 1}, requeue_done=True)
+            for index, url in enumerate(config.DEFAULT_WEBSITES)
+            if site_indexes is None or index in site_indexes
+        )
+
+
+    def claim(self):
+        """
+        Lease the next runnable job: pending, or leased with an expired lease.
+
+        Detail jobs are preferred over listing jobs, so a crawl finishes the items it
+        has found before paging further.
+
+        Returns:
+            Job | None: The claimed job, or None if nothing is runnable right now.
+        """
+        now = time.time()
+
+        with self._transaction() as conn:
+            expired = conn.execute(
+                """
+                UPDATE jobs SET state = 'failed', lease_owner = NULL, updated = ?,
+                    error = COALESCE(error, 'lease expired')
+                WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?
+                """,
+                (now, now, self.max_attempts),
+            ).rowcount
+            if expired:
+                logger.warning(f"{expired} job(s) failed after {self.max_attempts} expired leases")
+
+            row = conn.execute(
+                """
+                SELECT id, kind, url, payload, attempts FROM jobs
+                WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ?)
+                ORDER BY kind = 'listing', id
+                LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            conn.execute(
+                """
+                UPDATE jobs SET state = 'leased', attempts = attempts + 1, lease_owner = ?,
+                    lease_expires = ?, updated = ?
+                WHERE id = ?
+                """,
+                (self.worker_id, now + self.visibility_timeout, now, row[0]),
+            )
+
+        job_id, kind, url, payload, attempts = row
+        return Job(job_id, kind, url, payload, attempts + 1)
+
+
+    def heartbeat(self, job) -> bool:
+        """Extend the lease on `job`. Returns False if this worker no longer holds it."""
+        now = time.time()
+        with self._transaction() as conn:
+            return bool(conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated = ? WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+                (now + self.visibility_timeout, now, job.id, self.worker_id),
+            ).rowcount)
+
+
+    def complete(self, job) -> bool:
+        """Mark `job` done. Returns False if the lease was lost to another worker."""
+        with self._transaction() as conn:
+            return bool(conn.execute(
+                "UPDATE jobs SET state = 'done', lease_owner = NULL, lease_expires = NULL, updated = ?, error = NULL "
+                "WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+                (time.time(), job.id, self.worker_id),
+            ).rowcount)
+
+
+    def fail(self, job, error) -> None:
+        """Release `job` for a retry, or mark it failed once it has used all attempts."""
+        state = "failed" if job.attempts >= self.max_attempts else "pending"
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, lease_owner = NULL, lease_expires = NULL, updated = ?, error = ? "
+                "WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+                (state, time.time(), str(error)[:1000], job.id, self.worker_id),
+            )
+
+
+    @contextmanager
+    def lease(self, job):
+        """
+        Run a job under a heartbeat; complete it on success, release it on error.
+
+        The heartbeat renews the lease every third of the visibility timeout.
+        """
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.visibility_timeout / 3):
+                if not self.heartbeat(job):
+                    logger.warning(f"Lost lease on {job}")
+                    return
+
+        thread = threading.Thread(target=beat, name="heartbeat", daemon=True)
+        thread.start()
+
+        def stop_beat():
+            stop.set()
+            thread.join()
+
+        try:
+            yield job
+        except Exception as e:
+            stop_beat()
+            self.fail(job, e)
+            logger.error(f"{job} failed: {e}")
+            raise
+        except BaseException:
+            # Interrupted: leave the lease to expire so another worker picks the job up
+            stop_beat()
+            raise
+
+        stop_beat()
+        if not self.complete(job):
+            logger.warning(f"{job} finished after its lease expired")
+
+
+    def idle(self) -> bool:
+        """True when no job is pending or leased, i.e. the crawl is finished."""
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM jobs WHERE state IN ('pending', 'leased') LIMIT 1").fetchone() is None
+
+
+    def stats(self) -> dict:
+        """Job counts as {kind: {state: count}}."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT kind, state, COUNT(*) FROM jobs GROUP BY kind, state").fetchall()
+
+        counts = {}
+        for kind, state, count in rows:
+            counts.setdefault(kind, {})[state] = count
+        return counts
+
+
+    def retry_failed(self) -> int:
+        """Reset failed jobs to pending. Returns the number of jobs reset."""
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET state = 'pending', attempts = 0, updated = ? WHERE state = 'failed'",
+                (time.time(),),
+            ).rowcount
+
+
+if __name__ == "__main__":
+    import config
+
+    parser = argparse.ArgumentParser(description="Inspect and manage the crawl work queue")
+    parser.add_argument("--seed", action="store_true", help="queue page 1 of every configured site")
+    parser.add_argument("--retry-failed", action="store_true", help="reset failed jobs to pending")
+    args = parser.parse_args()
+
+    work_queue = WorkQueue.from_config(config)
+
+    if args.seed:
+        print(f"Seeded {work_queue.seed(config)} listing job(s)")
+
+    if args.retry_failed:
+        print(f"Reset {work_queue.retry_failed()} failed job(s)")
+
+    for kind, states in sorted(work_queue.stats().items()):
+        print(f"{kind}: " + ", ".join(f"{state}={count}" for state, count in sorted(states.items())))